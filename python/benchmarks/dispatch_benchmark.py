@@ -0,0 +1,98 @@
+"""Measures the per-command overhead of CommandParser dispatch.
+
+The player is replaced by one whose methods do nothing, so the timings only
+cover parsing and dispatch. They are compared with the `elif` chain that
+CommandParser used before it became table driven, which compared the
+upper-cased verb against every command in turn. The table dispatcher
+also counts every command and times one in CommandStats.sample_every.
+Each timing is the best of several runs, as other load on the machine only
+ever makes a run slower, and the runs of both dispatchers are interleaved
+so that they see the same load.
+
+Run it from the python/ directory with:
+
+    python3 -m benchmarks.dispatch_benchmark
+"""
+
+import timeit
+
+from src.command_parser import CommandParser
+
+# The verbs in the order the old `elif` chain tested them.
+_CHAIN_ORDER = [
+    "NUMBER_OF_VIDEOS", "SHOW_ALL_VIDEOS", "PLAY", "PLAY_RANDOM", "STOP",
+    "PAUSE", "CONTINUE", "SHOW_PLAYING", "CREATE_PLAYLIST", "ADD_TO_PLAYLIST",
+    "REMOVE_FROM_PLAYLIST", "CLEAR_PLAYLIST", "DELETE_PLAYLIST",
+    "SHOW_PLAYLIST", "SHOW_ALL_PLAYLISTS", "SEARCH_VIDEOS",
+    "SEARCH_VIDEOS_WITH_TAG", "FLAG_VIDEO", "ALLOW_VIDEO", "HELP",
+]
+
+_COMMANDS = [
+    ["NUMBER_OF_VIDEOS"],
+    ["play", "funny_dogs_video_id"],
+    ["ADD_TO_PLAYLIST", "my_playlist", "funny_dogs_video_id"],
+    ["SEARCH_VIDEOS_WITH_TAG", "#cat"],
+    ["FLAG_VIDEO", "funny_dogs_video_id", "reason"],
+    ["ALLOW_VIDEO", "funny_dogs_video_id"],
+]
+
+
+class _NullPlayer:
+    """A player whose every command does nothing."""
+
+    output = None
+    lines_printed = 0
+
+    def __getattr__(self, name):
+        method = lambda *args: None
+        setattr(self, name, method)
+        return method
+
+    def _get_help(self):
+        pass
+
+
+class _ElifChainParser:
+    """Mimics the cost of the old chain: one upper() and compare per verb."""
+
+    def __init__(self, video_player):
+        self._player = video_player
+
+    def execute_command(self, command):
+        for verb in _CHAIN_ORDER:
+            if command[0].upper() == verb:
+                return self._player.handler(*command[1:])
+        print("Please enter a valid command, type HELP for a list of "
+              "available commands.")
+
+
+def run(number=20000, repeat=25):
+    """Times both dispatchers for each sample command.
+
+    Args:
+        number: The number of dispatches in one timed run.
+        repeat: The number of runs, of which the fastest is kept.
+
+    Returns:
+        A list of (command, elif chain ns, table ns) tuples, the times being
+        the mean cost of one dispatch in nanoseconds.
+    """
+    chain = _ElifChainParser(_NullPlayer())
+    parser = CommandParser(_NullPlayer())
+    results = []
+    for command in _COMMANDS:
+        before = after = float("inf")
+        for _ in range(repeat):
+            before = min(before, timeit.timeit(
+                lambda: chain.execute_command(command), number=number))
+            after = min(after, timeit.timeit(
+                lambda: parser.execute_command(command), number=number))
+        results.append((" ".join(command),
+                        before / number * 1e9, after / number * 1e9))
+    return results
+
+
+if __name__ == "__main__":
+    print(f"{'command':55} {'elif chain':>12} {'table':>12}")
+    for command, before, after in run():
+        print(f"{command:55} {before:>10.0f}ns {after:>10.0f}ns")
@@ -0,0 +1,79 @@
+"""Measures how fast playlists are recovered from their journal.
+
+It writes a catalog and a journal with the requested number of playlist
+entries into a temporary directory, then times PlaylistJournal.load, once
+from the journal alone and once after compacting it into a snapshot.
+
+Run it from the python/ directory with:
+
+    python3 -m benchmarks.journal_recovery --entries 1000000
+"""
+
+from src.playlist_journal import PlaylistJournal
+from src.video_library import VideoLibrary
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+
+def _timed_load(path, library):
+    journal = PlaylistJournal(path)
+    start = time.perf_counter()
+    registry = journal.load(library)
+    elapsed = time.perf_counter() - start
+    return journal, registry, elapsed
+
+
+def run(entries, playlist_size=1000):
+    """Writes and recovers a journal of playlist additions.
+
+    Args:
+        entries: The total number of playlist entries.
+        playlist_size: The number of videos in each playlist.
+
+    Returns:
+        A dict with the recovery times in seconds.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        catalog_path = Path(directory) / "videos.txt"
+        catalog_path.write_text("".join(
+            f"Video {i} | video_{i} | #tag{i % 50}\n"
+            for i in range(playlist_size)))
+        library = VideoLibrary(catalog_path)
+
+        journal_path = Path(directory) / "playlists.journal"
+        lines = ["G\t0\n"]
+        for p in range(entries // playlist_size):
+            lines.append(f"C\tplaylist_{p}\n")
+            lines.extend(f"A\tplaylist_{p}\tvideo_{i}\n"
+                         for i in range(playlist_size))
+        journal_path.write_text("".join(lines))
+
+        journal, registry, from_journal = _timed_load(journal_path, library)
+        recovered = sum(len(playlist.get_videos())
+                        for playlist in registry.values())
+        journal.compact()
+        journal.close()
+        journal, _, from_snapshot = _timed_load(journal_path, library)
+        journal.close()
+    return {
+        "entries": recovered,
+        "journal_seconds": from_journal,
+        "snapshot_seconds": from_snapshot,
+    }
+
+
+def main(argv=None):
+    argument_parser = argparse.ArgumentParser(
+        prog="python3 -m benchmarks.journal_recovery", description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    argument_parser.add_argument("--entries", type=int, default=1000000)
+    args = argument_parser.parse_args(argv)
+    for name, value in run(args.entries).items():
+        print(f"{name:20} {value:.3f}" if isinstance(value, float)
+              else f"{name:20} {value}")
+
+
+if __name__ == "__main__":
+    main()
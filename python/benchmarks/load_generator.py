@@ -0,0 +1,120 @@
+"""Drives the command server with many concurrent clients.
+
+It starts `python3 -m src.server` on a free local port (or connects to an
+existing server), opens the requested number of connections and has each
+send a fixed mix of commands, waiting for every reply before sending the
+next one. It reports the overall throughput and the latency percentiles.
+
+Run it from the python/ directory with e.g.:
+
+    python3 -m benchmarks.load_generator --connections 2000 --commands 50
+"""
+
+from src.server import read_response
+import argparse
+import asyncio
+import subprocess
+import sys
+import time
+
+_COMMAND_MIX = [
+    "NUMBER_OF_VIDEOS",
+    "PLAY amazing_cats_video_id",
+    "SHOW_PLAYING",
+    "CREATE_PLAYLIST my_playlist",
+    "ADD_TO_PLAYLIST my_playlist funny_dogs_video_id",
+    "SEARCH_VIDEOS cat",
+    "SEARCH_VIDEOS_WITH_TAG #animal",
+    "SHOW_PLAYLIST my_playlist",
+    "STOP",
+    "SHOW_ALL_VIDEOS",
+]
+
+
+def _percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * fraction))
+    return sorted_values[index]
+
+
+async def _client(host, port, commands, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    for i in range(commands):
+        line = _COMMAND_MIX[i % len(_COMMAND_MIX)]
+        start = time.perf_counter()
+        writer.write(line.encode("utf-8") + b"\n")
+        await writer.drain()
+        if await read_response(reader) is None:
+            raise ConnectionError("server closed the connection")
+        latencies.append(time.perf_counter() - start)
+    writer.write(b"EXIT\n")
+    await writer.drain()
+    writer.close()
+
+
+async def run(host, port, connections, commands):
+    """Runs the load and returns a dict of results.
+
+    Args:
+        host: The server address.
+        port: The server port.
+        connections: The number of concurrent client connections.
+        commands: The number of commands each connection sends.
+    """
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        _client(host, port, commands, latencies)
+        for _ in range(connections)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "connections": connections,
+        "commands": len(latencies),
+        "seconds": elapsed,
+        "commands_per_second": len(latencies) / elapsed,
+        "p50_ms": _percentile(latencies, 0.50) * 1e3,
+        "p99_ms": _percentile(latencies, 0.99) * 1e3,
+        "max_ms": latencies[-1] * 1e3,
+    }
+
+
+def _start_server():
+    server = subprocess.Popen(
+        [sys.executable, "-m", "src.server", "--port", "0"],
+        stdout=subprocess.PIPE, text=True)
+    # The server announces "Listening on host:port" once it is ready.
+    address = server.stdout.readline().split()[-1]
+    host, port = address.rsplit(":", 1)
+    return server, host, int(port)
+
+
+def main(argv=None):
+    argument_parser = argparse.ArgumentParser(
+        prog="python3 -m benchmarks.load_generator", description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    argument_parser.add_argument("--connections", type=int, default=1000)
+    argument_parser.add_argument("--commands", type=int, default=20)
+    argument_parser.add_argument(
+        "--connect", metavar="HOST:PORT",
+        help="use a running server instead of starting one")
+    args = argument_parser.parse_args(argv)
+
+    server = None
+    if args.connect:
+        host, port = args.connect.rsplit(":", 1)
+        port = int(port)
+    else:
+        server, host, port = _start_server()
+    try:
+        results = asyncio.run(run(host, port, args.connections, args.commands))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    for name, value in results.items():
+        print(f"{name:20} {value:.2f}" if isinstance(value, float)
+              else f"{name:20} {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Measures the memory cost of idle sessions sharing one player.
+
+Run it from the python/ directory with:
+
+    python3 -m benchmarks.session_memory --sessions 100000
+"""
+
+from src.session import Session
+from src.video_player import VideoPlayer
+import argparse
+import tracemalloc
+
+
+def run(sessions):
+    """Creates idle sessions on one shared player and measures their memory.
+
+    Args:
+        sessions: The number of sessions to create.
+
+    Returns:
+        A dict with the total and per-session allocated bytes.
+    """
+    player = VideoPlayer()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    created = []
+    for _ in range(sessions):
+        session = Session()
+        player.session = session
+        created.append(session)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return {
+        "sessions": sessions,
+        "total_mb": used / 2**20,
+        "bytes_per_session": used / sessions,
+    }
+
+
+def main(argv=None):
+    argument_parser = argparse.ArgumentParser(
+        prog="python3 -m benchmarks.session_memory", description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    argument_parser.add_argument("--sessions", type=int, default=100000)
+    args = argument_parser.parse_args(argv)
+    for name, value in run(args.sessions).items():
+        print(f"{name:20} {value:.2f}" if isinstance(value, float)
+              else f"{name:20} {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Measures how title and tag search scale with the number of shards.
+
+It writes a synthetic catalog, then runs the same searches in one process
+and with ShardedSearch over an increasing number of worker processes. It
+reports how long each setup takes to start, its search throughput and its
+speedup over one shard.
+Searches use common words, whose many matches make the per-shard work
+large compared with the cost of the messages. Speedups are bounded by the
+number of CPUs.
+
+Run it from the python/ directory with e.g.:
+
+    python3 -m benchmarks.shard_scaling --videos 1000000 --shards 1 2 4 8
+"""
+
+from benchmarks.synthetic_catalog import tag
+from benchmarks.synthetic_catalog import word
+from benchmarks.synthetic_catalog import write_catalog
+from src.catalog import Catalog
+from src.catalog_snapshot import read_text_catalog
+from src.sharded_catalog import ShardedSearch
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+
+def _searches(count):
+    return [(tag(i % 20), True) if i % 2 else (word(i % 20), False)
+            for i in range(count)]
+
+
+def _throughput(search, searches):
+    start = time.perf_counter()
+    for search_term, by_tag in searches:
+        search(search_term, by_tag)
+    return len(searches) / (time.perf_counter() - start)
+
+
+def run(videos, shard_counts, searches=200):
+    """Times the searches with every number of shards.
+
+    Args:
+        videos: The size of the synthetic catalog.
+        shard_counts: The numbers of worker processes to try.
+        searches: The number of searches timed in each setup.
+
+    Returns:
+        A list of (setup, start-up seconds, searches per second, speedup)
+        tuples. The speedup is relative to one shard.
+    """
+    queries = _searches(searches)
+    with tempfile.TemporaryDirectory() as directory:
+        catalog_path = Path(directory) / "videos.txt"
+        write_catalog(catalog_path, videos)
+        start = time.perf_counter()
+        catalog = Catalog(read_text_catalog(catalog_path))
+        startup = time.perf_counter() - start
+
+        def local_search(search_term, by_tag):
+            if by_tag:
+                indexes = catalog.search_tags(search_term)
+            else:
+                indexes = catalog.search_titles(search_term)
+            return sorted(indexes, key=catalog.display_line)
+
+        results = [("in process", startup,
+                    _throughput(local_search, queries))]
+        for shards in shard_counts:
+            start = time.perf_counter()
+            sharded = ShardedSearch(catalog, shards)
+            startup = time.perf_counter() - start
+            try:
+                results.append((f"{shards} shards", startup,
+                                _throughput(sharded.search, queries)))
+            finally:
+                sharded.close()
+    one_shard = {setup: rate for setup, _, rate in results}.get("1 shards")
+    return [(setup, startup, rate, rate / one_shard if one_shard else None)
+            for setup, startup, rate in results]
+
+
+def main(argv=None):
+    argument_parser = argparse.ArgumentParser(
+        prog="python3 -m benchmarks.shard_scaling", description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    argument_parser.add_argument("--videos", type=int, default=200000)
+    argument_parser.add_argument(
+        "--shards", type=int, nargs="+",
+        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    argument_parser.add_argument("--searches", type=int, default=200)
+    args = argument_parser.parse_args(argv)
+    print(f"{os.cpu_count()} CPUs, {args.videos} videos")
+    print(f"{'setup':12} {'start-up s':>10} {'searches/s':>12} {'speedup':>8}")
+    for setup, startup, rate, speedup in run(
+            args.videos, args.shards, args.searches):
+        speedup = "" if speedup is None else f"{speedup:.2f}x"
+        print(f"{setup:12} {startup:>10.2f} {rate:>12.1f} {speedup:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+"""Times library loading and every command on synthetic catalogs.
+
+For each catalog size it writes a synthetic catalog (see
+benchmarks.synthetic_catalog) into a temporary directory and times:
+
+    load        parsing the text catalog, building and loading its snapshot
+    commands    every command, run through CommandParser as a user would
+    dispatch    the overhead of CommandParser alone
+
+Each command is run several times. State changing commands work on fresh
+playlists and videos every time, and searches use a different word every
+time unless they are marked as cached. The results are written as JSON.
+Given a baseline report, the run fails if a timing got slower by more than
+the tolerance.
+
+Run it from the python/ directory with e.g.:
+
+    python3 -m benchmarks.suite --sizes 1000 100000 --output report.json
+    python3 -m benchmarks.suite --sizes 1000 100000 --baseline report.json
+"""
+
+from benchmarks import dispatch_benchmark
+from benchmarks.synthetic_catalog import tag
+from benchmarks.synthetic_catalog import word
+from benchmarks.synthetic_catalog import write_catalog
+from src.catalog import clear_catalogs
+from src.catalog_snapshot import build_snapshot
+from src.command_parser import CommandParser
+from src.video_library import VideoLibrary
+from src.video_player import VideoPlayer
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+def _benchmark_commands(video_ids, id_file):
+    """Returns the benchmarked commands as (name, make_command) pairs.
+
+    make_command(i) returns the words of the i-th run of the command. The
+    pairs are in the order they run, so that each command finds the state
+    it needs, e.g. a playlist to add to.
+    """
+    def video(i):
+        return video_ids[(i * 7919) % len(video_ids)]
+
+    def videos(i):
+        return [video(i * 100 + j) for j in range(100)]
+
+    return [
+        ("NUMBER_OF_VIDEOS", lambda i: ["NUMBER_OF_VIDEOS"]),
+        ("SHOW_ALL_VIDEOS 100",
+         lambda i: ["SHOW_ALL_VIDEOS", "100", str(i * 100)]),
+        ("SHOW_ALL_VIDEOS", lambda i: ["SHOW_ALL_VIDEOS"]),
+        ("PLAY", lambda i: ["PLAY", video(i)]),
+        ("PAUSE", lambda i: ["PAUSE"]),
+        ("SHOW_PLAYING", lambda i: ["SHOW_PLAYING"]),
+        ("CONTINUE", lambda i: ["CONTINUE"]),
+        ("STOP", lambda i: ["STOP"]),
+        ("PLAY_RANDOM", lambda i: ["PLAY_RANDOM"]),
+        ("CREATE_PLAYLIST", lambda i: ["CREATE_PLAYLIST", f"playlist_{i}"]),
+        ("ADD_TO_PLAYLIST",
+         lambda i: ["ADD_TO_PLAYLIST", f"playlist_{i}", video(i)]),
+        ("ADD_MANY_TO_PLAYLIST",
+         lambda i: ["ADD_MANY_TO_PLAYLIST", f"playlist_{i}"] + videos(i)),
+        ("SHOW_PLAYLIST", lambda i: ["SHOW_PLAYLIST", f"playlist_{i}"]),
+        ("SHOW_ALL_PLAYLISTS", lambda i: ["SHOW_ALL_PLAYLISTS"]),
+        ("REMOVE_FROM_PLAYLIST",
+         lambda i: ["REMOVE_FROM_PLAYLIST", f"playlist_{i}", video(i)]),
+        ("REMOVE_MANY_FROM_PLAYLIST",
+         lambda i: ["REMOVE_MANY_FROM_PLAYLIST", f"playlist_{i}"]
+         + videos(i)[:50]),
+        ("CLEAR_PLAYLIST", lambda i: ["CLEAR_PLAYLIST", f"playlist_{i}"]),
+        ("DELETE_PLAYLIST", lambda i: ["DELETE_PLAYLIST", f"playlist_{i}"]),
+        ("SEARCH_VIDEOS common",
+         lambda i: ["SEARCH_VIDEOS", word(i)]),
+        ("SEARCH_VIDEOS rare",
+         lambda i: ["SEARCH_VIDEOS", word(1000 + i)]),
+        ("SEARCH_VIDEOS cached", lambda i: ["SEARCH_VIDEOS", word(1000)]),
+        ("SEARCH_VIDEOS_WITH_TAG common",
+         lambda i: ["SEARCH_VIDEOS_WITH_TAG", tag(i)]),
+        ("SEARCH_VIDEOS_WITH_TAG rare",
+         lambda i: ["SEARCH_VIDEOS_WITH_TAG", tag(1000 + i)]),
+        ("SEARCH_RANKED",
+         lambda i: ["SEARCH_RANKED", word(i), word(50 + i), word(500 + i)]),
+        ("PLAY_RESULT", lambda i: ["PLAY_RESULT", "1"]),
+        ("COMPLETE TITLE", lambda i: ["COMPLETE", "TITLE", word(i)[:3]]),
+        ("COMPLETE TAG", lambda i: ["COMPLETE", "TAG", tag(i)[:3]]),
+        ("COMPLETE PLAYLIST", lambda i: ["COMPLETE", "PLAYLIST", "play"]),
+        ("FLAG_VIDEO", lambda i: ["FLAG_VIDEO", video(i), "benchmark"]),
+        ("ALLOW_VIDEO", lambda i: ["ALLOW_VIDEO", video(i)]),
+        ("FLAG_VIDEOS_FROM_FILE",
+         lambda i: ["FLAG_VIDEOS_FROM_FILE", id_file, "benchmark"]),
+        ("STATS", lambda i: ["STATS"]),
+        ("HELP", lambda i: ["HELP"]),
+    ]
+
+
+def _summary(seconds):
+    return {
+        "runs": len(seconds),
+        "min_ms": min(seconds) * 1e3,
+        "median_ms": statistics.median(seconds) * 1e3,
+        "max_ms": max(seconds) * 1e3,
+    }
+
+
+def _timed(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def _run_size(directory, videos, repeat, seed):
+    catalog_path = Path(directory) / f"videos_{videos}.txt"
+    generate_seconds, _ = _timed(
+        lambda: write_catalog(catalog_path, videos, seed))
+
+    clear_catalogs()
+    text_seconds, library = _timed(lambda: VideoLibrary(catalog_path))
+    build_seconds, _ = _timed(lambda: build_snapshot(catalog_path))
+    clear_catalogs()
+    snapshot_seconds, library = _timed(lambda: VideoLibrary(catalog_path))
+
+    video_ids = [video.video_id for video in library.get_all_videos()]
+    id_file = str(Path(directory) / "flag_ids.txt")
+    Path(id_file).write_text("\n".join(video_ids[:1000]))
+
+    with open(os.devnull, "w") as null_output:
+        player = VideoPlayer(library, output=null_output, interactive=False)
+        parser = CommandParser(player)
+        commands = {}
+        for name, make_command in _benchmark_commands(video_ids, id_file):
+            seconds = []
+            for i in range(repeat):
+                command = make_command(i)
+                start = time.perf_counter()
+                parser.execute_command(command)
+                seconds.append(time.perf_counter() - start)
+            commands[name] = _summary(seconds)
+
+    return {
+        "videos": videos,
+        "load": {
+            "generate_catalog_s": generate_seconds,
+            "load_text_s": text_seconds,
+            "build_snapshot_s": build_seconds,
+            "load_snapshot_s": snapshot_seconds,
+        },
+        "commands": commands,
+    }
+
+
+def run(sizes, repeat=5, seed=0):
+    """Runs the whole suite.
+
+    Args:
+        sizes: The catalog sizes to benchmark, in videos.
+        repeat: The number of runs of each command.
+        seed: The seed of the synthetic catalogs.
+
+    Returns:
+        The report, a dict that can be serialised as JSON.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for videos in sizes:
+            results.append(_run_size(directory, videos, repeat, seed))
+    clear_catalogs()
+    dispatch = [
+        {"command": command, "elif_chain_ns": before, "table_ns": after}
+        for command, before, after in dispatch_benchmark.run(number=20000)]
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "repeat": repeat,
+        "sizes": results,
+        "dispatch": dispatch,
+    }
+
+
+def compare(baseline, report, tolerance=0.25):
+    """Finds the timings that got slower than in a baseline report.
+
+    Command timings are compared by their median and load timings as they
+    are, for every catalog size found in both reports. The dispatch
+    overhead of CommandParser is compared per sample command, and must also
+    stay below that of the old elif chain measured in the same run.
+
+    Args:
+        baseline: An earlier report.
+        report: The new report.
+        tolerance: The allowed slowdown, as a fraction of the baseline.
+
+    Returns:
+        A list of messages, one per regression.
+    """
+    regressions = []
+    earlier_sizes = {size["videos"]: size for size in baseline["sizes"]}
+    for size in report["sizes"]:
+        earlier = earlier_sizes.get(size["videos"])
+        if earlier is None:
+            continue
+        pairs = [(f"load {name}", earlier["load"].get(name), seconds)
+                 for name, seconds in size["load"].items()
+                 if name != "generate_catalog_s"]
+        pairs += [(name, earlier["commands"].get(name, {}).get("median_ms"),
+                   timings["median_ms"])
+                  for name, timings in size["commands"].items()]
+        for name, before, after in pairs:
+            if before is not None and after > before * (1 + tolerance):
+                regressions.append(
+                    f"{size['videos']} videos, {name}: "
+                    f"{before:.4g} -> {after:.4g}")
+    earlier_dispatch = {sample["command"]: sample["table_ns"]
+                        for sample in baseline.get("dispatch", ())}
+    for sample in report.get("dispatch", ()):
+        before = earlier_dispatch.get(sample["command"])
+        after = sample["table_ns"]
+        if before is not None and after > before * (1 + tolerance):
+            regressions.append(f"dispatch, {sample['command']}: "
+                               f"{before:.4g} -> {after:.4g} ns")
+        if after > sample["elif_chain_ns"]:
+            regressions.append(
+                f"dispatch, {sample['command']}: {after:.4g} ns, slower "
+                f"than the elif chain's {sample['elif_chain_ns']:.4g} ns")
+    return regressions
+
+
+def main(argv=None):
+    argument_parser = argparse.ArgumentParser(
+        prog="python3 -m benchmarks.suite", description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    argument_parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1000, 100000],
+        help="catalog sizes in videos (default: 1000 100000)")
+    argument_parser.add_argument("--repeat", type=int, default=5)
+    argument_parser.add_argument("--seed", type=int, default=0)
+    argument_parser.add_argument(
+        "--output", help="write the JSON report to this file")
+    argument_parser.add_argument(
+        "--baseline", type=argparse.FileType("r"),
+        help="an earlier report to check for regressions")
+    argument_parser.add_argument(
+        "--tolerance", type=float, default=0.25,
+        help="the allowed slowdown against the baseline (default: 0.25)")
+    args = argument_parser.parse_args(argv)
+
+    report = run(args.sizes, args.repeat, args.seed)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    else:
+        print(text)
+    if args.baseline is not None:
+        regressions = compare(json.load(args.baseline), report,
+                              args.tolerance)
+        for regression in regressions:
+            print("Slower: " + regression, file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Generates large synthetic video catalogs for benchmarks.
+
+Titles and tags are drawn from made-up vocabularies with Zipf distributed
+word frequencies, so a few words are very common and most are rare, much
+like real titles. Titles have two to eight words and videos zero to five
+tags. The same count and seed always give the same catalog.
+
+Run it from the python/ directory with e.g.:
+
+    python3 -m benchmarks.synthetic_catalog --count 1000000 videos.txt
+"""
+
+import argparse
+import itertools
+import random
+
+_SYLLABLES = [
+    "ka", "lo", "mi", "ne", "ru", "ta", "vo", "zi", "pa", "do", "fe", "gu",
+    "hi", "jo", "be", "sa", "ti", "ro", "ma", "ni", "cu", "le", "wa", "ye",
+]
+
+# The sizes of the vocabularies and the skew of their distributions.
+_TITLE_WORDS = 50000
+_TAGS = 5000
+_ZIPF_EXPONENT = 1.07
+
+
+def word(rank):
+    """Returns the word of the title vocabulary with the given rank.
+
+    Rank 0 is the most frequent word. Every rank gives a distinct word.
+    """
+    syllables = []
+    rank += len(_SYLLABLES)
+    while rank:
+        rank, digit = divmod(rank, len(_SYLLABLES))
+        syllables.append(_SYLLABLES[digit])
+    return "".join(reversed(syllables))
+
+
+def tag(rank):
+    """Returns the tag with the given rank, rank 0 being the most used."""
+    return "#" + word(rank)
+
+
+def _cumulative_weights(size):
+    return list(itertools.accumulate(
+        1 / (rank + 1) ** _ZIPF_EXPONENT for rank in range(size)))
+
+
+def generate(count, seed=0):
+    """Yields the rows of a synthetic catalog.
+
+    Args:
+        count: The number of videos.
+        seed: The random seed.
+
+    Yields:
+        (title, video_id, tags) tuples, tags being a tuple.
+    """
+    rng = random.Random(seed)
+    words = [word(rank) for rank in range(_TITLE_WORDS)]
+    tags = [tag(rank) for rank in range(_TAGS)]
+    word_weights = _cumulative_weights(_TITLE_WORDS)
+    tag_weights = _cumulative_weights(_TAGS)
+    for number in range(count):
+        title_words = rng.choices(
+            words, cum_weights=word_weights, k=rng.randint(2, 8))
+        title = " ".join(title_words).capitalize()
+        video_id = f"{title_words[0]}_{number:x}_video_id"
+        video_tags = tuple(dict.fromkeys(rng.choices(
+            tags, cum_weights=tag_weights, k=rng.randint(0, 5))))
+        yield title, video_id, video_tags
+
+
+def write_catalog(path, count, seed=0):
+    """Writes a synthetic catalog in the format of videos.txt.
+
+    Args:
+        path: The file to write.
+        count: The number of videos.
+        seed: The random seed.
+    """
+    with open(path, "w") as catalog_file:
+        catalog_file.writelines(
+            f"{title} | {video_id} | {' , '.join(video_tags)}\n"
+            for title, video_id, video_tags in generate(count, seed))
+
+
+def main(argv=None):
+    argument_parser = argparse.ArgumentParser(
+        prog="python3 -m benchmarks.synthetic_catalog", description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    argument_parser.add_argument("path", help="the catalog file to write")
+    argument_parser.add_argument("--count", type=int, default=1000000)
+    argument_parser.add_argument("--seed", type=int, default=0)
+    args = argument_parser.parse_args(argv)
+    write_catalog(args.path, args.count, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""A read-only video catalog shared by every library in the process."""
+
+from .catalog_snapshot import build_columns
+from .catalog_snapshot import load_columns
+from .completion import PrefixIndex
+from .metrics import REGISTRY
+from .ranking import BM25Index
+from .ranking import tokenize
+from .search_index import TrigramIndex
+from array import array
+from pathlib import Path
+import os
+import time
+
+
+class Catalog:
+    """A class used to represent the immutable part of a video library.
+
+    A catalog holds the videos and their search indexes. It is never
+    modified after construction, so a single instance can be shared by any
+    number of VideoLibrary objects, each keeping its own mutable state.
+
+    Videos are stored column by column and addressed by their row index:
+    ids and titles are strings in two lists, and the tags of row i
+    are the tag ids `tag_refs[tag_offsets[i]:tag_offsets[i + 1]]` into the
+    list of distinct tag names.
+    """
+
+    def __init__(self, rows, build_indexes=True, build_ranking=True):
+        """Catalog constructor.
+
+        Args:
+            rows: An iterable of (title, video_id, tags) tuples.
+            build_indexes: Whether to build the title and tag search
+                indexes. Without them search_titles and search_tags find
+                nothing, which suits a catalog whose searches are answered
+                by a ShardedSearch.
+            build_ranking: Whether to build the BM25 ranking now. Without
+                it, the first call to rank builds it.
+        """
+        self._use_columns(build_columns(rows, build_indexes, build_ranking))
+
+    @classmethod
+    def from_columns(cls, columns):
+        """Returns a catalog over already built columns and indexes.
+
+        Args:
+            columns: A CatalogColumns, e.g. loaded from a snapshot.
+        """
+        catalog = cls.__new__(cls)
+        catalog._use_columns(columns)
+        return catalog
+
+    def _use_columns(self, columns):
+        self._video_ids = columns.video_ids
+        self._titles = columns.titles
+        self._index_of = dict(zip(columns.video_ids,
+                                  range(len(columns.video_ids))))
+        self._tag_names = columns.tag_names
+        self._tag_refs = columns.tag_refs
+        self._tag_offsets = columns.tag_offsets
+        if columns.title_postings is None:
+            self._title_index = TrigramIndex((), {})
+        else:
+            self._title_index = TrigramIndex(
+                columns.titles, columns.title_postings)
+        # The rows of each distinct case-folded tag, in the order of the
+        # tag vocabulary.
+        self._tag_rows = columns.tag_rows
+        self._tag_vocabulary = TrigramIndex(columns.folded_tags)
+        self._display_lines = [None] * len(self._video_ids)
+        self._sorted_indexes = None
+        self._title_completions = None
+        self._tag_completions = None
+        self._ranking = columns.ranking
+
+    def __len__(self):
+        return len(self._video_ids)
+
+    def index_of(self, video_id):
+        """Returns the row index of a video id, or None if it is unknown."""
+        return self._index_of.get(video_id)
+
+    def video_id(self, index):
+        """Returns the video id of a row."""
+        return self._video_ids[index]
+
+    def title(self, index):
+        """Returns the title of a row."""
+        return self._titles[index]
+
+    def tags(self, index):
+        """Returns the tags of a row as a tuple."""
+        names = self._tag_names
+        refs = self._tag_refs
+        return tuple(names[refs[i]] for i in range(
+            self._tag_offsets[index], self._tag_offsets[index + 1]))
+
+    def display_line(self, index):
+        """Returns the `title (video_id) [tags]` line of a row.
+
+        The line is built on first use and then reused. It never changes,
+        because flag state is rendered by the library on top of it.
+        """
+        line = self._display_lines[index]
+        if line is None:
+            line = (f"{self._titles[index]} ({self._video_ids[index]}) "
+                    f"[{' '.join(self.tags(index))}]")
+            self._display_lines[index] = line
+        return line
+
+    def sorted_indexes(self):
+        """Returns the rows ordered by their display line.
+
+        The order is computed on first use and shared by every library.
+        """
+        if self._sorted_indexes is None:
+            self._sorted_indexes = array("I", sorted(
+                range(len(self._video_ids)), key=self.display_line))
+        return self._sorted_indexes
+
+    def search_titles(self, search_term):
+        """Returns the rows whose titles contain search_term.
+
+        The comparison ignores case, matching `search_term.lower() in
+        title.lower()`, but is answered from the title n-gram index.
+        """
+        return self._title_index.search(search_term)
+
+    def search_tags(self, video_tag):
+        """Returns the rows with a tag containing video_tag.
+
+        Matching tags are found in the index of distinct tags, so the cost
+        depends on the number of matches rather than on the catalog size.
+        Each row appears once even if several of the video's tags match.
+        """
+        indexes = set()
+        for folded_tag_id in self._tag_vocabulary.search(video_tag):
+            indexes.update(self._tag_rows[folded_tag_id])
+        return indexes
+
+    def complete_titles(self, prefix, limit):
+        """Returns up to limit titles that start with prefix, ignoring case.
+
+        The completion index is built on first use and shared by every
+        library.
+        """
+        if self._title_completions is None:
+            self._title_completions = PrefixIndex(self._titles)
+        return self._title_completions.complete(prefix, limit)
+
+    def complete_tags(self, prefix, limit):
+        """Returns up to limit distinct tags that start with prefix."""
+        if self._tag_completions is None:
+            self._tag_completions = PrefixIndex(self._tag_names)
+        return self._tag_completions.complete(prefix, limit)
+
+    def rank(self, query, limit):
+        """Returns the rows that best match the words of query.
+
+        Titles and tags are ranked together with BM25. The ranking index is
+        built or loaded with the catalog, or on first use if the catalog
+        was built without it, and shared by every library.
+
+        Args:
+            query: Free text.
+            limit: The maximum number of rows to return.
+
+        Returns:
+            A list of row indexes, best match first.
+        """
+        if self._ranking is None:
+            self._ranking = BM25Index([
+                tokenize(self._titles[index])
+                + tokenize(" ".join(self.tags(index)))
+                for index in range(len(self._video_ids))])
+        return self._ranking.top(query, limit)
+
+
+_catalogs = {}
+
+_LOAD_SECONDS = REGISTRY.histogram(
+    "yt_catalog_load_seconds",
+    "Time taken to load a catalog and build its indexes.").labels()
+
+
+def get_catalog(catalog_path):
+    """Returns the shared catalog loaded from a file.
+
+    Each file is loaded once per process, from its snapshot and the search
+    indexes stored there when the snapshot is current. It is loaded again
+    when its size or mtime has changed since the cached catalog was built.
+
+    Args:
+        catalog_path: The path of the text catalog.
+    """
+    key = os.path.realpath(catalog_path)
+    stat = os.stat(key)
+    version = (stat.st_size, stat.st_mtime_ns)
+    cached = _catalogs.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    start = time.perf_counter()
+    catalog = Catalog.from_columns(load_columns(Path(key)))
+    _LOAD_SECONDS.record(time.perf_counter() - start)
+    _catalogs[key] = (version, catalog)
+    return catalog
+
+
+def clear_catalogs():
+    """Forgets every cached catalog, forcing the next lookup to reload."""
+    _catalogs.clear()
@@ -0,0 +1,381 @@
+"""Reading the video catalog, and its compiled binary snapshot.
+
+The text catalog has one video per line, `title | video_id | tag, tag`.
+Parsing it and building its search indexes on every start-up is slow for
+large catalogs, so the built catalog can be compiled into a snapshot:
+
+    header      magic, version, the source file's size, mtime and digest,
+                and the number of sections
+    lengths     the size in bytes of every section
+    sections    the catalog's columns, search indexes and BM25 ranking, as
+                arrays of little-endian 32-bit integers and 64-bit floats
+                and tables of UTF-8 strings
+
+Loading a snapshot maps the file into memory. The numeric arrays, which
+include every posting list of the search indexes and the ranking weights,
+are used in place without being copied or parsed, and only the strings are
+decoded.
+
+Build the snapshot next to videos.txt with `python3 -m src.catalog_snapshot`.
+"""
+
+from .ranking import BM25Index
+from .ranking import tokenize
+from .search_index import TrigramIndex
+from array import array
+from itertools import accumulate
+from pathlib import Path
+import csv
+import hashlib
+import mmap
+import os
+import struct
+import sys
+
+MAGIC = b"YTCS"
+VERSION = 3
+
+_HEADER = struct.Struct("<4sHQq32sI")
+
+
+class CatalogColumns:
+    """A class used to hold the columns and search indexes of a catalog.
+
+    Rows are addressed by their index. The tags of row i are the tag ids
+    `tag_refs[tag_offsets[i]:tag_offsets[i + 1]]` into tag_names. The
+    title_postings map every n-gram of the case-folded titles to the sorted
+    rows whose title contains it, and tag_rows[i] holds the sorted rows
+    with a tag that folds to folded_tags[i]. Integer columns are arrays, or
+    memoryviews when they come from a snapshot.
+    """
+
+    __slots__ = ("video_ids", "titles", "tag_names", "tag_refs",
+                 "tag_offsets", "title_postings", "folded_tags", "tag_rows",
+                 "ranking")
+
+    def __init__(self, video_ids, titles, tag_names, tag_refs, tag_offsets,
+                 title_postings, folded_tags, tag_rows, ranking):
+        """CatalogColumns constructor.
+
+        Args:
+            video_ids: The video id of every row.
+            titles: The title of every row.
+            tag_names: The distinct tag names.
+            tag_refs: The tag ids of every row, one row after the other.
+            tag_offsets: Where the tag ids of each row start in tag_refs,
+                plus their end.
+            title_postings: A dict mapping n-grams to rows, or None when
+                the titles are not indexed.
+            folded_tags: The distinct case-folded tags.
+            tag_rows: The rows of every folded tag.
+            ranking: The BM25Index of the titles and tags, or None when
+                they are not ranked.
+        """
+        self.video_ids = video_ids
+        self.titles = titles
+        self.tag_names = tag_names
+        self.tag_refs = tag_refs
+        self.tag_offsets = tag_offsets
+        self.title_postings = title_postings
+        self.folded_tags = folded_tags
+        self.tag_rows = tag_rows
+        self.ranking = ranking
+
+
+# Helper Wrapper around CSV reader to strip whitespace from around
+# each item.
+def _csv_reader_with_strip(reader):
+    yield from ((item.strip() for item in line) for line in reader)
+
+
+def read_text_catalog(source_path):
+    """Parses a text catalog.
+
+    Args:
+        source_path: The path of the videos.txt style file.
+
+    Returns:
+        A list of (title, video_id, tags) tuples, tags being a tuple.
+    """
+    rows = []
+    with open(source_path) as video_file:
+        reader = _csv_reader_with_strip(
+            csv.reader(video_file, delimiter="|"))
+        for video_info in reader:
+            title, url, tags = video_info
+            rows.append((
+                title,
+                url,
+                tuple(tag.strip() for tag in tags.split(",")) if tags else (),
+            ))
+    return rows
+
+
+def build_columns(rows, build_indexes=True, build_ranking=True):
+    """Builds the columns and search indexes of a catalog.
+
+    Args:
+        rows: An iterable of (title, video_id, tags) tuples.
+        build_indexes: Whether to build the title and tag search indexes.
+        build_ranking: Whether to build the BM25 ranking of titles and
+            tags.
+
+    Returns:
+        A CatalogColumns.
+    """
+    video_ids = []
+    titles = []
+    tag_names = []
+    tag_ids = {}
+    tag_refs = array("I")
+    tag_offsets = array("I", [0])
+    folded_tags = []
+    folded_tag_ids = {}
+    tag_rows = []
+    ranked_words = []
+    for title, video_id, tags in rows:
+        index = len(video_ids)
+        video_ids.append(sys.intern(video_id))
+        titles.append(sys.intern(title))
+        if build_ranking:
+            ranked_words.append(tokenize(title) + tokenize(" ".join(tags)))
+        for tag in tags:
+            tag_id = tag_ids.get(tag)
+            if tag_id is None:
+                tag_id = len(tag_names)
+                tag_ids[tag] = tag_id
+                tag_names.append(sys.intern(tag))
+            tag_refs.append(tag_id)
+            if not build_indexes:
+                continue
+            folded_tag = tag.lower()
+            folded_tag_id = folded_tag_ids.get(folded_tag)
+            if folded_tag_id is None:
+                folded_tag_id = len(folded_tags)
+                folded_tag_ids[folded_tag] = folded_tag_id
+                folded_tags.append(folded_tag)
+                tag_rows.append(array("I"))
+            rows_with_tag = tag_rows[folded_tag_id]
+            # A video may have the same tag twice in different cases.
+            if not rows_with_tag or rows_with_tag[-1] != index:
+                rows_with_tag.append(index)
+        tag_offsets.append(len(tag_refs))
+    title_postings = None
+    if build_indexes:
+        title_postings = TrigramIndex(titles).postings()
+    ranking = BM25Index(ranked_words) if build_ranking else None
+    return CatalogColumns(video_ids, titles, tag_names, tag_refs,
+                          tag_offsets, title_postings, folded_tags, tag_rows,
+                          ranking)
+
+
+def snapshot_path_for(source_path):
+    """Returns the default snapshot path for a text catalog."""
+    return Path(source_path).with_suffix(".snap")
+
+
+def _digest(source_path):
+    with open(source_path, "rb") as source_file:
+        return hashlib.sha256(source_file.read()).digest()
+
+
+def _number_section(typecode, values):
+    values = array(typecode, values)
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values.tobytes()
+
+
+def _int_section(values):
+    return _number_section("I", values)
+
+
+def _float_section(values):
+    return _number_section("d", values)
+
+
+def _string_sections(strings):
+    """Returns the (offsets, UTF-8 text) sections of a string table."""
+    encoded = [string.encode("utf-8") for string in strings]
+    offsets = accumulate(map(len, encoded), initial=0)
+    return [_int_section(offsets), b"".join(encoded)]
+
+
+def _posting_sections(postings):
+    """Returns the (offsets, rows) sections of a list of postings."""
+    offsets = accumulate(map(len, postings), initial=0)
+    rows = array("I")
+    for posting in postings:
+        rows.extend(posting)
+    return [_int_section(offsets), _int_section(rows)]
+
+
+def build_snapshot(source_path, snapshot_path=None):
+    """Compiles a text catalog into a snapshot file.
+
+    Args:
+        source_path: The path of the text catalog.
+        snapshot_path: Where to write the snapshot. Defaults to the source
+            path with a .snap suffix.
+
+    Returns:
+        The path of the written snapshot.
+    """
+    source_path = Path(source_path)
+    if snapshot_path is None:
+        snapshot_path = snapshot_path_for(source_path)
+    stat = source_path.stat()
+    columns = build_columns(read_text_catalog(source_path))
+    grams = sorted(columns.title_postings)
+    terms, offsets, documents, weights = columns.ranking.postings()
+
+    sections = (
+        _string_sections(columns.video_ids)
+        + _string_sections(columns.titles)
+        + _string_sections(columns.tag_names)
+        + [_int_section(columns.tag_refs), _int_section(columns.tag_offsets)]
+        + _string_sections(grams)
+        + _posting_sections([columns.title_postings[gram] for gram in grams])
+        + _string_sections(columns.folded_tags)
+        + _posting_sections(columns.tag_rows)
+        + _string_sections(terms)
+        + [_int_section(offsets), _int_section(documents),
+           _float_section(weights)])
+    header = _HEADER.pack(
+        MAGIC, VERSION, stat.st_size, stat.st_mtime_ns, _digest(source_path),
+        len(sections))
+    lengths = struct.pack(f"<{len(sections)}Q", *map(len, sections))
+    # Write to a temporary file first so that readers never see a
+    # half-written snapshot.
+    temporary_path = Path(str(snapshot_path) + ".tmp")
+    with open(temporary_path, "wb") as snapshot_file:
+        snapshot_file.write(header + lengths)
+        snapshot_file.writelines(sections)
+    os.replace(temporary_path, snapshot_path)
+    return Path(snapshot_path)
+
+
+def _numbers(typecode, section):
+    if sys.byteorder != "little":
+        values = array(typecode, section)
+        values.byteswap()
+        return values
+    return section.cast(typecode)
+
+
+def _ints(section):
+    return _numbers("I", section)
+
+
+def _floats(section):
+    return _numbers("d", section)
+
+
+def _strings(offsets, text):
+    """Decodes a string table from its (offsets, UTF-8 text) sections."""
+    offsets = _ints(offsets)
+    decoded = str(text, "utf-8")
+    if len(decoded) == len(text):
+        # Pure ASCII: byte offsets are character offsets too.
+        return [decoded[start:end]
+                for start, end in zip(offsets, offsets[1:])]
+    return [str(text[start:end], "utf-8")
+            for start, end in zip(offsets, offsets[1:])]
+
+
+def _postings(offsets, rows):
+    offsets = _ints(offsets)
+    rows = _ints(rows)
+    return [rows[start:end] for start, end in zip(offsets, offsets[1:])]
+
+
+def read_snapshot(source_path, snapshot_path=None):
+    """Loads the columns of a catalog from its snapshot if it is up to date.
+
+    The snapshot is current when the source file's size and mtime match the
+    ones recorded at build time or, failing that, when its content digest
+    still matches.
+
+    Args:
+        source_path: The path of the text catalog.
+        snapshot_path: The snapshot to load. Defaults to the source path
+            with a .snap suffix.
+
+    Returns:
+        A CatalogColumns, or None if the snapshot is missing, stale or
+        unreadable.
+    """
+    if snapshot_path is None:
+        snapshot_path = snapshot_path_for(source_path)
+    try:
+        with open(snapshot_path, "rb") as snapshot_file:
+            data = mmap.mmap(
+                snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, source_size, source_mtime_ns, source_digest,
+         section_count) = _HEADER.unpack_from(data)
+        stat = os.stat(source_path)
+    except (OSError, ValueError, struct.error):
+        return None
+    if magic != MAGIC or version != VERSION:
+        return None
+    if (stat.st_size, stat.st_mtime_ns) != (source_size, source_mtime_ns):
+        if stat.st_size != source_size or _digest(source_path) != source_digest:
+            return None
+
+    try:
+        lengths = struct.unpack_from(
+            f"<{section_count}Q", data, _HEADER.size)
+        start = _HEADER.size + 8 * section_count
+        if len(data) != start + sum(lengths):
+            return None
+        view = memoryview(data)
+        sections = []
+        for length in lengths:
+            sections.append(view[start:start + length])
+            start += length
+        (video_ids, titles, tag_names, (tag_refs, tag_offsets), grams,
+         title_postings, folded_tags, tag_rows, terms) = (
+            sections[i:i + 2] for i in range(0, 18, 2))
+        offsets, documents, weights = sections[18:]
+        video_ids = _strings(*video_ids)
+        return CatalogColumns(
+            video_ids,
+            _strings(*titles),
+            _strings(*tag_names),
+            _ints(tag_refs),
+            _ints(tag_offsets),
+            dict(zip(_strings(*grams), _postings(*title_postings))),
+            _strings(*folded_tags),
+            _postings(*tag_rows),
+            BM25Index.from_postings(
+                len(video_ids), _strings(*terms), _ints(offsets),
+                _ints(documents), _floats(weights)))
+    except (ValueError, TypeError, struct.error):
+        return None
+
+
+def load_columns(source_path, build_indexes=True):
+    """Returns the columns of a catalog, from its snapshot when current.
+
+    Args:
+        source_path: The path of the text catalog.
+        build_indexes: Whether to build the search indexes when the text
+            catalog has to be parsed. A snapshot always has them, but they
+            cost nothing until they are searched. The ranking is always
+            built.
+
+    Returns:
+        A CatalogColumns.
+    """
+    columns = read_snapshot(source_path)
+    if columns is None:
+        columns = build_columns(read_text_catalog(source_path), build_indexes)
+    return columns
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        source = Path(sys.argv[1])
+    else:
+        source = Path(__file__).parent / "videos.txt"
+    print("Wrote snapshot: " + str(build_snapshot(source)))
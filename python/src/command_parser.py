@@ -1,7 +1,10 @@
 """A command parser class."""
 
-import textwrap
+from .command_stats import CommandStats
+from time import perf_counter
 from typing import Sequence
+import cProfile
+import textwrap
 
 
 class CommandException(Exception):
@@ -9,137 +12,301 @@ class CommandException(Exception):
     pass
 
 
+class _Command:
+    """A class used to describe how a command verb is checked and run."""
+
+    __slots__ = ("method", "arities", "usage", "convert")
+
+    def __init__(self, method, arities=None, usage=None, convert=None):
+        """_Command constructor.
+
+        Args:
+            method: The name of the VideoPlayer method that runs the command.
+            arities: The allowed numbers of arguments. None means the
+                command takes no arguments and ignores any that are given.
+            usage: The CommandException message for invalid arguments.
+            convert: An optional function that turns the argument list into
+                the method's arguments, returning None if they are invalid.
+        """
+        self.method = method
+        self.arities = arities
+        self.usage = usage
+        self.convert = convert
+
+
+def _playlist_and_ids(arguments):
+    return [arguments[0], arguments[1:]]
+
+
+def _number_arguments(arguments):
+    if not all(argument.isdigit() for argument in arguments):
+        return None
+    return [int(argument) for argument in arguments]
+
+
+def _joined_arguments(arguments):
+    return [" ".join(arguments)]
+
+
+def _completion_arguments(arguments):
+    if len(arguments) == 3:
+        if not arguments[2].isdigit():
+            return None
+        return [arguments[0], arguments[1], int(arguments[2])]
+    return arguments
+
+
+# Allow one or two or more arguments. Membership in a range is constant
+# time.
+_ANY_AFTER_ONE = range(1, 2**31)
+_ANY_AFTER_TWO = range(2, 2**31)
+
+_COMMANDS = {
+    "NUMBER_OF_VIDEOS": _Command("number_of_videos"),
+    "SHOW_ALL_VIDEOS": _Command(
+        "show_all_videos", (0, 1, 2),
+        "Please enter SHOW_ALL_VIDEOS command optionally followed by a "
+        "limit and an offset.",
+        _number_arguments),
+    "PLAY": _Command(
+        "play_video", (1,),
+        "Please enter PLAY command followed by video_id."),
+    "PLAY_RANDOM": _Command("play_random_video"),
+    "STOP": _Command("stop_video"),
+    "PAUSE": _Command("pause_video"),
+    "CONTINUE": _Command("continue_video"),
+    "SHOW_PLAYING": _Command("show_playing"),
+    "CREATE_PLAYLIST": _Command(
+        "create_playlist", (1,),
+        "Please enter CREATE_PLAYLIST command followed by a "
+        "playlist name."),
+    "ADD_TO_PLAYLIST": _Command(
+        "add_to_playlist", (2,),
+        "Please enter ADD_TO_PLAYLIST command followed by a "
+        "playlist name and video_id to add."),
+    "REMOVE_FROM_PLAYLIST": _Command(
+        "remove_from_playlist", (2,),
+        "Please enter REMOVE_FROM_PLAYLIST command followed by a "
+        "playlist name and video_id to remove."),
+    "CLEAR_PLAYLIST": _Command(
+        "clear_playlist", (1,),
+        "Please enter CLEAR_PLAYLIST command followed by a "
+        "playlist name."),
+    "DELETE_PLAYLIST": _Command(
+        "delete_playlist", (1,),
+        "Please enter DELETE_PLAYLIST command followed by a "
+        "playlist name."),
+    "SHOW_PLAYLIST": _Command(
+        "show_playlist", (1,),
+        "Please enter SHOW_PLAYLIST command followed by a "
+        "playlist name."),
+    "SHOW_ALL_PLAYLISTS": _Command("show_all_playlists"),
+    "SEARCH_VIDEOS": _Command(
+        "search_videos", (1, 2),
+        "Please enter SEARCH_VIDEOS command followed by a "
+        "search term and an optional result number."),
+    "SEARCH_VIDEOS_WITH_TAG": _Command(
+        "search_videos_tag", (1, 2),
+        "Please enter SEARCH_VIDEOS_WITH_TAG command followed by a "
+        "video tag and an optional result number."),
+    "SEARCH_RANKED": _Command(
+        "search_videos_ranked", _ANY_AFTER_ONE,
+        "Please enter SEARCH_RANKED command followed by one or more "
+        "search words.",
+        _joined_arguments),
+    "PLAY_RESULT": _Command(
+        "play_result", (1, 2),
+        "Please enter PLAY_RESULT command followed by a result number "
+        "and an optional search number.",
+        _number_arguments),
+    "FLAG_VIDEO": _Command(
+        "flag_video", (1, 2),
+        "Please enter FLAG_VIDEO command followed by a "
+        "video_id and an optional flag reason."),
+    "ADD_MANY_TO_PLAYLIST": _Command(
+        "add_many_to_playlist", _ANY_AFTER_TWO,
+        "Please enter ADD_MANY_TO_PLAYLIST command followed by a "
+        "playlist name and the video_ids to add.",
+        _playlist_and_ids),
+    "REMOVE_MANY_FROM_PLAYLIST": _Command(
+        "remove_many_from_playlist", _ANY_AFTER_TWO,
+        "Please enter REMOVE_MANY_FROM_PLAYLIST command followed by a "
+        "playlist name and the video_ids to remove.",
+        _playlist_and_ids),
+    "FLAG_VIDEOS_FROM_FILE": _Command(
+        "flag_videos_from_file", (1, 2),
+        "Please enter FLAG_VIDEOS_FROM_FILE command followed by a "
+        "file of video_ids and an optional flag reason."),
+    "ALLOW_VIDEO": _Command(
+        "allow_video", (1,),
+        "Please enter ALLOW_VIDEO command followed by a "
+        "video_id."),
+    "COMPLETE": _Command(
+        "complete", (2, 3),
+        "Please enter COMPLETE command followed by TITLE, TAG or "
+        "PLAYLIST, a prefix and an optional number of completions.",
+        _completion_arguments),
+}
+
+# The verbs that read files on the machine that runs the parser. Front
+# ends serving other machines, like src.server, must not accept them.
+LOCAL_COMMANDS = frozenset({"FLAG_VIDEOS_FROM_FILE"})
+
+
 class CommandParser:
-    """A class used to parse and execute a user Command."""
+    """A class used to parse and execute a user Command.
+
+    Every command that runs is counted in `stats`, see get_stats. One verb
+    at a time can also be run under cProfile, see profile_command.
+    """
+
+    def __init__(self, video_player, commands=None, sample_every=64):
+        """CommandParser constructor.
 
-    def __init__(self, video_player):
+        Args:
+            video_player: The VideoPlayer that runs the commands.
+            commands: The verbs to accept, or None to accept all of them.
+                Other verbs are treated as unknown and left out of HELP.
+                HELP and STATS are always accepted.
+            sample_every: Time one call in this many of each verb, see
+                CommandStats.
+        """
         self._player = video_player
+        self.stats = CommandStats(sample_every)
+        # Bind every handler, its argument checks and its counters once, so
+        # that running a command costs a single dict lookup instead of a
+        # chain of verb comparisons.
+        handlers = {
+            verb: (getattr(video_player, spec.method), spec)
+            for verb, spec in _COMMANDS.items()
+            if commands is None or verb in commands}
+        handlers["HELP"] = (self._get_help, _Command("_get_help"))
+        handlers["STATS"] = (self._show_stats, _Command("_show_stats"))
+        self._handlers = {
+            verb: (handler, spec.arities, spec.convert, spec,
+                   self.stats.counters(verb))
+            for verb, (handler, spec) in handlers.items()}
+        self._profiled_verb = None
+        self._profiled_entry = None
+        self._profile_path = None
+        self._profiler = None
+
+    def commands(self):
+        """Returns the command verbs in alphabetical order."""
+        return sorted(self._handlers)
 
     def execute_command(self, command: Sequence[str]):
         """Executes the user command. Expects the command to be upper case.
            Raises CommandException if a command cannot be parsed.
         """
-        if not command:
+        try:
+            handler, arities, convert, spec, counters = (
+                self._handlers[command[0].upper()])
+        except IndexError:
             raise CommandException(
                 "Please enter a valid command, "
-                "type HELP for a list of available commands.")
-
-        if command[0].upper() == "NUMBER_OF_VIDEOS":
-            self._player.number_of_videos()
-
-        elif command[0].upper() == "SHOW_ALL_VIDEOS":
-            self._player.show_all_videos()
-
-        elif command[0].upper() == "PLAY":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter PLAY command followed by video_id.")
-            self._player.play_video(command[1])
-
-        elif command[0].upper() == "PLAY_RANDOM":
-            self._player.play_random_video()
-
-        elif command[0].upper() == "STOP":
-            self._player.stop_video()
-
-        elif command[0].upper() == "PAUSE":
-            self._player.pause_video()
-
-        elif command[0].upper() == "CONTINUE":
-            self._player.continue_video()
-
-        elif command[0].upper() == "SHOW_PLAYING":
-            self._player.show_playing()
-
-        elif command[0].upper() == "CREATE_PLAYLIST":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter CREATE_PLAYLIST command followed by a "
-                    "playlist name.")
-            self._player.create_playlist(command[1])
-
-        elif command[0].upper() == "ADD_TO_PLAYLIST":
-            if len(command) != 3:
-                raise CommandException(
-                    "Please enter ADD_TO_PLAYLIST command followed by a "
-                    "playlist name and video_id to add.")
-            self._player.add_to_playlist(command[1], command[2])
-
-        elif command[0].upper() == "REMOVE_FROM_PLAYLIST":
-            if len(command) != 3:
-                raise CommandException(
-                    "Please enter REMOVE_FROM_PLAYLIST command followed by a "
-                    "playlist name and video_id to remove.")
-            self._player.remove_from_playlist(command[1], command[2])
-
-        elif command[0].upper() == "CLEAR_PLAYLIST":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter CLEAR_PLAYLIST command followed by a "
-                    "playlist name.")
-            self._player.clear_playlist(command[1])
-
-        elif command[0].upper() == "DELETE_PLAYLIST":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter DELETE_PLAYLIST command followed by a "
-                    "playlist name.")
-            self._player.delete_playlist(command[1])
-
-        elif command[0].upper() == "SHOW_PLAYLIST":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter SHOW_PLAYLIST command followed by a "
-                    "playlist name.")
-            self._player.show_playlist(command[1])
-
-        elif command[0].upper() == "SHOW_ALL_PLAYLISTS":
-            self._player.show_all_playlists()
-
-        elif command[0].upper() == "SEARCH_VIDEOS":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter SEARCH_VIDEOS command followed by a "
-                    "search term.")
-            self._player.search_videos(command[1])
-
-        elif command[0].upper() == "SEARCH_VIDEOS_WITH_TAG":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter SEARCH_VIDEOS_WITH_TAG command followed by a "
-                    "video tag.")
-            self._player.search_videos_tag(command[1])
-
-        elif command[0].upper() == "FLAG_VIDEO":
-            if len(command) == 3:
-                self._player.flag_video(command[1], command[2])
-            elif len(command) == 2:
-                self._player.flag_video(command[1])
-            else:
-                raise CommandException(
-                    "Please enter FLAG_VIDEO command followed by a "
-                    "video_id and an optional flag reason.")
-
-        elif command[0].upper() == "ALLOW_VIDEO":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter ALLOW_VIDEO command followed by a "
-                    "video_id.")
-            self._player.allow_video(command[1])
-
-        elif command[0].upper() == "HELP":
-            self._get_help()
-        else:
-            print(
+                "type HELP for a list of available commands.") from None
+        except KeyError:
+            self._player._print(
                 "Please enter a valid command, type HELP for a list of "
                 "available commands.")
+            return
+
+        skip = counters[0]
+        if arities is None:
+            if skip:
+                counters[0] = skip - 1
+                handler()
+                return
+            arguments = ()
+        else:
+            arguments = command[1:]
+            if len(arguments) not in arities:
+                raise CommandException(spec.usage)
+            if convert is not None:
+                arguments = convert(arguments)
+                if arguments is None:
+                    raise CommandException(spec.usage)
+            if skip:
+                counters[0] = skip - 1
+                handler(*arguments)
+                return
+        player = self._player
+        lines = player.lines_printed
+        start = perf_counter()
+        try:
+            handler(*arguments)
+        finally:
+            self.stats.record(counters, perf_counter() - start,
+                              player.lines_printed - lines)
+
+    def get_stats(self):
+        """Returns the counters of the commands run so far.
+
+        Returns:
+            A dict mapping each verb that has run to a dict with its number
+            of calls, its total and maximum wall time in seconds and the
+            number of output lines it printed, see CommandStats.get.
+        """
+        return self.stats.get()
+
+    def profile_command(self, verb, path):
+        """Runs every later use of a command under cProfile.
+
+        The statistics, accumulated over all the profiled runs, are written
+        to a file after each run, ready for the pstats module.
+
+        Args:
+            verb: The command to profile, or None to stop profiling.
+            path: The file the statistics are written to.
+        """
+        if self._profiled_verb is not None:
+            self._handlers[self._profiled_verb] = self._profiled_entry
+        self._profiled_verb = None
+        self._profiler = None
+        entry = None if verb is None else self._handlers.get(verb.upper())
+        if entry is None:
+            return
+        # Swap in a profiling handler, so that other commands pay nothing.
+        handler = entry[0]
+
+        def profiled_handler(*arguments):
+            self._run_profiled(handler, arguments)
+
+        self._profiled_verb = verb.upper()
+        self._profiled_entry = entry
+        self._profile_path = path
+        self._profiler = cProfile.Profile()
+        self._handlers[self._profiled_verb] = (profiled_handler,) + entry[1:]
+
+    def _run_profiled(self, handler, arguments):
+        self._profiler.enable()
+        try:
+            handler(*arguments)
+        finally:
+            self._profiler.disable()
+            self._profiler.dump_stats(self._profile_path)
+
+    def _show_stats(self):
+        """Displays the counters of the commands run so far."""
+        stats = self.stats.get()
+        if not stats:
+            self._player._print("No commands have run yet")
+            return
+        self._player._print("Command statistics:" + "".join(
+            f"\n  {verb}: {counters['calls']} calls, "
+            f"{counters['total_seconds'] * 1e3:.3f} ms total, "
+            f"{counters['p99_seconds'] * 1e3:.3f} ms p99, "
+            f"{counters['max_seconds'] * 1e3:.3f} ms max, "
+            f"{counters['output_lines']} lines"
+            for verb, counters in sorted(stats.items())))
 
     def _get_help(self):
         """Displays all available commands to the user."""
         help_text = textwrap.dedent("""
         Available commands:
             NUMBER_OF_VIDEOS - Shows how many videos are in the library.
-            SHOW_ALL_VIDEOS - Lists all videos from the library.
+            SHOW_ALL_VIDEOS [limit] [offset] - Lists all videos from the library, optionally one page at a time.
             PLAY <video_id> - Plays specified video.
             PLAY_RANDOM - Plays a random video from the library.
             STOP - Stop the current video.
@@ -153,11 +320,26 @@ class CommandParser:
             DELETE_PLAYLIST <playlist_name> - Deletes the playlist.
             SHOW_PLAYLIST <playlist_name> - List all the videos in this playlist.
             SHOW_ALL_PLAYLISTS - Display all the available playlists.
-            SEARCH_VIDEOS <search_term> - Display all the videos whose titles contain the search_term.
-            SEARCH_VIDEOS_WITH_TAG <tag_name> -Display all videos whose tags contains the provided tag.
+            SEARCH_VIDEOS <search_term> [number] - Display all the videos whose titles contain the search_term, optionally playing result number.
+            SEARCH_VIDEOS_WITH_TAG <tag_name> [number] -Display all videos whose tags contains the provided tag, optionally playing result number.
+            SEARCH_RANKED <word>... - Display the videos whose titles and tags best match the words, most relevant first.
+            PLAY_RESULT <number> [search] - Plays a video listed by the latest search, or by an earlier search of this session.
             FLAG_VIDEO <video_id> <flag_reason> - Mark a video as flagged.
             ALLOW_VIDEO <video_id> - Removes a flag from a video.
+            ADD_MANY_TO_PLAYLIST <playlist_name> <video_id>... - Adds several videos to the playlist.
+            REMOVE_MANY_FROM_PLAYLIST <playlist_name> <video_id>... - Removes several videos from the playlist.
+            FLAG_VIDEOS_FROM_FILE <file> <flag_reason> - Flags every video whose id is listed in the file.
+            COMPLETE <TITLE|TAG|PLAYLIST> <prefix> [number] - Lists the titles, tags or playlist names that start with the prefix.
+            STATS - Displays how often each command ran, how long it took and how much it printed.
             HELP - Displays help.
             EXIT - Terminates the program execution.
         """)
-        print(help_text)
+        # Leave out the verbs this parser does not accept.
+        lines = []
+        for line in help_text.split("\n"):
+            words = line.split(None, 1)
+            if (words and words[0] in _COMMANDS
+                    and words[0] not in self._handlers):
+                continue
+            lines.append(line)
+        self._player._print("\n".join(lines))
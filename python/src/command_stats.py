@@ -0,0 +1,113 @@
+"""Counters of the commands run by a CommandParser."""
+
+from .metrics import Histogram
+from .metrics import REGISTRY
+
+
+class CommandStats:
+    """A class used to count calls, time and output per command verb.
+
+    Every call is counted, but reading the clock costs more than
+    dispatching a command, so only one call in every sample_every of each
+    verb, starting with the first, is timed and has its output lines
+    counted. Total time and output lines are estimated from those calls.
+    The calls in between only take one from a countdown, see counters.
+    Every CommandStats has histograms of its own, so its percentiles only
+    cover the commands it counted. See export to publish them as a metric.
+    """
+
+    def __init__(self, sample_every=64):
+        """CommandStats constructor.
+
+        Args:
+            sample_every: Time one call in this many of each verb, at
+                least 1. 1 times every call, making the totals exact.
+        """
+        if sample_every < 1:
+            raise ValueError("sample_every must be at least 1")
+        self.sample_every = sample_every
+        self._verbs = {}
+
+    def __len__(self):
+        return sum(1 for counters in self._verbs.values() if counters[1])
+
+    def counters(self, verb):
+        """Returns the [skip, timed calls, output lines, histogram] of a verb.
+
+        The list stays the same for the life of the CommandStats, so a
+        caller can keep it. While skip is above zero, the caller runs the
+        verb untimed and takes one from skip. Otherwise it times the verb
+        and passes the result to record, which resets skip.
+
+        Args:
+            verb: The command verb, in upper case.
+        """
+        counters = self._verbs.get(verb)
+        if counters is None:
+            counters = self._verbs[verb] = [0, 0, 0, Histogram()]
+        return counters
+
+    def record(self, counters, seconds, lines):
+        """Counts a timed call of a command, once it has finished.
+
+        Args:
+            counters: The list returned by counters for its verb.
+            seconds: The wall time the command took.
+            lines: The number of output lines it printed.
+        """
+        counters[0] = self.sample_every - 1
+        counters[1] += 1
+        counters[2] += lines
+        counters[3].record(seconds)
+
+    def get(self):
+        """Returns the counters of every verb that has run.
+
+        Returns:
+            A dict mapping each verb to a dict with its number of calls and
+            of timed calls, its total, maximum and 99th percentile wall
+            time in seconds and the number of output lines it printed. The
+            maximum and percentile are those of the timed calls, and the
+            total time and lines are estimated from them.
+        """
+        stats = {}
+        for verb, (skip, timed, lines, histogram) in self._verbs.items():
+            if not timed:
+                continue
+            calls = timed * self.sample_every - skip
+            scale = calls / timed
+            stats[verb] = {
+                "calls": calls,
+                "timed_calls": timed,
+                "total_seconds": histogram.sum * scale,
+                "max_seconds": histogram.max,
+                "p99_seconds": histogram.quantile(0.99),
+                "output_lines": round(lines * scale),
+            }
+        return stats
+
+    def reset(self):
+        """Sets every counter back to zero."""
+        for counters in self._verbs.values():
+            counters[:] = [0, 0, 0, Histogram()]
+
+    def export(self, registry=REGISTRY):
+        """Publishes the latency histograms as yt_command_duration_seconds.
+
+        A front end calls this for the parser that serves its users. It
+        replaces any CommandStats exported before. Only the timed calls are
+        counted, and after reset the counts start again from zero.
+
+        Args:
+            registry: The MetricsRegistry to publish to.
+        """
+        registry.histogram_source(
+            "yt_command_duration_seconds",
+            f"Wall time taken to run a command, timed for one call in "
+            f"every {self.sample_every} of each verb.",
+            ["verb"], self._histograms)
+
+    def _histograms(self):
+        return [((verb,), counters[3])
+                for verb, counters in list(self._verbs.items())
+                if counters[1]]
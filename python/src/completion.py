@@ -0,0 +1,64 @@
+"""A sorted-array index for prefix completion."""
+
+import bisect
+
+
+class PrefixIndex:
+    """A class used to complete case-insensitive prefixes.
+
+    Words are kept in two parallel lists sorted by their case-folded form.
+    A lookup bisects to the first word that could match and then reads
+    matches off in order, so it costs O(len(prefix) * log n + k) for k
+    results, never a scan of the whole index.
+    """
+
+    def __init__(self, words=()):
+        """PrefixIndex constructor.
+
+        Args:
+            words: The words to index.
+        """
+        pairs = sorted((word.lower(), word) for word in words)
+        self._keys = [key for key, _ in pairs]
+        self._words = [word for _, word in pairs]
+
+    def __len__(self):
+        return len(self._words)
+
+    def add(self, word):
+        """Indexes a word."""
+        key = word.lower()
+        position = bisect.bisect_right(self._keys, key)
+        self._keys.insert(position, key)
+        self._words.insert(position, word)
+
+    def discard(self, word):
+        """Removes a word if it is indexed."""
+        key = word.lower()
+        position = bisect.bisect_left(self._keys, key)
+        while position < len(self._keys) and self._keys[position] == key:
+            if self._words[position] == word:
+                del self._keys[position]
+                del self._words[position]
+                return
+            position += 1
+
+    def complete(self, prefix, limit=10):
+        """Returns up to limit words starting with prefix, ignoring case.
+
+        Args:
+            prefix: The text to complete.
+            limit: The maximum number of words to return.
+
+        Returns:
+            A list of the matching words in case-folded alphabetical order.
+        """
+        prefix = prefix.lower()
+        keys = self._keys
+        position = bisect.bisect_left(keys, prefix)
+        end = min(position + limit, len(keys))
+        matches = []
+        while position < end and keys[position].startswith(prefix):
+            matches.append(self._words[position])
+            position += 1
+        return matches
@@ -0,0 +1,346 @@
+"""Histograms and counters, exported in the Prometheus text format.
+
+Metrics are registered once, usually at import time, in the process-wide
+REGISTRY. Recording a value is plain arithmetic on preallocated storage,
+with no locks, so it is cheap on the single-threaded command path and a
+histogram never grows. The registry can be rendered at any time, written
+to a file or served over HTTP from a background thread.
+
+Histograms record in fine logarithmic buckets but are exported with a
+fixed list of `le` bounds per metric, so every scrape has the same series.
+"""
+
+from array import array
+import http.server
+import math
+import os
+import threading
+
+# Histograms split every power of two into this many equal buckets, so a
+# value is known to within 1/_SUB_BUCKETS of itself.
+_SUB_BUCKETS = 8
+# Values below 2**_MIN_EXPONENT (about a nanosecond) share the first bucket
+# and values above 2**_MAX_EXPONENT share the last one.
+_MIN_EXPONENT = -30
+_MAX_EXPONENT = 40
+_BUCKETS = (_MAX_EXPONENT - _MIN_EXPONENT) * _SUB_BUCKETS
+# With value == mantissa * 2**exponent and 0.5 <= mantissa < 1, the bucket
+# of a value is exponent * _SUB_BUCKETS + int(mantissa * 2 * _SUB_BUCKETS)
+# plus this offset, minus one if the value is the upper edge of a bucket:
+# like Prometheus `le` bounds, buckets include their upper edge.
+_BUCKET_OFFSET = -(_MIN_EXPONENT + 1) * _SUB_BUCKETS
+_DOUBLE_SUB = 2 * _SUB_BUCKETS
+
+_frexp = math.frexp
+
+# Export bounds of histograms of durations, from about a microsecond to a
+# minute, and of histograms of counts, from one to about 16 million. Powers
+# of two are bucket edges, so their cumulative counts are exact.
+SECONDS_BOUNDS = tuple(2.0 ** exponent for exponent in range(-20, 7))
+COUNT_BOUNDS = tuple(2.0 ** exponent for exponent in range(25))
+
+
+def _bucket_of(value):
+    """Returns the bucket of a value, as Histogram.record computes it."""
+    if value <= 0:
+        return 0
+    mantissa, exponent = _frexp(value)
+    scaled = mantissa * _DOUBLE_SUB
+    sub_bucket = int(scaled)
+    if sub_bucket == scaled:
+        sub_bucket -= 1
+    bucket = exponent * _SUB_BUCKETS + sub_bucket + _BUCKET_OFFSET
+    return min(max(bucket, 0), _BUCKETS - 1)
+
+
+def _upper_bound(bucket):
+    """Returns the upper edge of a bucket, its largest value."""
+    exponent, sub_bucket = divmod(bucket, _SUB_BUCKETS)
+    return math.ldexp(1 + (sub_bucket + 1) / _SUB_BUCKETS,
+                      exponent + _MIN_EXPONENT - 1)
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    return format(value, ".6g")
+
+
+def _escape_label(value):
+    return (value.replace("\\", "\\\\").replace("\n", "\\n")
+            .replace('"', '\\"'))
+
+
+class Histogram:
+    """A class used to count values in logarithmic buckets.
+
+    The buckets are those of an HDR histogram: each power of two is split
+    into _SUB_BUCKETS linear steps, so small and large values are recorded
+    with the same relative precision in a fixed amount of memory.
+    """
+
+    __slots__ = ("_counts", "count", "sum", "max")
+
+    def __init__(self):
+        """Histogram constructor."""
+        self._counts = array("Q", bytes(8 * _BUCKETS))
+        self.count = 0
+        self.sum = 0
+        self.max = 0
+
+    def record(self, value):
+        """Counts one value. Values are expected to be zero or more."""
+        bucket = 0
+        if value > 0:
+            mantissa, exponent = _frexp(value)
+            scaled = mantissa * _DOUBLE_SUB
+            sub_bucket = int(scaled)
+            if sub_bucket == scaled:
+                sub_bucket -= 1
+            bucket = exponent * _SUB_BUCKETS + sub_bucket + _BUCKET_OFFSET
+            if not 0 <= bucket < _BUCKETS:
+                bucket = 0 if bucket < 0 else _BUCKETS - 1
+        self._counts[bucket] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, fraction):
+        """Returns an upper bound of the given quantile, e.g. 0.99.
+
+        The bound is within one bucket of the true value, and never above
+        the largest value recorded. It is 0 if nothing was recorded.
+        """
+        if not self.count:
+            return 0
+        rank = max(1, math.ceil(fraction * self.count))
+        seen = 0
+        for bucket, count in enumerate(self._counts):
+            seen += count
+            if seen >= rank:
+                return min(_upper_bound(bucket), self.max)
+        return self.max
+
+    def buckets(self):
+        """Yields (upper bound, cumulative count) for every used bucket."""
+        seen = 0
+        for bucket, count in enumerate(self._counts):
+            if count:
+                seen += count
+                yield _upper_bound(bucket), seen
+
+    def cumulative(self, bounds):
+        """Yields (bound, number of values up to it) for sorted bounds.
+
+        A bound inside a bucket is rounded up to the bucket's upper edge,
+        so the counts are exact for bounds on edges, e.g. powers of two.
+        """
+        counts = self._counts
+        seen = 0
+        start = 0
+        for bound in bounds:
+            end = _bucket_of(bound) + 1
+            if end > start:
+                seen += sum(counts[start:end])
+                start = end
+            yield bound, seen
+
+
+class Counter:
+    """A class used to represent a value that only goes up."""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        """Counter constructor."""
+        self.value = 0
+
+    def inc(self, amount=1):
+        """Adds amount to the counter."""
+        self.value += amount
+
+
+class MetricFamily:
+    """A class used to represent one named metric and its labelled series."""
+
+    def __init__(self, kind, name, documentation, label_names, factory,
+                 bounds=None, source=None):
+        """MetricFamily constructor.
+
+        Args:
+            kind: The Prometheus type, "histogram" or "counter".
+            name: The metric name.
+            documentation: The HELP text.
+            label_names: The names of the labels that tell series apart.
+            factory: Makes the Histogram or Counter of a new series.
+            bounds: The sorted `le` bounds a histogram is exported with.
+            source: An optional function that returns the series as a list
+                of (label values, series) pairs, for series kept elsewhere.
+        """
+        self.kind = kind
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.bounds = bounds
+        self._factory = factory
+        self._source = source
+        self._series = {}
+
+    def labels(self, *values):
+        """Returns the series with the given label values, in order."""
+        series = self._series.get(values)
+        if series is None:
+            series = self._series[values] = self._factory()
+        return series
+
+    def series(self):
+        """Returns a list of (label values, series) pairs."""
+        if self._source is not None:
+            return self._source()
+        return list(self._series.items())
+
+
+class MetricsRegistry:
+    """A class used to collect metrics and render them for Prometheus."""
+
+    def __init__(self):
+        """MetricsRegistry constructor."""
+        self._families = {}
+        self._gauges = {}
+
+    def _family(self, kind, name, documentation, label_names, factory,
+                bounds=None):
+        family = self._families.get(name)
+        if family is None:
+            family = MetricFamily(
+                kind, name, documentation, label_names, factory, bounds)
+            self._families[name] = family
+        return family
+
+    def histogram(self, name, documentation, label_names=(),
+                  bounds=SECONDS_BOUNDS):
+        """Registers a histogram, or returns the one with this name.
+
+        Args:
+            name: The metric name.
+            documentation: The HELP text.
+            label_names: The names of the labels that tell series apart.
+            bounds: The sorted `le` bounds it is exported with, e.g.
+                SECONDS_BOUNDS or COUNT_BOUNDS.
+        """
+        return self._family(
+            "histogram", name, documentation, label_names, Histogram, bounds)
+
+    def histogram_source(self, name, documentation, label_names, function,
+                         bounds=SECONDS_BOUNDS):
+        """Registers histograms that are kept elsewhere.
+
+        Registering the name again replaces the earlier function.
+
+        Args:
+            name: The metric name.
+            documentation: The HELP text.
+            label_names: The names of the labels that tell series apart.
+            function: Returns a list of (label values, Histogram) pairs
+                when the metrics are rendered.
+            bounds: The sorted `le` bounds they are exported with.
+        """
+        self._families[name] = MetricFamily(
+            "histogram", name, documentation, label_names, Histogram,
+            bounds, function)
+
+    def counter(self, name, documentation, label_names=()):
+        """Registers a counter, or returns the one with this name."""
+        return self._family(
+            "counter", name, documentation, label_names, Counter)
+
+    def gauge(self, name, documentation, function):
+        """Registers a gauge whose value is computed when rendered.
+
+        Args:
+            name: The metric name.
+            documentation: The HELP text.
+            function: Returns the current value, or None to leave it out.
+        """
+        self._gauges[name] = (documentation, function)
+
+    def render(self):
+        """Returns every metric in the Prometheus text exposition format."""
+        lines = []
+        for family in list(self._families.values()):
+            lines.append(f"# HELP {family.name} {family.documentation}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for values, series in family.series():
+                labels = ",".join(
+                    f'{name}="{_escape_label(value)}"'
+                    for name, value in zip(family.label_names, values))
+                if family.kind == "counter":
+                    braces = "{" + labels + "}" if labels else ""
+                    lines.append(f"{family.name}{braces} "
+                                 f"{_format_value(series.value)}")
+                    continue
+                prefix = labels + "," if labels else ""
+                for bound, count in list(series.cumulative(family.bounds)) + [
+                        (math.inf, series.count)]:
+                    lines.append(
+                        f'{family.name}_bucket{{{prefix}'
+                        f'le="{_format_value(bound)}"}} {count}')
+                braces = "{" + labels + "}" if labels else ""
+                lines.append(f"{family.name}_sum{braces} "
+                             f"{_format_value(series.sum)}")
+                lines.append(f"{family.name}_count{braces} {series.count}")
+        for name, (documentation, function) in list(self._gauges.items()):
+            value = function()
+            if value is None:
+                continue
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Writes the rendered metrics to a file, replacing it atomically.
+
+        This suits the textfile collector of the Prometheus node exporter.
+        """
+        temporary_path = str(path) + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8") as metrics_file:
+            metrics_file.write(self.render())
+        os.replace(temporary_path, path)
+
+    def serve(self, port, host="127.0.0.1"):
+        """Serves the metrics at http://host:port/metrics.
+
+        The server runs on a daemon thread. It only reads the metrics, so
+        recording them needs no lock.
+
+        Returns:
+            The http.server.ThreadingHTTPServer. Call its shutdown() method
+            to stop it.
+        """
+        registry = self
+
+        class _MetricsHandler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header(
+                    "Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = http.server.ThreadingHTTPServer((host, port), _MetricsHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+# The registry every part of the simulator records into.
+REGISTRY = MetricsRegistry()
@@ -0,0 +1,125 @@
+"""Durable flag state for FLAG_VIDEO and ALLOW_VIDEO.
+
+The store is a log with one tab separated line per change:
+
+    F <video_id> <reason>    the video was flagged
+    U <video_id>             the flag was removed
+
+Reasons are written with backslash escapes, so they never contain a tab or
+a newline. Every record is flushed to the OS as it is written, so it
+survives a crash of the process, while fsyncs, which also guard against a
+crash of the machine, are batched. When most of the log describes flags
+that have since changed again, it is rewritten to hold just the current
+flags, replacing the old file atomically.
+"""
+
+import codecs
+import os
+
+
+def _escape(text):
+    return text.encode("unicode_escape").decode("ascii")
+
+
+def _unescape(text):
+    return codecs.decode(text, "unicode_escape")
+
+
+class ModerationStore:
+    """A class used to persist which videos are flagged, and why."""
+
+    def __init__(self, path, sync_every=64, compact_after=10000):
+        """ModerationStore constructor.
+
+        Args:
+            path: The log file.
+            sync_every: The number of records written between fsyncs.
+            compact_after: The number of records, beyond the number of
+                currently flagged videos, that triggers a rewrite.
+        """
+        self._path = str(path)
+        self._sync_every = sync_every
+        self._compact_after = compact_after
+        self._flags = {}
+        self._file = None
+        self._records = 0
+        self._unsynced = 0
+
+    def load(self):
+        """Reads the log and opens it for appending.
+
+        Returns:
+            A dict mapping the id of every flagged video to its reason.
+        """
+        flags = {}
+        records = 0
+        try:
+            with open(self._path, "rb") as log_file:
+                data = log_file.read()
+        except FileNotFoundError:
+            data = b""
+        # Ignore a record that a crash left half-written.
+        valid_size = data.rfind(b"\n") + 1
+        for record in data[:valid_size].decode("utf-8").splitlines():
+            fields = record.split("\t")
+            if fields[0] == "F":
+                flags[fields[1]] = _unescape(fields[2])
+            elif fields[0] == "U":
+                flags.pop(fields[1], None)
+            records += 1
+
+        if os.path.exists(self._path):
+            os.truncate(self._path, valid_size)
+        self._file = open(self._path, "a", encoding="utf-8")
+        self._flags = flags
+        self._records = records
+        return dict(flags)
+
+    def _write(self, record):
+        self._file.write(record)
+        self._file.flush()
+        self._records += 1
+        self._unsynced += 1
+        if self._unsynced >= self._sync_every:
+            self.sync()
+            if self._records - len(self._flags) >= self._compact_after:
+                self.compact()
+
+    def record_flag(self, video_id, reason):
+        """Records that a video was flagged."""
+        self._flags[video_id] = reason
+        self._write(f"F\t{video_id}\t{_escape(reason)}\n")
+
+    def record_allow(self, video_id):
+        """Records that a video's flag was removed."""
+        self._flags.pop(video_id, None)
+        self._write(f"U\t{video_id}\n")
+
+    def sync(self):
+        """Fsyncs the records written since the last sync to disk."""
+        if self._unsynced:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+
+    def compact(self):
+        """Rewrites the log to hold only the current flags."""
+        self.sync()
+        temporary_path = self._path + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8") as log_file:
+            log_file.writelines(
+                f"F\t{video_id}\t{_escape(reason)}\n"
+                for video_id, reason in self._flags.items())
+            log_file.flush()
+            os.fsync(log_file.fileno())
+        self._file.close()
+        os.replace(temporary_path, self._path)
+        self._file = open(self._path, "a", encoding="utf-8")
+        self._records = len(self._flags)
+
+    def close(self):
+        """Syncs and closes the log."""
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
@@ -0,0 +1,204 @@
+"""Durable playlists, kept as an append-only journal plus a snapshot.
+
+Every playlist change is appended to the journal as one tab separated line:
+
+    C <name>               create a playlist
+    A <name> <video_id>    add a video
+    R <name> <video_id>    remove a video
+    X <name>               clear a playlist
+    D <name>               delete a playlist
+
+Playlist names and video ids never contain whitespace, since commands are
+split on it. Every record is flushed to the OS as it is written, so it
+survives a crash of the process, while fsyncs, which also guard against a
+crash of the machine, are batched. Once the journal grows past a limit,
+the playlists are compacted into a snapshot written in the same format,
+using only C and A lines, and the journal starts over.
+
+Both files begin with a `G <generation>` line. Compaction writes the
+snapshot with a new generation before it resets the journal, so a journal
+older than the snapshot is known to be already included in it and skipped.
+A line left half-written by a crash is dropped when the journal is opened.
+"""
+
+from .video_playlist import Playlist
+from .video_playlist import PlaylistRegistry
+import os
+
+
+def _apply(registry, library, records):
+    """Replays journal records onto a registry."""
+    # Records for one playlist usually follow each other and videos repeat
+    # across playlists, so remember the last playlist and every video seen.
+    playlist_name = None
+    playlist = None
+    videos = {}
+    for record in records:
+        fields = record.split("\t")
+        operation = fields[0]
+        if fields[1] != playlist_name:
+            playlist_name = fields[1]
+            playlist = registry.get(playlist_name)
+        if operation == "C":
+            if playlist is None:
+                playlist = Playlist(playlist_name)
+                registry.add(playlist)
+            continue
+        if playlist is None:
+            continue
+        if operation == "A" or operation == "R":
+            video_id = fields[2]
+            video = videos.get(video_id)
+            if video is None:
+                video = library.get_video(video_id)
+                if video is None:
+                    continue
+                videos[video_id] = video
+            if operation == "A":
+                playlist._append(video_id, video)
+            elif video_id in playlist:
+                playlist.remove_video(video)
+        elif operation == "X":
+            playlist.clear()
+        elif operation == "D":
+            registry.remove(playlist_name)
+            playlist = None
+
+
+def _read_records(path):
+    """Returns the generation and complete records of a journal file.
+
+    Returns:
+        A (generation, records, valid_size) tuple. The generation is -1 if
+        the file is missing or has no header. valid_size is the length of
+        the file up to its last complete line.
+    """
+    try:
+        with open(path, "rb") as journal_file:
+            data = journal_file.read()
+    except FileNotFoundError:
+        return -1, [], 0
+    valid_size = data.rfind(b"\n") + 1
+    lines = data[:valid_size].decode("utf-8").splitlines()
+    if not lines or not lines[0].startswith("G\t"):
+        return -1, [], 0
+    return int(lines[0][2:]), lines[1:], valid_size
+
+
+class PlaylistJournal:
+    """A class used to persist the playlists of one user."""
+
+    def __init__(self, path, sync_every=64, compact_after=100000):
+        """PlaylistJournal constructor.
+
+        Args:
+            path: The journal file. The snapshot is kept next to it, with a
+                .snapshot suffix added.
+            sync_every: The number of records written between fsyncs.
+            compact_after: The number of journal records that triggers a
+                compaction into the snapshot.
+        """
+        self._path = str(path)
+        self._snapshot_path = self._path + ".snapshot"
+        self._sync_every = sync_every
+        self._compact_after = compact_after
+        self._registry = None
+        self._file = None
+        self._generation = 0
+        self._records = 0
+        self._unsynced = 0
+
+    def load(self, library):
+        """Recovers the playlists and opens the journal for appending.
+
+        Args:
+            library: The VideoLibrary that resolves the recorded video ids.
+                Videos no longer in it are skipped.
+
+        Returns:
+            The recovered PlaylistRegistry. Later changes are expected to be
+            made to it and recorded through this journal.
+        """
+        registry = PlaylistRegistry()
+        generation, snapshot, _ = _read_records(self._snapshot_path)
+        _apply(registry, library, snapshot)
+        journal_generation, records, valid_size = _read_records(self._path)
+        self._generation = max(generation, 0)
+        self._registry = registry
+        if journal_generation < self._generation or journal_generation < 0:
+            self._reset_journal()
+            return registry
+
+        _apply(registry, library, records)
+        self._generation = journal_generation
+        self._records = len(records)
+        # Drop a record that a crash left half-written.
+        os.truncate(self._path, valid_size)
+        self._file = open(self._path, "a", encoding="utf-8")
+        return registry
+
+    def _reset_journal(self):
+        if self._file is not None:
+            self._file.close()
+        self._file = open(self._path, "w", encoding="utf-8")
+        self._file.write(f"G\t{self._generation}\n")
+        self._records = 0
+        self._unsynced = 1
+        self.sync()
+
+    def _write(self, record):
+        self._file.write(record)
+        self._file.flush()
+        self._records += 1
+        self._unsynced += 1
+        if self._unsynced >= self._sync_every:
+            self.sync()
+            if self._records >= self._compact_after:
+                self.compact()
+
+    def record_create(self, playlist_name):
+        self._write(f"C\t{playlist_name}\n")
+
+    def record_add(self, playlist_name, video_id):
+        self._write(f"A\t{playlist_name}\t{video_id}\n")
+
+    def record_remove(self, playlist_name, video_id):
+        self._write(f"R\t{playlist_name}\t{video_id}\n")
+
+    def record_clear(self, playlist_name):
+        self._write(f"X\t{playlist_name}\n")
+
+    def record_delete(self, playlist_name):
+        self._write(f"D\t{playlist_name}\n")
+
+    def sync(self):
+        """Fsyncs the records written since the last sync to disk."""
+        if self._unsynced:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+
+    def compact(self):
+        """Writes the playlists to a new snapshot and empties the journal."""
+        self.sync()
+        generation = self._generation + 1
+        lines = [f"G\t{generation}\n"]
+        for playlist in self._registry.values():
+            lines.append(f"C\t{playlist.title}\n")
+            lines.extend(f"A\t{playlist.title}\t{video.video_id}\n"
+                         for video in playlist)
+        temporary_path = self._snapshot_path + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8") as snapshot_file:
+            snapshot_file.writelines(lines)
+            snapshot_file.flush()
+            os.fsync(snapshot_file.fileno())
+        os.replace(temporary_path, self._snapshot_path)
+        self._generation = generation
+        self._reset_journal()
+
+    def close(self):
+        """Syncs and closes the journal."""
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
@@ -0,0 +1,80 @@
+"""A bounded cache of search results."""
+
+from collections import OrderedDict
+
+
+class QueryCache:
+    """A class used to cache search results until their data changes.
+
+    Values are sized, e.g. arrays of row indexes, and their lengths are
+    added up. Entries are evicted least recently used first once there are
+    more than `capacity` of them or their lengths add up to more than
+    `max_results`, so the memory held is bounded whatever is searched for.
+    A value longer than max_results is not cached at all. Every entry
+    remembers the generation it was stored in. Calling invalidate() starts
+    a new generation, which makes all older entries stale in constant time.
+    A stale entry counts as a miss and is dropped when it is next looked
+    up.
+    """
+
+    def __init__(self, capacity=256, max_results=1 << 20):
+        """QueryCache constructor.
+
+        Args:
+            capacity: The maximum number of entries kept.
+            max_results: The maximum total length of the values kept.
+        """
+        self._capacity = capacity
+        self._max_results = max_results
+        self._entries = OrderedDict()
+        self.results = 0
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Returns the cached value for key, or None if there is none."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != self.generation:
+            if entry is not None:
+                del self._entries[key]
+                self.results -= len(entry[1])
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key, value):
+        """Caches value for key in the current generation."""
+        entries = self._entries
+        old = entries.pop(key, None)
+        if old is not None:
+            self.results -= len(old[1])
+        if len(value) > self._max_results:
+            return
+        entries[key] = (self.generation, value)
+        self.results += len(value)
+        while (len(entries) > self._capacity
+               or self.results > self._max_results):
+            self.results -= len(entries.popitem(last=False)[1][1])
+            self.evictions += 1
+
+    def invalidate(self):
+        """Makes every cached value stale."""
+        self.generation += 1
+
+    def stats(self):
+        """Returns the counters as a dict."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "results": self.results,
+            "generation": self.generation,
+        }
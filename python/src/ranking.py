@@ -0,0 +1,188 @@
+"""BM25 relevance ranking for multi-word searches."""
+
+from array import array
+import heapq
+import math
+import re
+
+try:
+    import numpy
+except ImportError:  # Ranking falls back to pure Python.
+    numpy = None
+
+# The usual BM25 parameters: term frequency saturation and length
+# normalisation.
+_K1 = 1.2
+_B = 0.75
+
+_WORD = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """Returns the case-folded words of text, ignoring punctuation."""
+    return _WORD.findall(text.lower())
+
+
+class BM25Index:
+    """A class used to rank documents against a query with BM25.
+
+    The postings are stored in compressed sparse row form: the documents
+    that contain term t, and the BM25 weight of t in each of them, are
+    `documents[offsets[t]:offsets[t + 1]]` and the matching slice of
+    `weights`. The weights only depend on the document, so they are
+    computed once when the index is built and a query just adds up the
+    weights of its terms.
+
+    When NumPy is installed the arrays are shared with it without copying.
+    The scores are then summed with vectorised operations and the best
+    results are picked with argpartition, with no full sort.
+    """
+
+    def __init__(self, documents):
+        """BM25Index constructor.
+
+        Args:
+            documents: A sequence of word lists, one per document. A
+                document is identified by its position in the sequence.
+        """
+        self._terms = {}
+        term_documents = []
+        term_frequencies = []
+        lengths = array("I")
+        for document, words in enumerate(documents):
+            lengths.append(len(words))
+            frequencies = {}
+            for word in words:
+                frequencies[word] = frequencies.get(word, 0) + 1
+            for word, frequency in frequencies.items():
+                term = self._terms.get(word)
+                if term is None:
+                    term = len(term_documents)
+                    self._terms[word] = term
+                    term_documents.append(array("I"))
+                    term_frequencies.append(array("I"))
+                term_documents[term].append(document)
+                term_frequencies[term].append(frequency)
+
+        count = len(lengths)
+        average_length = sum(lengths) / count if count else 0.0
+        offsets = array("I", [0])
+        postings = array("I")
+        weights = array("d")
+        for documents_with_term, frequencies in zip(
+                term_documents, term_frequencies):
+            frequency_count = len(documents_with_term)
+            idf = math.log(1 + (count - frequency_count + 0.5)
+                           / (frequency_count + 0.5))
+            for document, frequency in zip(documents_with_term, frequencies):
+                length = lengths[document] / average_length
+                norm = _K1 * (1 - _B + _B * length)
+                weights.append(
+                    idf * frequency * (_K1 + 1) / (frequency + norm))
+            postings.extend(documents_with_term)
+            offsets.append(len(postings))
+        self._use_postings(count, offsets, postings, weights)
+
+    @classmethod
+    def from_postings(cls, count, terms, offsets, documents, weights):
+        """Returns an index over the postings of another one.
+
+        Args:
+            count: The number of documents.
+            terms, offsets, documents, weights: The postings, as returned
+                by postings(), e.g. from a catalog snapshot. The arrays may
+                be memoryviews.
+        """
+        index = cls.__new__(cls)
+        index._terms = dict(zip(terms, range(len(terms))))
+        index._use_postings(count, offsets, documents, weights)
+        return index
+
+    def _use_postings(self, count, offsets, documents, weights):
+        self._count = count
+        self._offsets = offsets
+        self._documents = documents
+        self._weights = weights
+        if numpy is not None:
+            self._numpy_documents = numpy.frombuffer(
+                self._documents, dtype=numpy.uint32)
+            self._numpy_weights = numpy.frombuffer(
+                self._weights, dtype=numpy.float64)
+
+    def __len__(self):
+        return self._count
+
+    def postings(self):
+        """Returns the (terms, offsets, documents, weights) of the index.
+
+        terms lists the indexed words by term number, and the other three
+        are the compressed sparse row arrays described above.
+        """
+        return (list(self._terms), self._offsets, self._documents,
+                self._weights)
+
+    def _query_terms(self, query):
+        terms = []
+        for word in dict.fromkeys(tokenize(query)):
+            term = self._terms.get(word)
+            if term is not None:
+                terms.append(term)
+        return terms
+
+    def top(self, query, limit):
+        """Returns the documents that best match a query.
+
+        Args:
+            query: Free text. Documents match if they contain any of its
+                words, and score higher the more rare words they share.
+            limit: The maximum number of documents to return.
+
+        Returns:
+            A list of document numbers, best first. Equal scores are ordered
+            by document number.
+        """
+        terms = self._query_terms(query)
+        if not terms or limit <= 0:
+            return []
+        if numpy is not None:
+            return self._top_numpy(terms, limit)
+        return self._top_python(terms, limit)
+
+    def _top_python(self, terms, limit):
+        scores = {}
+        for term in terms:
+            start, end = self._offsets[term], self._offsets[term + 1]
+            for document, weight in zip(self._documents[start:end],
+                                        self._weights[start:end]):
+                scores[document] = scores.get(document, 0.0) + weight
+        best = heapq.nsmallest(
+            limit, scores.items(), key=lambda item: (-item[1], item[0]))
+        return [document for document, _ in best]
+
+    def _top_numpy(self, terms, limit):
+        slices = [slice(self._offsets[term], self._offsets[term + 1])
+                  for term in terms]
+        documents = numpy.concatenate(
+            [self._numpy_documents[s] for s in slices])
+        scores = numpy.concatenate([self._numpy_weights[s] for s in slices])
+        if len(terms) > 1 and len(documents) * 8 > self._count:
+            # Common words: add the scores up in one dense array instead of
+            # sorting the postings.
+            dense = numpy.bincount(
+                documents, weights=scores, minlength=self._count)
+            documents = numpy.flatnonzero(dense)
+            scores = dense[documents]
+        elif len(terms) > 1:
+            documents, positions = numpy.unique(
+                documents, return_inverse=True)
+            scores = numpy.bincount(positions, weights=scores)
+        if limit < len(documents):
+            best = numpy.argpartition(-scores, limit - 1)[:limit]
+            # Add back the documents tied with the last one, so that ties
+            # are broken by document number as in the pure Python ranking.
+            cutoff = scores[best].min()
+            best = numpy.union1d(best, numpy.flatnonzero(scores == cutoff))
+            documents = documents[best]
+            scores = scores[best]
+        order = numpy.lexsort((documents, -scores))[:limit]
+        return documents[order].tolist()
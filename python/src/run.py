@@ -2,13 +2,99 @@
 from .video_player import VideoPlayer
 from .command_parser import CommandException
 from .command_parser import CommandParser
+from .metrics import REGISTRY
+from .moderation_store import ModerationStore
+from .playlist_journal import PlaylistJournal
+from .session import Session
+from .video_library import VideoLibrary
+import argparse
+import sys
 
+try:
+    import readline
+except ImportError:  # Not available on every platform.
+    readline = None
 
-if __name__ == "__main__":
+# The buffer size of the output stream in batch mode.
+_BATCH_BUFFER_SIZE = 1 << 16
+
+# What the TAB completer offers for the first argument of these commands.
+_COMPLETED_ARGUMENTS = {
+    "ADD_TO_PLAYLIST": "PLAYLIST",
+    "ADD_MANY_TO_PLAYLIST": "PLAYLIST",
+    "REMOVE_FROM_PLAYLIST": "PLAYLIST",
+    "REMOVE_MANY_FROM_PLAYLIST": "PLAYLIST",
+    "CLEAR_PLAYLIST": "PLAYLIST",
+    "DELETE_PLAYLIST": "PLAYLIST",
+    "SHOW_PLAYLIST": "PLAYLIST",
+    "SEARCH_VIDEOS": "TITLE",
+    "SEARCH_VIDEOS_WITH_TAG": "TAG",
+}
+
+# The maximum number of completions offered for one TAB press.
+_TAB_COMPLETIONS = 50
+
+
+class _Completer:
+    """A class used to complete command lines in the interactive prompt."""
+
+    def __init__(self, parser, video_player):
+        self._verbs = parser.commands() + ["EXIT"]
+        self._player = video_player
+        self._matches = []
+
+    def matches(self, head, text):
+        """Returns the completions of the word being typed.
+
+        Args:
+            head: The line before the word.
+            text: The word typed so far.
+        """
+        words = head.split()
+        if not words:
+            prefix = text.upper()
+            return [verb for verb in self._verbs if verb.startswith(prefix)]
+        kind = _COMPLETED_ARGUMENTS.get(words[0].upper())
+        if kind is None or len(words) != 1:
+            return []
+        completions = self._player.get_completions(
+            kind, text, _TAB_COMPLETIONS)
+        if kind == "TITLE":
+            # A search term is a single word, so complete one word at a time.
+            ends = (title.find(" ", len(text)) for title in completions)
+            completions = list(dict.fromkeys(
+                title if end < 0 else title[:end]
+                for title, end in zip(completions, ends)))
+        return completions
+
+    def complete(self, text, state):
+        """The readline completer function."""
+        if state == 0:
+            head = readline.get_line_buffer()[:readline.get_begidx()]
+            self._matches = self.matches(head, text)
+        if state < len(self._matches):
+            return self._matches[state]
+        return None
+
+
+def run_interactive(video_player=None, parser=None):
+    """Reads commands from the terminal, one prompt at a time.
+
+    Args:
+        video_player: The VideoPlayer to run. Defaults to a new one.
+        parser: The CommandParser to run the commands with. Defaults to a
+            new one for video_player.
+    """
     print("""Hello and welcome to YouTube, what would you like to do?
     Enter HELP for list of available commands or EXIT to terminate.""")
-    video_player = VideoPlayer()
-    parser = CommandParser(video_player)
+    if video_player is None:
+        video_player = VideoPlayer()
+    if parser is None:
+        parser = CommandParser(video_player)
+    if readline is not None:
+        readline.set_completer(_Completer(parser, video_player).complete)
+        readline.set_completer_delims(" ")
+        readline.parse_and_bind("tab: complete")
     while True:
         command = input("YT> ")
         if command.upper() == "EXIT":
@@ -19,3 +105,95 @@ if __name__ == "__main__":
             print(e)
     print("YouTube has now terminated its execution. "
           "Thank you and goodbye!")
+
+
+def run_batch(lines, output, video_player=None, parser=None):
+    """Executes commands without prompts, e.g. from a script or a pipe.
+
+    Searches never wait for a selection; give it inline instead, as in
+    `SEARCH_VIDEOS cat 1`.
+
+    Args:
+        lines: An iterable of command lines. Execution stops at EXIT.
+        output: The text stream all output is written to.
+        video_player: The VideoPlayer to run. Defaults to a new one.
+        parser: The CommandParser to run the commands with. Defaults to a
+            new one for video_player.
+    """
+    if video_player is None:
+        video_player = VideoPlayer()
+    video_player.output = output
+    video_player.interactive = False
+    if parser is None:
+        parser = CommandParser(video_player)
+    for line in lines:
+        command = line.split()
+        if command and command[0].upper() == "EXIT":
+            break
+        try:
+            parser.execute_command(command)
+        except CommandException as e:
+            print(e, file=output)
+
+
+def main(argv=None):
+    argument_parser = argparse.ArgumentParser(
+        prog="python3 -m src.run", description=__doc__)
+    argument_parser.add_argument(
+        "--script", type=argparse.FileType("r"),
+        help="run the commands in this file without prompts")
+    argument_parser.add_argument(
+        "--playlists", metavar="JOURNAL",
+        help="keep playlists across runs in this journal file")
+    argument_parser.add_argument(
+        "--moderation", metavar="LOG",
+        help="keep flagged videos across runs in this log file")
+    argument_parser.add_argument(
+        "--profile", nargs=2, metavar=("COMMAND", "FILE"),
+        help="run COMMAND under cProfile and write the statistics to FILE")
+    argument_parser.add_argument(
+        "--metrics", metavar="FILE",
+        help="write Prometheus metrics to this file on exit")
+    argument_parser.add_argument(
+        "--metrics-port", type=int, metavar="PORT",
+        help="serve Prometheus metrics at http://127.0.0.1:PORT/metrics")
+    args = argument_parser.parse_args(argv)
+
+    if args.metrics_port is not None:
+        REGISTRY.serve(args.metrics_port)
+    moderation_store = None
+    if args.moderation:
+        moderation_store = ModerationStore(args.moderation)
+    library = VideoLibrary(moderation_store=moderation_store)
+    journal = None
+    session = None
+    if args.playlists:
+        journal = PlaylistJournal(args.playlists)
+        session = Session(journal.load(library), journal)
+    video_player = VideoPlayer(library=library, session=session)
+    parser = CommandParser(video_player)
+    parser.stats.export()
+    if args.profile:
+        parser.profile_command(*args.profile)
+    try:
+        if args.script is None and sys.stdin.isatty():
+            run_interactive(video_player, parser)
+            return
+        output = open(sys.stdout.fileno(), "w",
+                      buffering=_BATCH_BUFFER_SIZE, closefd=False)
+        try:
+            run_batch(args.script or sys.stdin, output, video_player,
+                      parser)
+        finally:
+            output.flush()
+    finally:
+        if journal is not None:
+            journal.close()
+        if moderation_store is not None:
+            moderation_store.close()
+        if args.metrics:
+            REGISTRY.write(args.metrics)
+
+
+if __name__ == "__main__":
+    main()
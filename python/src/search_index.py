@@ -0,0 +1,115 @@
+"""An n-gram index for case-insensitive substring search."""
+
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from operator import add
+
+# The longest n-grams indexed. A term of up to this many characters is
+# answered by a single posting list.
+_GRAM = 3
+# Intersecting stops once this few candidates are left: checking them
+# against their texts is cheaper than reading more posting lists.
+_FEW_CANDIDATES = 32
+
+
+def _grams(text):
+    """Returns the set of one, two and three character substrings of text."""
+    grams = set(text)
+    pairs = list(map(add, text, text[1:]))
+    grams.update(pairs)
+    grams.update(map(add, pairs, text[2:]))
+    return grams
+
+
+def _trigrams(text):
+    """Returns the set of three character substrings of text."""
+    return set(map(add, map(add, text, text[1:]), text[2:]))
+
+
+def _new_posting():
+    return array("I")
+
+
+def _contains(posting, key):
+    """Returns whether a sorted posting list holds key."""
+    position = bisect_left(posting, key)
+    return position < len(posting) and posting[position] == key
+
+
+class TrigramIndex:
+    """A class used to find the texts that contain a substring.
+
+    The index is built once over a sequence of texts and refers to them by
+    their position in it. Every one, two and three character substring of
+    the case-folded texts has a posting list: a sorted array of the
+    positions whose text contains it, four bytes per entry. A term of up to
+    three characters is answered by its posting list alone. A longer term
+    intersects the posting lists of its trigrams, smallest first, and only
+    the surviving candidates are checked against their texts. The index
+    keeps no copy of the texts, so the sequence must not change.
+    """
+
+    def __init__(self, texts, postings=None):
+        """TrigramIndex constructor.
+
+        Args:
+            texts: A sequence of strings, e.g. the title column of a
+                catalog.
+            postings: The posting lists of texts, as returned by
+                postings(), e.g. from a catalog snapshot. They are built
+                from texts when None.
+        """
+        self._texts = texts
+        if postings is None:
+            postings = defaultdict(_new_posting)
+            for key, text in enumerate(texts):
+                for gram in _grams(text.lower()):
+                    postings[gram].append(key)
+            postings = dict(postings)
+        self._postings = postings
+
+    def __len__(self):
+        return len(self._texts)
+
+    def postings(self):
+        """Returns a dict mapping every n-gram to its sorted positions."""
+        return self._postings
+
+    def search(self, term):
+        """Returns the positions of the texts that contain term, ignoring case.
+
+        Args:
+            term: The substring to look for.
+
+        Returns:
+            A list of positions in ascending order.
+        """
+        term = term.lower()
+        if not term:
+            return list(range(len(self._texts)))
+        if len(term) <= _GRAM:
+            return list(self._postings.get(term, ()))
+
+        postings = []
+        for trigram in _trigrams(term):
+            posting = self._postings.get(trigram)
+            if posting is None:
+                return []
+            postings.append(posting)
+        postings.sort(key=len)
+
+        candidates = postings[0]
+        for posting in postings[1:]:
+            if len(candidates) <= _FEW_CANDIDATES:
+                break
+            if len(candidates) * 16 < len(posting):
+                candidates = [key for key in candidates
+                              if _contains(posting, key)]
+            else:
+                candidates = list(filter(
+                    set(candidates).__contains__, posting))
+        # Sharing every trigram is necessary but not sufficient, e.g. "abcab"
+        # contains all trigrams of "abcabc", so check the real substring.
+        texts = self._texts
+        return [key for key in candidates if term in texts[key].lower()]
@@ -0,0 +1,232 @@
+"""A TCP server that runs youtube simulator commands for many clients.
+
+Clients send one command per line, exactly as typed at the `YT>` prompt.
+After each command the server sends the command's output followed by a
+line holding a single ".". Output lines that start with "." get an extra
+"." in front, which clients strip, so the terminator is never ambiguous.
+EXIT closes the connection. A command line may be up to MAX_LINE bytes
+long; longer lines are skipped and answered with an error.
+
+Every connection has its own Session: current video, pause state and
+playlists. All connections share one VideoPlayer and its VideoLibrary, so
+they also share flags. Commands never await, so switching the player to the
+connection's session before each command is safe. Only the verbs in
+NETWORK_COMMANDS are served, so clients cannot make the server read its
+files.
+
+Start it with `python3 -m src.server --port 8765`.
+"""
+from .command_parser import CommandException
+from .command_parser import CommandParser
+from .metrics import REGISTRY
+from .moderation_store import ModerationStore
+from .session import Session
+from .video_library import VideoLibrary
+from .video_player import VideoPlayer
+import argparse
+import asyncio
+import io
+import traceback
+
+TERMINATOR = b".\n"
+
+# The longest command line accepted, in bytes. It leaves room for bulk
+# commands such as ADD_MANY_TO_PLAYLIST with many thousands of video ids.
+MAX_LINE = 1 << 20
+
+_LINE_TOO_LONG = (f"Cannot run command: Line is longer than {MAX_LINE} "
+                  "bytes.\n")
+
+# The verbs clients may run. Commands that read files on the server, see
+# command_parser.LOCAL_COMMANDS, are not offered.
+NETWORK_COMMANDS = frozenset({
+    "NUMBER_OF_VIDEOS", "SHOW_ALL_VIDEOS", "PLAY", "PLAY_RANDOM", "STOP",
+    "PAUSE", "CONTINUE", "SHOW_PLAYING", "CREATE_PLAYLIST",
+    "ADD_TO_PLAYLIST", "REMOVE_FROM_PLAYLIST", "CLEAR_PLAYLIST",
+    "DELETE_PLAYLIST", "SHOW_PLAYLIST", "SHOW_ALL_PLAYLISTS",
+    "SEARCH_VIDEOS", "SEARCH_VIDEOS_WITH_TAG", "SEARCH_RANKED",
+    "PLAY_RESULT", "FLAG_VIDEO", "ALLOW_VIDEO", "ADD_MANY_TO_PLAYLIST",
+    "REMOVE_MANY_FROM_PLAYLIST", "COMPLETE",
+})
+
+
+def _frame(text):
+    """Returns the wire form of one command's output."""
+    lines = text.splitlines(keepends=True)
+    return "".join(
+        "." + line if line.startswith(".") else line
+        for line in lines).encode("utf-8") + TERMINATOR
+
+
+async def read_response(reader):
+    """Reads one command's output from a server connection.
+
+    Args:
+        reader: The client's asyncio.StreamReader.
+
+    Returns:
+        The output text, or None if the server closed the connection.
+    """
+    lines = []
+    while True:
+        line = await reader.readline()
+        if not line:
+            return None
+        if line == TERMINATOR:
+            return "".join(lines)
+        if line.startswith(b"."):
+            line = line[1:]
+        lines.append(line.decode("utf-8"))
+
+
+async def _read_line(reader):
+    """Reads one command line from a client.
+
+    Returns:
+        The line, b"" once the client has closed the connection, or None
+        if the line was longer than the reader's limit. The rest of a
+        line that is too long is read and dropped.
+    """
+    try:
+        return await reader.readuntil(b"\n")
+    except asyncio.IncompleteReadError as e:
+        return e.partial
+    except asyncio.LimitOverrunError:
+        pass
+    while True:
+        try:
+            await reader.readuntil(b"\n")
+            return None
+        except asyncio.IncompleteReadError:
+            return b""
+        except asyncio.LimitOverrunError as e:
+            # The data up to e.consumed is still buffered; drop it.
+            await reader.readexactly(e.consumed)
+
+
+class CommandServer:
+    """A class used to serve the command set over asyncio streams."""
+
+    def __init__(self, library=None):
+        """CommandServer constructor.
+
+        Args:
+            library: The VideoLibrary shared by every connection. Defaults
+                to a new library over the default catalog.
+        """
+        if library is None:
+            library = VideoLibrary()
+        self._player = VideoPlayer(library=library, interactive=False)
+        self._parser = CommandParser(self._player, NETWORK_COMMANDS)
+        self._parser.stats.export()
+        self.connections = 0
+
+    async def handle_connection(self, reader, writer):
+        """Runs the commands of one client until EXIT or disconnection."""
+        session = Session()
+        output = io.StringIO()
+        self.connections += 1
+        try:
+            while True:
+                line = await _read_line(reader)
+                if line is None:
+                    writer.write(_frame(_LINE_TOO_LONG))
+                    await writer.drain()
+                    continue
+                if not line:
+                    break
+                command = line.decode("utf-8", errors="replace").split()
+                if command and command[0].upper() == "EXIT":
+                    break
+                self._player.session = session
+                self._player.output = output
+                try:
+                    self._parser.execute_command(command)
+                except CommandException as e:
+                    print(e, file=output)
+                except Exception:
+                    # A failing command, e.g. when a search worker has
+                    # died, must not end the client's session.
+                    traceback.print_exc()
+                    print("Cannot run command: An internal error occurred",
+                          file=output)
+                writer.write(_frame(output.getvalue()))
+                output.seek(0)
+                output.truncate()
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    async def start(self, host="127.0.0.1", port=8765, backlog=4096):
+        """Starts listening and returns the asyncio.Server.
+
+        Args:
+            host: The address to bind.
+            port: The port to bind, 0 for any free port.
+            backlog: The number of pending connections the OS may queue.
+        """
+        return await asyncio.start_server(
+            self.handle_connection, host, port, backlog=backlog,
+            limit=MAX_LINE)
+
+
+async def _serve(host, port, library):
+    server = await CommandServer(library).start(host, port)
+    bound_host, bound_port = server.sockets[0].getsockname()[:2]
+    print(f"Listening on {bound_host}:{bound_port}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def _positive_int(text):
+    """Parses an argparse argument that must be a whole number above 0."""
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"invalid int value: {text!r}") from None
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1: {text}")
+    return value
+
+
+def main(argv=None):
+    argument_parser = argparse.ArgumentParser(
+        prog="python3 -m src.server",
+        description="Serves the youtube simulator commands over TCP.")
+    argument_parser.add_argument("--host", default="127.0.0.1")
+    argument_parser.add_argument(
+        "--port", type=int, default=8765, help="0 picks a free port")
+    argument_parser.add_argument(
+        "--moderation", metavar="LOG",
+        help="keep flagged videos across restarts in this log file")
+    argument_parser.add_argument(
+        "--metrics-port", type=int, metavar="PORT",
+        help="serve Prometheus metrics at http://HOST:PORT/metrics")
+    argument_parser.add_argument(
+        "--shards", type=_positive_int, metavar="N",
+        help="search with N worker processes, each indexing part of the "
+             "catalog")
+    args = argument_parser.parse_args(argv)
+    if args.metrics_port is not None:
+        REGISTRY.serve(args.metrics_port, args.host)
+    moderation_store = None
+    if args.moderation:
+        moderation_store = ModerationStore(args.moderation)
+    library = VideoLibrary(moderation_store=moderation_store,
+                           shards=args.shards)
+    try:
+        asyncio.run(_serve(args.host, args.port, library))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        library.close()
+        if moderation_store is not None:
+            moderation_store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""A session class."""
+
+from .video import Video
+from .video_playlist import PlaylistRegistry
+from collections import OrderedDict
+
+# The value of currently_playing while nothing plays. It is shared by all
+# sessions, as it is never modified.
+NO_VIDEO = Video("", "", [])
+
+# The number of search result sets a session keeps for PLAY_RESULT.
+MAX_RESULT_SETS = 16
+
+
+class ResultSet:
+    """A class used to represent the results of one search."""
+
+    __slots__ = ("result_id", "query", "videos")
+
+    def __init__(self, result_id, query, videos):
+        """ResultSet constructor.
+
+        Args:
+            result_id: The number of the search within its session.
+            query: The search term, as given.
+            videos: The matching videos, in the order they were listed.
+        """
+        self.result_id = result_id
+        self.query = query
+        self.videos = tuple(videos)
+
+    def __len__(self):
+        return len(self.videos)
+
+    def get(self, number):
+        """Returns the video listed with a number, or None if there is none.
+
+        Args:
+            number: The number of the result, starting at 1.
+        """
+        if 1 <= number <= len(self.videos):
+            return self.videos[number - 1]
+        return None
+
+
+class Session:
+    """A class used to represent one user's state in a video player.
+
+    A session only holds what differs between users: the current video,
+    whether it is paused, and the user's playlists. The catalog is shared
+    through the VideoLibrary of the player that runs the session, so an idle
+    session costs a few hundred bytes.
+
+    The results of the latest searches are kept so that they can be played
+    later by number. Only the MAX_RESULT_SETS most recently used are kept.
+    """
+
+    __slots__ = ("currently_playing", "paused", "_playlists", "journal",
+                 "_results", "_searches")
+
+    def __init__(self, playlists=None, journal=None):
+        """Session constructor.
+
+        Args:
+            playlists: The PlaylistRegistry to start with, e.g. one
+                recovered by a PlaylistJournal. Defaults to an empty one.
+            journal: The PlaylistJournal that records playlist changes, or
+                None to keep playlists in memory only.
+        """
+        self.currently_playing = NO_VIDEO
+        self.paused = False
+        self._playlists = playlists
+        self.journal = journal
+        self._results = None
+        self._searches = 0
+
+    @property
+    def playlists(self) -> PlaylistRegistry:
+        """Returns the session's playlists, created on first use."""
+        if self._playlists is None:
+            self._playlists = PlaylistRegistry()
+        return self._playlists
+
+    def add_results(self, query, videos):
+        """Keeps the results of a search, evicting the least recently used.
+
+        Args:
+            query: The search term, as given.
+            videos: The matching videos, in the order they were listed.
+
+        Returns:
+            The new ResultSet. Its id is the number of searches made in the
+            session so far.
+        """
+        if self._results is None:
+            self._results = OrderedDict()
+        self._searches += 1
+        results = ResultSet(self._searches, query, videos)
+        self._results[results.result_id] = results
+        if len(self._results) > MAX_RESULT_SETS:
+            self._results.popitem(last=False)
+        return results
+
+    def get_results(self, result_id=None):
+        """Returns a kept ResultSet and marks it as recently used.
+
+        Args:
+            result_id: The id of the result set. None means the latest.
+
+        Returns:
+            The ResultSet, or None if it was never made or was evicted.
+        """
+        if result_id is None:
+            result_id = self._searches
+        if self._results is None or result_id not in self._results:
+            return None
+        self._results.move_to_end(result_id)
+        return self._results[result_id]
@@ -0,0 +1,149 @@
+"""Title and tag search spread over worker processes.
+
+Videos are assigned to shards by a stable hash of their id. The
+coordinator, which has the catalog loaded already, sends every worker
+process the rows of its own shard only. Each worker builds the search
+indexes for its rows, so the indexes of a large catalog are split between
+the workers' heaps and searched on as many cores, and no worker ever reads
+or holds the whole catalog.
+
+A search is sent to every worker before any reply is read, so the shards
+search at the same time. Along with its rows, every worker is given their
+ranks: their positions in the full catalog ordered by display line. A
+worker replies with the sorted ranks of its matches, so the coordinator
+merges the partial results by comparing integers, in a single sort that
+finds the sorted runs, and turns the ranks back into row numbers with one
+lookup each.
+"""
+
+from .catalog import Catalog
+from array import array
+import multiprocessing
+import os
+import zlib
+
+
+def shard_of(video_id, shards):
+    """Returns the shard that holds a video.
+
+    Unlike hash(), the result is the same in every process and every run.
+    """
+    return zlib.crc32(video_id.encode("utf-8")) % shards
+
+
+def _serve_shard(connection):
+    """Runs in a worker process: answers searches over one shard."""
+    rows, ranks = connection.recv()
+    catalog = Catalog(rows, build_ranking=False)
+    del rows
+    # Tell the coordinator the shard is ready.
+    connection.send_bytes(b"")
+    while True:
+        try:
+            request = connection.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+        by_tag, search_term = request
+        if by_tag:
+            indexes = catalog.search_tags(search_term)
+        else:
+            indexes = catalog.search_titles(search_term)
+        connection.send_bytes(
+            array("I", sorted([ranks[index] for index in indexes])).tobytes())
+    connection.close()
+
+
+class ShardedSearch:
+    """A class used to search a catalog split across worker processes."""
+
+    def __init__(self, catalog, shards=None):
+        """Starts the workers and waits until they have built their shards.
+
+        Args:
+            catalog: The full Catalog. It needs no search indexes of its
+                own. Its rows are handed out to the workers, and its
+                display lines order the merged results.
+            shards: The number of worker processes, at least 1. Defaults
+                to the number of CPUs.
+        """
+        if shards is None:
+            shards = os.cpu_count() or 1
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+        # Spawned workers do not inherit the coordinator's threads or open
+        # files, and behave the same on every platform.
+        context = multiprocessing.get_context("spawn")
+        self._connections = []
+        self._processes = []
+        for _ in range(shards):
+            connection, worker_connection = context.Pipe()
+            process = context.Process(
+                target=_serve_shard, args=(worker_connection,), daemon=True)
+            process.start()
+            worker_connection.close()
+            self._connections.append(connection)
+            self._processes.append(process)
+        # The workers start up while the rows are ordered and split.
+        self._sorted_rows = catalog.sorted_indexes()
+        row_numbers = [array("I") for _ in range(shards)]
+        ranks = [array("I") for _ in range(shards)]
+        for rank, row_number in enumerate(self._sorted_rows):
+            shard = shard_of(catalog.video_id(row_number), shards)
+            row_numbers[shard].append(row_number)
+            ranks[shard].append(rank)
+        # Build one shard's rows at a time, so that the coordinator never
+        # holds a second copy of the whole catalog.
+        for connection, shard_rows, shard_ranks in zip(
+                self._connections, row_numbers, ranks):
+            connection.send((
+                [(catalog.title(row_number), catalog.video_id(row_number),
+                  catalog.tags(row_number)) for row_number in shard_rows],
+                shard_ranks))
+        for connection in self._connections:
+            connection.recv_bytes()
+
+    def __len__(self):
+        return len(self._connections)
+
+    def _scatter(self, by_tag, search_term):
+        """Sends a search to every shard and returns the ranks they match.
+
+        The ranks are one sorted run per shard, one after the other.
+        """
+        for connection in self._connections:
+            connection.send((by_tag, search_term))
+        ranks = array("I")
+        for connection in self._connections:
+            ranks.frombytes(connection.recv_bytes())
+        return ranks
+
+    def search(self, search_term, by_tag=False):
+        """Returns the rows that match a search, sorted by display line.
+
+        Args:
+            search_term: The text to look for, ignoring case.
+            by_tag: Whether to look in the tags instead of the titles.
+
+        Returns:
+            A list of row numbers of the full catalog.
+        """
+        ranks = self._scatter(by_tag, search_term)
+        if len(self._connections) > 1:
+            ranks = sorted(ranks)
+        sorted_rows = self._sorted_rows
+        return [sorted_rows[rank] for rank in ranks]
+
+    def close(self):
+        """Stops the workers."""
+        for connection in self._connections:
+            try:
+                connection.send(None)
+            except OSError:
+                pass
+            connection.close()
+        for process in self._processes:
+            process.join()
+        self._connections = []
+        self._processes = []
@@ -6,6 +6,8 @@ from typing import Sequence
 class Video:
     """A class used to represent a Video."""
 
+    __slots__ = ("_title", "_video_id", "_tags", "_flagged")
+
     def __init__(self, video_title: str, video_id: str, video_tags: Sequence[str]):
         """Video constructor."""
         self._title = video_title
@@ -38,6 +40,16 @@ class Video:
     def get_flag_reason(self):
         return self._flagged[1]
 
+    def display_line(self) -> str:
+        """Returns the `title (video_id) [tags]` line shown in listings.
+
+        Flagged videos get a ` - FLAGGED (reason: ...)` suffix.
+        """
+        line = f"{self._title} ({self._video_id}) [{' '.join(self._tags)}]"
+        if self._flagged[0]:
+            line += " - FLAGGED (reason: " + self._flagged[1] + ")"
+        return line
+
     def set_flag(self, reason):
         self._flagged = [True, reason]
         return self._flagged
@@ -45,3 +57,66 @@ class Video:
     def remove_flag(self):
         self._flagged = [False, ""]
         return self._flagged
+
+
+class LibraryVideo:
+    """A row view onto a video stored in a library's columnar catalog.
+
+    It offers the same interface as Video but only holds its library and
+    row index. The row data lives in the shared catalog and the flag state
+    in the VideoLibrary that created the view, so flagging a video in one
+    library does not affect the others.
+    """
+
+    __slots__ = ("_library", "_index")
+
+    def __init__(self, library, index):
+        """LibraryVideo constructor."""
+        self._library = library
+        self._index = index
+
+    def __eq__(self, other):
+        return (isinstance(other, LibraryVideo)
+                and self._library is other._library
+                and self._index == other._index)
+
+    def __hash__(self):
+        return self._index
+
+    @property
+    def title(self) -> str:
+        """Returns the title of a video."""
+        return self._library._catalog.title(self._index)
+
+    @property
+    def video_id(self) -> str:
+        """Returns the video id of a video."""
+        return self._library._catalog.video_id(self._index)
+
+    @property
+    def tags(self) -> Sequence[str]:
+        """Returns the list of tags of a video."""
+        return self._library._catalog.tags(self._index)
+
+    def get_flagged(self) -> bool:
+        """Returns status of flag"""
+        return self._library._is_flagged(self._index)
+
+    def get_flag_reason(self):
+        return self._library._flag_reasons.get(self._index, "")
+
+    def display_line(self) -> str:
+        """Returns the `title (video_id) [tags]` line shown in listings.
+
+        Flagged videos get a ` - FLAGGED (reason: ...)` suffix. The line is
+        cached by the library until the video's flag state changes.
+        """
+        return self._library._display_line(self._index)
+
+    def set_flag(self, reason):
+        self._library._set_flag(self._index, reason)
+        return [True, reason]
+
+    def remove_flag(self):
+        self._library._remove_flag(self._index)
+        return [False, ""]
@@ -1,36 +1,196 @@
 """A video library class."""
 
-from .video import Video
+from .catalog import Catalog
+from .catalog import get_catalog
+from .catalog_snapshot import load_columns
+from .metrics import COUNT_BOUNDS
+from .metrics import REGISTRY
+from .query_cache import QueryCache
+from .ranking import tokenize
+from .sharded_catalog import ShardedSearch
+from .video import LibraryVideo
+from array import array
 from pathlib import Path
-import csv
+import bisect
+import random
 
+DEFAULT_CATALOG_PATH = Path(__file__).parent / "videos.txt"
 
-# Helper Wrapper around CSV reader to strip whitespace from around
-# each item.
-def _csv_reader_with_strip(reader):
-    yield from ((item.strip() for item in line) for line in reader)
+_SEARCH_CANDIDATES = REGISTRY.histogram(
+    "yt_search_candidates",
+    "Videos matched by a search before flagged ones are dropped.", ["mode"],
+    COUNT_BOUNDS)
+_CACHE_REQUESTS = REGISTRY.counter(
+    "yt_query_cache_requests_total", "Searches looked up in the cache.",
+    ["result"])
+_CACHE_HITS = _CACHE_REQUESTS.labels("hit")
+_CACHE_MISSES = _CACHE_REQUESTS.labels("miss")
+
+
+def _cache_hit_ratio():
+    requests = _CACHE_HITS.value + _CACHE_MISSES.value
+    return _CACHE_HITS.value / requests if requests else None
+
+
+REGISTRY.gauge(
+    "yt_query_cache_hit_ratio",
+    "The fraction of searches answered from the cache.", _cache_hit_ratio)
 
 
 class VideoLibrary:
-    """A class used to represent a Video Library."""
-
-    def __init__(self):
-        """The VideoLibrary class is initialized."""
-        self._videos = {}
-        with open(Path(__file__).parent / "videos.txt") as video_file:
-            reader = _csv_reader_with_strip(
-                csv.reader(video_file, delimiter="|"))
-            for video_info in reader:
-                title, url, tags = video_info
-                self._videos[url] = Video(
-                    title,
-                    url,
-                    [tag.strip() for tag in tags.split(",")] if tags else [],
-                )
+    """A class used to represent a Video Library.
+
+    The videos and search indexes live in a Catalog shared by every library
+    loaded from the same file. Flag state is per library: a bitmap with one
+    bit per catalog row, plus the reasons of the flagged rows.
+
+    The rows that are not flagged are also kept densely packed in an array,
+    together with the position of each row in it. Flagging swaps a row out
+    and allowing it appends it back, both in constant time, so a random
+    playable video can be picked without scanning the catalog.
+
+    Once listed, the sorted display lines are kept up to date in place.
+
+    The results of the searches behind the search commands are cached.
+    Every flag change starts a new cache generation, which makes all the
+    cached results stale at once.
+
+    With a ModerationStore, flags are restored from it at start-up and every
+    later flag change is recorded in it.
+
+    In sharded mode the title and tag searches are answered by worker
+    processes that each index part of the catalog, see ShardedSearch. The
+    library then loads a catalog of its own without building its search
+    indexes, and hands its rows out to the workers.
+    """
+
+    def __init__(self, catalog_path=DEFAULT_CATALOG_PATH,
+                 moderation_store=None, shards=None):
+        """The VideoLibrary class is initialized.
+
+        Args:
+            catalog_path: The text catalog to load. Its compiled snapshot is
+                used instead when one is present and up to date.
+            moderation_store: An optional ModerationStore that keeps the
+                flags across runs.
+            shards: The number of worker processes to search with, or None
+                to search in this process.
+        """
+        self._shards = None
+        if shards is None:
+            self._catalog = get_catalog(catalog_path)
+        else:
+            self._catalog = Catalog.from_columns(
+                load_columns(Path(catalog_path), build_indexes=False))
+            self._shards = ShardedSearch(self._catalog, shards)
+        self._flag_bits = bytearray((len(self._catalog) + 7) // 8)
+        self._flag_reasons = {}
+        self._flagged_lines = {}
+        self._sorted_lines = None
+        self._playable = array("I", range(len(self._catalog)))
+        self._playable_position = array("I", range(len(self._catalog)))
+        self._query_cache = QueryCache()
+        self._moderation_store = None
+        if moderation_store is not None:
+            # Only the flagged videos are touched, not the whole catalog.
+            for video_id, reason in moderation_store.load().items():
+                index = self._catalog.index_of(video_id)
+                if index is not None:
+                    self._set_flag(index, reason)
+            self._moderation_store = moderation_store
+
+    def _is_flagged(self, index):
+        return bool(self._flag_bits[index >> 3] & (1 << (index & 7)))
+
+    def _set_flag(self, index, reason):
+        old_line = self._display_line(index)
+        self._flag_reasons[index] = reason
+        self._flagged_lines.pop(index, None)
+        if not self._is_flagged(index):
+            self._flag_bits[index >> 3] |= 1 << (index & 7)
+            # Move the last playable row into the flagged row's slot.
+            position = self._playable_position[index]
+            last = self._playable.pop()
+            if last != index:
+                self._playable[position] = last
+                self._playable_position[last] = position
+        self._update_sorted_lines(old_line, index)
+        self._query_cache.invalidate()
+        if self._moderation_store is not None:
+            self._moderation_store.record_flag(
+                self._catalog.video_id(index), reason)
+
+    def _remove_flag(self, index):
+        if not self._is_flagged(index):
+            return
+        old_line = self._display_line(index)
+        self._flag_bits[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+        del self._flag_reasons[index]
+        self._flagged_lines.pop(index, None)
+        self._playable_position[index] = len(self._playable)
+        self._playable.append(index)
+        self._update_sorted_lines(old_line, index)
+        self._query_cache.invalidate()
+        if self._moderation_store is not None:
+            self._moderation_store.record_allow(self._catalog.video_id(index))
+
+    def _update_sorted_lines(self, old_line, index):
+        lines = self._sorted_lines
+        if lines is None:
+            return
+        del lines[bisect.bisect_left(lines, old_line)]
+        bisect.insort(lines, self._display_line(index))
+
+    def __len__(self):
+        return len(self._catalog)
 
     def get_all_videos(self):
         """Returns all available video information from the video library."""
-        return list(self._videos.values())
+        return [LibraryVideo(self, index)
+                for index in range(len(self._catalog))]
+
+    def _display_line(self, index):
+        if not self._is_flagged(index):
+            return self._catalog.display_line(index)
+        line = self._flagged_lines.get(index)
+        if line is None:
+            line = (self._catalog.display_line(index) + " - FLAGGED (reason: "
+                    + self._flag_reasons[index] + ")")
+            self._flagged_lines[index] = line
+        return line
+
+    def get_sorted_display_lines(self, limit=None, offset=0):
+        """Returns a page of the display lines of all videos, in sorted order.
+
+        The sorted view is built from the catalog's shared order the first
+        time it is needed. After that a flag change only moves the affected
+        line, so listings never sort the whole catalog again.
+
+        Args:
+            limit: The maximum number of lines to return, or None for all.
+            offset: The number of lines to skip.
+
+        Returns:
+            A list of display lines.
+        """
+        if self._sorted_lines is None:
+            self._sorted_lines = [self._display_line(index) for index
+                                  in self._catalog.sorted_indexes()]
+            if self._flag_reasons:
+                self._sorted_lines.sort()
+        end = None if limit is None else offset + limit
+        return self._sorted_lines[offset:end]
+
+    def get_random_video(self):
+        """Returns a random video that is not flagged.
+
+        Returns:
+            A Video object, or None if every video is flagged or the library
+            is empty.
+        """
+        if not self._playable:
+            return None
+        return LibraryVideo(self, random.choice(self._playable))
 
     def get_video(self, video_id):
         """Returns the video object (title, url, tags) from the video library.
@@ -42,4 +202,140 @@ class VideoLibrary:
             The Video object for the requested video_id. None if the video
             does not exist.
         """
-        return self._videos.get(video_id, None)
+        index = self._catalog.index_of(video_id)
+        if index is None:
+            return None
+        return LibraryVideo(self, index)
+
+    def search_titles(self, search_term):
+        """Returns the videos whose titles contain the search term.
+
+        Args:
+            search_term: The substring to look for, ignoring case.
+
+        Returns:
+            A list of matching Video objects in no particular order.
+        """
+        return [LibraryVideo(self, index)
+                for index in self._search(search_term, False)]
+
+    def search_tags(self, video_tag):
+        """Returns the videos with a tag that contains the given text.
+
+        Args:
+            video_tag: The text to look for, ignoring case.
+
+        Returns:
+            A list of matching Video objects in no particular order. Each
+            video appears once even if several of its tags match.
+        """
+        return [LibraryVideo(self, index)
+                for index in self._search(video_tag, True)]
+
+    def _search(self, search_term, by_tag):
+        if self._shards is not None:
+            return self._shards.search(search_term, by_tag)
+        if by_tag:
+            return self._catalog.search_tags(search_term)
+        return self._catalog.search_titles(search_term)
+
+    def find_videos(self, search_term, by_tag=False):
+        """Returns the unflagged videos that match a search, ready to list.
+
+        The matching rows are cached, keyed by the case-folded search term
+        and the kind of search, until a flag changes. The Video objects are
+        made when the results are read.
+
+        Args:
+            search_term: The text to look for in titles, ignoring case.
+            by_tag: Whether to look in the tags instead of the titles.
+
+        Returns:
+            A tuple of Video objects, sorted by their display lines.
+        """
+        mode = "tag" if by_tag else "title"
+        key = (mode, search_term.lower())
+        rows = self._query_cache.get(key)
+        if rows is None:
+            _CACHE_MISSES.inc()
+            indexes = self._search(search_term, by_tag)
+            _SEARCH_CANDIDATES.labels(mode).record(len(indexes))
+            indexes = [index for index in indexes
+                       if not self._is_flagged(index)]
+            if self._shards is None:
+                # Shards already return their merged results in order.
+                indexes.sort(key=self._catalog.display_line)
+            rows = array("I", indexes)
+            self._query_cache.put(key, rows)
+        else:
+            _CACHE_HITS.inc()
+        return tuple(LibraryVideo(self, index) for index in rows)
+
+    def search_ranked(self, query, limit=10):
+        """Returns the unflagged videos that best match a query.
+
+        Results are cached like those of find_videos.
+
+        Args:
+            query: Free text matched word by word against titles and tags,
+                ignoring case and punctuation.
+            limit: The maximum number of videos to return.
+
+        Returns:
+            A tuple of Video objects, most relevant first.
+        """
+        key = ("ranked", " ".join(tokenize(query)), limit)
+        rows = self._query_cache.get(key)
+        if rows is None:
+            _CACHE_MISSES.inc()
+            # Ask for enough rows to still have limit once flagged ones are
+            # dropped.
+            indexes = self._catalog.rank(
+                query, limit + len(self._flag_reasons))
+            _SEARCH_CANDIDATES.labels("ranked").record(len(indexes))
+            rows = array("I", [index for index in indexes
+                               if not self._is_flagged(index)][:limit])
+            self._query_cache.put(key, rows)
+        else:
+            _CACHE_HITS.inc()
+        return tuple(LibraryVideo(self, index) for index in rows)
+
+    def get_query_cache_stats(self):
+        """Returns the search cache counters.
+
+        Returns:
+            A dict with the number of hits, misses and evictions, the number
+            of cache entries, their total number of rows and the current
+            generation.
+        """
+        return self._query_cache.stats()
+
+    def complete_titles(self, prefix, limit=10):
+        """Returns the titles that start with a prefix.
+
+        Args:
+            prefix: The start of a title, in any case.
+            limit: The maximum number of titles to return.
+
+        Returns:
+            A list of titles in alphabetical order, ignoring case.
+        """
+        return self._catalog.complete_titles(prefix, limit)
+
+    def complete_tags(self, prefix, limit=10):
+        """Returns the tags that start with a prefix.
+
+        Args:
+            prefix: The start of a tag, in any case.
+            limit: The maximum number of tags to return.
+
+        Returns:
+            A list of distinct tags in alphabetical order, ignoring case.
+        """
+        return self._catalog.complete_tags(prefix, limit)
+
+    def close(self):
+        """Stops the search workers of a sharded library."""
+        if self._shards is not None:
+            self._shards.close()
+            self._shards = None
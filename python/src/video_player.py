@@ -1,46 +1,99 @@
 """A video player class."""
 
+from .metrics import COUNT_BOUNDS
+from .metrics import REGISTRY
+from .session import NO_VIDEO
+from .session import Session
 from .video_library import VideoLibrary
-from .video import Video
 from .video_playlist import Playlist
-import random
+
+# The number of results listed by a ranked search.
+_RANKED_RESULTS = 10
+# The number of lines of a file that FLAG_VIDEOS_FROM_FILE lists when they
+# are not videos.
+_MAX_FILE_ERRORS = 10
+
+_SEARCH_RESULTS = REGISTRY.histogram(
+    "yt_search_results", "Videos listed by a search command.", ["command"],
+    COUNT_BOUNDS)
 
 
 class VideoPlayer:
-    """A class used to represent a Video Player."""
+    """A class used to represent a Video Player.
+
+    Commands act on the player's current session, which holds the user's
+    state. Assigning another Session to `session` lets one player serve
+    many users.
+    """
 
-    def __init__(self):
-        self._video_library = VideoLibrary()
-        self.currently_playing = Video("","",[])
-        self.paused = False
-        self.playlists = {}
+    def __init__(self, library=None, output=None, interactive=True,
+                 session=None):
+        """VideoPlayer constructor.
+
+        Args:
+            library: The VideoLibrary to play from. Players may share one,
+                in which case they also share its flags. Defaults to a new
+                library over the default catalog.
+            output: The text stream all output is written to. None means
+                whatever sys.stdout is at the time of writing.
+            interactive: Whether searches may ask for a selection with
+                input() when none was given with the command.
+            session: The Session to start with. Defaults to a new one.
+        """
+        if library is None:
+            library = VideoLibrary()
+        if session is None:
+            session = Session()
+        self._video_library = library
+        self.session = session
+        self.output = output
+        self.interactive = interactive
+        self.lines_printed = 0
+
+    @property
+    def currently_playing(self):
+        return self.session.currently_playing
+
+    @currently_playing.setter
+    def currently_playing(self, video):
+        self.session.currently_playing = video
+
+    @property
+    def paused(self):
+        return self.session.paused
+
+    @paused.setter
+    def paused(self, paused):
+        self.session.paused = paused
+
+    @property
+    def playlists(self):
+        return self.session.playlists
+
+    def _print(self, text):
+        self.lines_printed += text.count("\n") + 1
+        print(text, file=self.output)
+
+    def _read_selection(self, selection):
+        if selection is None and self.interactive:
+            selection = input("")
+        return selection
 
     def number_of_videos(self):
-        num_videos = len(self._video_library.get_all_videos())
-        print(f"{num_videos} videos in the library")
-
-    def show_all_videos(self):
-        """Returns all videos."""
-        video_list = self._video_library.get_all_videos()
-        output_list = []
-        for v in video_list:
-            output_string = v.title + " (" + v.video_id + ") ["
-            first_tag = True
-            for i in v.tags:
-                if first_tag:
-                    first_tag = False
-                else:
-                    output_string = output_string + " "
-                output_string = output_string + i
-            output_string = output_string + "]"
-            if v.get_flagged():
-                flag_reason = v.get_flag_reason()
-                output_string = output_string + " - FLAGGED (reason: "+flag_reason+")"
-            output_list.append(output_string)
-        output_list = sorted(output_list)
-        print("Here's a list of all available videos:")
-        for l in output_list:
-            print("  " + l)
+        num_videos = len(self._video_library)
+        self._print(f"{num_videos} videos in the library")
+
+    def show_all_videos(self, limit=None, offset=0):
+        """Returns all videos.
+
+        Args:
+            limit: The maximum number of videos to list, or None for all.
+            offset: The number of videos to skip, for paging.
+        """
+        output_list = self._video_library.get_sorted_display_lines(
+            limit, offset)
+        self._print("Here's a list of all available videos:"
+              + "".join("\n  " + l for l in output_list))
 
     def play_video(self, video_id):
         """Plays the respective video.
@@ -52,98 +105,73 @@ class VideoPlayer:
             selected_video = self._video_library.get_video(video_id)
             if selected_video.get_flagged():
                 flag_reason = selected_video.get_flag_reason()
-                print("Cannot play video: Video is currently flagged (reason: "+flag_reason+")")
+                self._print("Cannot play video: Video is currently flagged (reason: "+flag_reason+")")
             else:
                 selected_video_title = selected_video.title
                 if len(self.currently_playing.title) != 0:
                     video_playing = self.currently_playing.title
                     self.stop_video()
-                    print("Playing video: " + selected_video_title)
+                    self._print("Playing video: " + selected_video_title)
                 else:
-                    print("Playing video: " + selected_video_title)
+                    self._print("Playing video: " + selected_video_title)
                 self.currently_playing = selected_video
         except AttributeError:
-            print("Cannot play video: Video does not exist")
+            self._print("Cannot play video: Video does not exist")
 
     def stop_video(self):
         """Stops the current video."""
         if len(self.currently_playing.title) != 0:
             video_playing = self.currently_playing.title
-            print("Stopping video: " + self.currently_playing.title)
-            self.currently_playing =  Video("","",[])
+            self._print("Stopping video: " + self.currently_playing.title)
+            self.currently_playing =  NO_VIDEO
             self.paused = False
         else:
-            print("Cannot stop video: No video is currently playing")
+            self._print("Cannot stop video: No video is currently playing")
 
     def play_random_video(self):
         """Plays a random video from the video library."""
-        try:
-            video_list = self._video_library.get_all_videos()
-            video_list_copy = self._video_library.get_all_videos()
-            for v in video_list_copy:
-                if v.get_flagged():
-                    video_list.remove(v)
-            if len(video_list)>0:
-                selected_video = random.choice(video_list)
-                selected_video_title = selected_video.title
-                if selected_video.get_flagged():
-                    flag_reason = selected_video.get_flag_reason()
-                    print("Cannot play video: Video is currently flagged (reason: "+flag_reason+")")
-                else:
-                    if len(self.currently_playing.title) != 0:
-                        self.stop_video()
-                        video_playing = self.currently_playing.title
-                        print("Playing video: " + selected_video_title)
-                    else:
-                        print("Playing video: " + selected_video_title)
-                self.currently_playing = selected_video
-            else:
-                print("No videos available")
-        except AttributeError:
-            print("No videos available")
+        selected_video = self._video_library.get_random_video()
+        if selected_video is None:
+            self._print("No videos available")
+        else:
+            if len(self.currently_playing.title) != 0:
+                self.stop_video()
+            self._print("Playing video: " + selected_video.title)
+            self.currently_playing = selected_video
 
     def pause_video(self):
         """Pauses the current video."""
         if len(self.currently_playing.title) != 0:
             video_playing = self.currently_playing.title
             if self.paused:
-                print("Video already paused: " + self.currently_playing.title)
+                self._print("Video already paused: " + self.currently_playing.title)
             else:
-                print("Pausing video: " + self.currently_playing.title)
+                self._print("Pausing video: " + self.currently_playing.title)
                 self.paused = True
         else:
-            print("Cannot pause video: No video is currently playing")
+            self._print("Cannot pause video: No video is currently playing")
 
     def continue_video(self):
         """Resumes playing the current video."""
         if len(self.currently_playing.title) != 0:
             video_playing = self.currently_playing.title
             if self.paused:
-                print("Continuing video: " + self.currently_playing.title)
+                self._print("Continuing video: " + self.currently_playing.title)
                 self.paused = False
             else:
-                print("Cannot continue video: Video is not paused")
+                self._print("Cannot continue video: Video is not paused")
         else:
-            print("Cannot continue video: No video is currently playing")
+            self._print("Cannot continue video: No video is currently playing")
 
     def show_playing(self):
         """Displays video currently playing."""
         if len(self.currently_playing.title) != 0:
-            v = self.currently_playing
-            output_string = v.title + " (" + v.video_id + ") ["
-            first_tag = True
-            for i in v.tags:
-                if first_tag:
-                    first_tag = False
-                else:
-                    output_string = output_string + " "
-                output_string = output_string + i
-            output_string = output_string + "]"
+            output_string = self.currently_playing.display_line()
             if self.paused:
                 output_string = output_string + " - PAUSED"
-            print("Currently playing: " + output_string)
+            self._print("Currently playing: " + output_string)
         else:
-            print("No video is currently playing")
+            self._print("No video is currently playing")
 
     def create_playlist(self, playlist_name):
         """Creates a playlist with a given name.
@@ -151,23 +179,14 @@ class VideoPlayer:
         Args:
             playlist_name: The playlist name.
         """
-        try:
-            if len(playlist_name.split())>1:
-                print("Cannot create playlist: Invalid name - contains whitespace")
-            else:
-                unique = True
-                if len(list(self.playlists.values()))>0:
-                    for p in self.playlists.values():
-                        if p.title.lower() == playlist_name.lower():
-                            unique = False
-                if unique:
-                    new_playlist = Playlist(playlist_name)
-                    self.playlists[new_playlist.title]=new_playlist
-                    print("Successfully created new playlist: " + playlist_name)
-                else:
-                    print("Cannot create playlist: A playlist with the same name already exists")
-        except:
-            print("Cannot create playlist: A playlist with the same name already exists")
+        if len(playlist_name.split())>1:
+            self._print("Cannot create playlist: Invalid name - contains whitespace")
+        elif self.playlists.add(Playlist(playlist_name)):
+            if self.session.journal is not None:
+                self.session.journal.record_create(playlist_name)
+            self._print("Successfully created new playlist: " + playlist_name)
+        else:
+            self._print("Cannot create playlist: A playlist with the same name already exists")
 
     def add_to_playlist(self, playlist_name, video_id):
         """Adds a video to a playlist with a given name.
@@ -176,51 +195,36 @@ class VideoPlayer:
             playlist_name: The playlist name.
             video_id: The video_id to be added.
         """
-        try:
-            selected_playlist = Playlist("")
-            if len(list(self.playlists.values()))>0:
-                for p in self.playlists.values():
-                    if p.title.lower() == playlist_name.lower():
-                        selected_playlist = p
-                if len(selected_playlist.title)>0:
-                    selected_video = self._video_library.get_video(video_id)
-                    if selected_video == None:
-                        print("Cannot add video to " + playlist_name + ": Video does not exist")
-                    else:
-                        if selected_video.get_flagged():
-                            flag_reason = selected_video.get_flag_reason()
-                            print("Cannot add video to " + playlist_name + ": Video is currently flagged (reason: "+flag_reason+")")
-                        else:
-                            selected_video_title = selected_video.title
-                            new_video = True
-                            for v in selected_playlist.get_videos():
-                                if v.video_id == selected_video.video_id:
-                                    new_video = False
-                            if new_video:
-                                selected_playlist.add_video(selected_video)
-                                print("Added video to " + playlist_name + ": " + selected_video_title)
-                            else:
-                                print("Cannot add video to " + playlist_name + ": Video already added")
-                else:
-                    print("Cannot add video to " + playlist_name + ": Playlist does not exist")    
+        selected_playlist = self.playlists.get(playlist_name)
+        if selected_playlist is None:
+            self._print("Cannot add video to " + playlist_name + ": Playlist does not exist")
+            return
+        selected_video = self._video_library.get_video(video_id)
+        if selected_video == None:
+            self._print("Cannot add video to " + playlist_name + ": Video does not exist")
+        else:
+            if selected_video.get_flagged():
+                flag_reason = selected_video.get_flag_reason()
+                self._print("Cannot add video to " + playlist_name + ": Video is currently flagged (reason: "+flag_reason+")")
             else:
-                print("Cannot add video to " + playlist_name + ": Playlist does not exist")
-        except:
-            print("Error")
+                selected_video_title = selected_video.title
+                if selected_video.video_id not in selected_playlist:
+                    selected_playlist.add_video(selected_video)
+                    if self.session.journal is not None:
+                        self.session.journal.record_add(
+                            selected_playlist.title, selected_video.video_id)
+                    self._print("Added video to " + playlist_name + ": " + selected_video_title)
+                else:
+                    self._print("Cannot add video to " + playlist_name + ": Video already added")
 
     def show_all_playlists(self):
         """Display all playlists."""
-        playlist_list = self.playlists.values()
-        if len(playlist_list)>0:
-            output_list = []
-            for p in playlist_list:
-                output_list.append(p.title)
-            output_list = sorted(output_list)
-            print("Showing all playlists:")
-            for l in output_list:
-                print("  " + l)
+        if len(self.playlists)>0:
+            self._print("Showing all playlists:")
+            for l in self.playlists.sorted_titles():
+                self._print("  " + l)
         else:
-            print("No playlists exist yet")
+            self._print("No playlists exist yet")
 
     def show_playlist(self, playlist_name):
         """Display all videos in a playlist with a given name.
@@ -228,34 +232,16 @@ class VideoPlayer:
         Args:
             playlist_name: The playlist name.
         """
-        playlist_list = self.playlists.values()
-        selected_playlist = Playlist("")
-        if len(list(playlist_list))>0:
-            for p in playlist_list:
-                if p.title.lower() == playlist_name.lower():
-                    selected_playlist = p
-        if len(selected_playlist.title)>0:
-            print("Showing playlist: "+playlist_name)
-            video_list = selected_playlist.get_videos()
-            if len(video_list)>0:
-                for v in video_list:
-                    output_string = v.title + " (" + v.video_id + ") ["
-                    first_tag = True
-                    for i in v.tags:
-                        if first_tag:
-                            first_tag = False
-                        else:
-                            output_string = output_string + " "
-                        output_string = output_string + i
-                    output_string = output_string + "]"
-                    if v.get_flagged():
-                        flag_reason = v.get_flag_reason()
-                        output_string = output_string + " - FLAGGED (reason: "+flag_reason+")"
-                    print(output_string)
+        selected_playlist = self.playlists.get(playlist_name)
+        if selected_playlist is not None:
+            self._print("Showing playlist: "+playlist_name)
+            if len(selected_playlist)>0:
+                self._print("\n".join(
+                    v.display_line() for v in selected_playlist))
             else:
-                print("No videos here yet")
+                self._print("No videos here yet")
         else:
-            print("Cannot show playlist "+playlist_name+": Playlist does not exist")
+            self._print("Cannot show playlist "+playlist_name+": Playlist does not exist")
 
     def remove_from_playlist(self, playlist_name, video_id):
         """Removes a video to a playlist with a given name.
@@ -264,30 +250,23 @@ class VideoPlayer:
             playlist_name: The playlist name.
             video_id: The video_id to be removed.
         """
-        playlist_list = self.playlists.values()
-        selected_playlist = Playlist("")
-        if len(list(playlist_list))>0:
-                for p in playlist_list:
-                    if p.title.lower() == playlist_name.lower():
-                        selected_playlist = p
-        if len(selected_playlist.title)==0:
-            print("Cannot remove video from "+playlist_name+": Playlist does not exist")
+        selected_playlist = self.playlists.get(playlist_name)
+        if selected_playlist is None:
+            self._print("Cannot remove video from "+playlist_name+": Playlist does not exist")
         else:
             selected_video = self._video_library.get_video(video_id)
             if selected_video == None:
-                print("Cannot remove video from " + playlist_name + ": Video does not exist")
+                self._print("Cannot remove video from " + playlist_name + ": Video does not exist")
             else:
                 selected_video_title = selected_video.title
-                video_in_playlist = False
-                for v in selected_playlist.get_videos():
-                    if v.video_id == selected_video.video_id:
-                        video_in_playlist = True
-                if video_in_playlist:
+                if selected_video.video_id in selected_playlist:
                     selected_playlist.remove_video(selected_video)
-                    print("Removed video from " + playlist_name + ": " + selected_video_title)
+                    if self.session.journal is not None:
+                        self.session.journal.record_remove(
+                            selected_playlist.title, selected_video.video_id)
+                    self._print("Removed video from " + playlist_name + ": " + selected_video_title)
                 else:
-                    print("Cannot remove video from " + playlist_name + ": Video is not in playlist")
-
+                    self._print("Cannot remove video from " + playlist_name + ": Video is not in playlist")
 
     def clear_playlist(self, playlist_name):
         """Removes all videos from a playlist with a given name.
@@ -295,22 +274,14 @@ class VideoPlayer:
         Args:
             playlist_name: The playlist name.
         """
-        try:
-            playlist_list = self.playlists.values()
-            selected_playlist = Playlist("")
-            if len(list(playlist_list))>0:
-                for p in playlist_list:
-                    if p.title.lower() == playlist_name.lower():
-                        selected_playlist = p
-            if len(selected_playlist.title)==0:
-                print("Cannot clear playlist "+playlist_name+": Playlist does not exist")
-            else:
-                for v in selected_playlist.get_videos():
-                    selected_playlist.remove_video(v)
-                print("Successfully removed all videos from "+playlist_name)
-        except:
-            print("Error")
-
+        selected_playlist = self.playlists.get(playlist_name)
+        if selected_playlist is None:
+            self._print("Cannot clear playlist "+playlist_name+": Playlist does not exist")
+        else:
+            selected_playlist.clear()
+            if self.session.journal is not None:
+                self.session.journal.record_clear(selected_playlist.title)
+            self._print("Successfully removed all videos from "+playlist_name)
 
     def delete_playlist(self, playlist_name):
         """Deletes a playlist with a given name.
@@ -318,107 +289,105 @@ class VideoPlayer:
         Args:
             playlist_name: The playlist name.
         """
+        if self.playlists.remove(playlist_name) is None:
+            self._print("Cannot delete playlist "+playlist_name+": Playlist does not exist")
+        else:
+            if self.session.journal is not None:
+                self.session.journal.record_delete(playlist_name)
+            self._print("Deleted playlist: "+playlist_name)
+
+    def _show_results(self, search_term, videos, selection):
+        """Lists search results and plays the one selected, if any."""
+        if not videos:
+            self._print("No search results for "+search_term)
+            return None
+        results = self.session.add_results(search_term, videos)
+        self._print("Here are the results for "+search_term+":\n"
+              + "".join(f"  {count}) {v.display_line()}\n"
+                        for count, v in enumerate(videos, 1))
+              + "Would you like to play any of the above? If yes, specify the number of the video.\n"
+              + "If your answer is not a valid number, we will assume it's a no.")
+        selection = self._read_selection(selection)
         try:
-            playlist_list = self.playlists.values()
-            selected_playlist = Playlist("")
-            if len(list(playlist_list))>0:
-                for p in playlist_list:
-                    if p.title.lower() == playlist_name.lower():
-                        selected_playlist = p
-            if len(selected_playlist.title)==0:
-                print("Cannot delete playlist "+playlist_name+": Playlist does not exist")
-            else:
-                del self.playlists[selected_playlist.title]
-                print("Deleted playlist: "+playlist_name)
-        except:
-            print("Error")
-
-    def search_videos(self, search_term):
+            selected_video = results.get(int(selection))
+        except (TypeError, ValueError):
+            selected_video = None
+        if selected_video is not None:
+            self.play_video(selected_video.video_id)
+        return results
+
+    def search_videos(self, search_term, selection=None):
         """Display all the videos whose titles contain the search_term.
 
         Args:
             search_term: The query to be used in search.
+            selection: The number of the result to play. When it is not
+                given, an interactive player asks for it.
+
+        Returns:
+            The ResultSet kept in the session, or None if nothing matched.
         """
-        video_list = self._video_library.get_all_videos()
-        output_list = []
-        for v in video_list:
-            if search_term.lower() in v.title.lower():
-                if not v.get_flagged():
-                    output_string = v.title + " (" + v.video_id + ") ["
-                    first_tag = True
-                    for i in v.tags:
-                        if first_tag:
-                            first_tag = False
-                        else:
-                            output_string = output_string + " "
-                        output_string = output_string + i
-                    output_string = output_string + "]"
-                    output_list.append(output_string)
-        output_list = sorted(output_list)
-        if len(output_list) > 0:
-            print("Here are the results for "+search_term+":")
-            count = 1
-            for l in output_list:
-                print("  "+str(count)+") " + l)
-                count += 1
-            print("Would you like to play any of the above? If yes, specify the number of the video.")
-            print("If your answer is not a valid number, we will assume it's a no.")
-            command = input("")
-            try:
-                selected_video = output_list[int(command)-1]
-                selected_video_id = selected_video.split(" (")[1]
-                selected_video_id = selected_video_id.split(")")[0]
-                selected_video_id.strip("(")
-                selected_video = self._video_library.get_video(selected_video_id)
-                self.play_video(selected_video.video_id)
-            except:
-                error = "Error"
-        else:
-            print ("No search results for "+search_term)
+        videos = self._video_library.find_videos(search_term)
+        _SEARCH_RESULTS.labels("SEARCH_VIDEOS").record(len(videos))
+        return self._show_results(search_term, videos, selection)
 
-    def search_videos_tag(self, video_tag):
+    def search_videos_tag(self, video_tag, selection=None):
         """Display all videos whose tags contains the provided tag.
 
         Args:
             video_tag: The video tag to be used in search.
+            selection: The number of the result to play. When it is not
+                given, an interactive player asks for it.
+
+        Returns:
+            The ResultSet kept in the session, or None if nothing matched.
         """
-        video_list = self._video_library.get_all_videos()
-        output_list = []
-        for v in video_list:
-            for t in v.tags:
-                if video_tag.lower() in t.lower():
-                    if not v.get_flagged():
-                        output_string = v.title + " (" + v.video_id + ") ["
-                        first_tag = True
-                        for i in v.tags:
-                            if first_tag:
-                                first_tag = False
-                            else:
-                                output_string = output_string + " "
-                            output_string = output_string + i
-                        output_string = output_string + "]"
-                        output_list.append(output_string)
-        output_list = sorted(output_list)
-        if len(output_list) > 0:
-            print("Here are the results for "+video_tag+":")
-            count = 1
-            for l in output_list:
-                print("  "+str(count)+") " + l)
-                count += 1
-            print("Would you like to play any of the above? If yes, specify the number of the video.")
-            print("If your answer is not a valid number, we will assume it's a no.")
-            command = input("")
-            try:
-                selected_video = output_list[int(command)-1]
-                selected_video_id = selected_video.split(" (")[1]
-                selected_video_id = selected_video_id.split(")")[0]
-                selected_video_id.strip("(")
-                selected_video = self._video_library.get_video(selected_video_id)
-                self.play_video(selected_video.video_id)
-            except:
-                error = "Error"
-        else:
-            print ("No search results for "+video_tag)
+        videos = self._video_library.find_videos(video_tag, by_tag=True)
+        _SEARCH_RESULTS.labels("SEARCH_VIDEOS_WITH_TAG").record(len(videos))
+        return self._show_results(video_tag, videos, selection)
+
+    def search_videos_ranked(self, query):
+        """Display the videos that best match the words of a query.
+
+        Args:
+            query: The words to look for in titles and tags.
+
+        Returns:
+            The ResultSet kept in the session, or None if nothing matched.
+        """
+        video_list = self._video_library.search_ranked(
+            query, _RANKED_RESULTS)
+        _SEARCH_RESULTS.labels("SEARCH_RANKED").record(len(video_list))
+        if not video_list:
+            self._print("No search results for "+query)
+            return None
+        self._print("Here are the top results for "+query+":"
+              + "".join(f"\n  {count}) {v.display_line()}"
+                        for count, v in enumerate(video_list, 1)))
+        return self.session.add_results(query, video_list)
+
+    def play_result(self, number, result_id=None):
+        """Plays a video listed by an earlier search.
+
+        Args:
+            number: The number the video was listed with.
+            result_id: The id of the search, counting the session's
+                searches from 1. Defaults to the latest search.
+        """
+        results = self.session.get_results(result_id)
+        if results is None:
+            if result_id is None:
+                self._print("Cannot play result: No search results yet")
+            else:
+                self._print(f"Cannot play result: Search {result_id} "
+                            "is not available")
+            return
+        video = results.get(number)
+        if video is None:
+            self._print(f"Cannot play result {number}: There are only "
+                        f"{len(results)} results for {results.query}")
+            return
+        self.play_video(video.video_id)
 
     def flag_video(self, video_id, flag_reason=""):
         """Mark a video as flagged.
@@ -431,15 +400,15 @@ class VideoPlayer:
             flag_reason = "Not supplied"
         selected_video = self._video_library.get_video(video_id)
         if selected_video == None:
-            print("Cannot flag video: Video does not exist")
+            self._print("Cannot flag video: Video does not exist")
         else:
             if selected_video.get_flagged():
-                print ("Cannot flag video: Video is already flagged")
+                self._print("Cannot flag video: Video is already flagged")
             else:
                 selected_video.set_flag(flag_reason)
                 if self.currently_playing.video_id == selected_video.video_id:
                     self.stop_video()
-                print("Successfully flagged video: "+selected_video.title + " (reason: "+flag_reason+")")
+                self._print("Successfully flagged video: "+selected_video.title + " (reason: "+flag_reason+")")
                 
 
     def allow_video(self, video_id):
@@ -450,11 +419,165 @@ class VideoPlayer:
         """
         selected_video = self._video_library.get_video(video_id)
         if selected_video == None:
-            print("Cannot remove flag from video: Video does not exist")
+            self._print("Cannot remove flag from video: Video does not exist")
         else:
             if not selected_video.get_flagged():
-                print ("Cannot remove flag from video: Video is not flagged")
+                self._print("Cannot remove flag from video: Video is not flagged")
             else:
-                selected_video.remove_flag
-                print("Successfully removed flag from video: "+selected_video.title)
-                
+                selected_video.remove_flag()
+                self._print("Successfully removed flag from video: "+selected_video.title)
+
+    def _print_summary(self, summary, errors, limit=None):
+        shown = errors if limit is None else errors[:limit]
+        text = summary + "".join(
+            "\n  " + video_id + ": " + error for video_id, error in shown)
+        if len(shown) < len(errors):
+            text += f"\n  ... and {len(errors) - len(shown)} more"
+        self._print(text)
+
+    def add_many_to_playlist(self, playlist_name, video_ids):
+        """Adds several videos to a playlist with a given name.
+
+        The playlist is looked up once. One summary line is printed,
+        followed by a line for every video that could not be added.
+
+        Args:
+            playlist_name: The playlist name.
+            video_ids: The video_ids to be added.
+        """
+        selected_playlist = self.playlists.get(playlist_name)
+        if selected_playlist is None:
+            self._print("Cannot add videos to " + playlist_name + ": Playlist does not exist")
+            return
+        journal = self.session.journal
+        errors = []
+        for video_id in video_ids:
+            selected_video = self._video_library.get_video(video_id)
+            if selected_video is None:
+                errors.append((video_id, "Video does not exist"))
+            elif selected_video.get_flagged():
+                errors.append((video_id, "Video is currently flagged (reason: "
+                               + selected_video.get_flag_reason() + ")"))
+            elif video_id in selected_playlist:
+                errors.append((video_id, "Video already added"))
+            else:
+                selected_playlist.add_video(selected_video)
+                if journal is not None:
+                    journal.record_add(selected_playlist.title, video_id)
+        added = len(video_ids) - len(errors)
+        self._print_summary(
+            f"Added {added} videos to {playlist_name}", errors)
+
+    def remove_many_from_playlist(self, playlist_name, video_ids):
+        """Removes several videos from a playlist with a given name.
+
+        Args:
+            playlist_name: The playlist name.
+            video_ids: The video_ids to be removed.
+        """
+        selected_playlist = self.playlists.get(playlist_name)
+        if selected_playlist is None:
+            self._print("Cannot remove videos from " + playlist_name + ": Playlist does not exist")
+            return
+        journal = self.session.journal
+        errors = []
+        for video_id in video_ids:
+            selected_video = self._video_library.get_video(video_id)
+            if selected_video is None:
+                errors.append((video_id, "Video does not exist"))
+            elif video_id not in selected_playlist:
+                errors.append((video_id, "Video is not in playlist"))
+            else:
+                selected_playlist.remove_video(selected_video)
+                if journal is not None:
+                    journal.record_remove(selected_playlist.title, video_id)
+        removed = len(video_ids) - len(errors)
+        self._print_summary(
+            f"Removed {removed} videos from {playlist_name}", errors)
+
+    def flag_videos(self, video_ids, flag_reason="", max_errors=None):
+        """Marks several videos as flagged.
+
+        Args:
+            video_ids: The video_ids to be flagged.
+            flag_reason: Reason for flagging the videos.
+            max_errors: The maximum number of videos that could not be
+                flagged to list, or None to list them all.
+        """
+        if len(flag_reason)==0:
+            flag_reason = "Not supplied"
+        errors = []
+        for video_id in video_ids:
+            selected_video = self._video_library.get_video(video_id)
+            if selected_video is None:
+                errors.append((video_id, "Video does not exist"))
+            elif selected_video.get_flagged():
+                errors.append((video_id, "Video is already flagged"))
+            else:
+                selected_video.set_flag(flag_reason)
+                if self.currently_playing.video_id == video_id:
+                    self.stop_video()
+        flagged = len(video_ids) - len(errors)
+        self._print_summary(
+            f"Flagged {flagged} videos (reason: {flag_reason})", errors,
+            max_errors)
+
+    def flag_videos_from_file(self, path, flag_reason=""):
+        """Marks the videos listed in a file as flagged.
+
+        Only the first few lines that are not videos are listed, so that
+        the command does not print back a file that holds something else.
+
+        Args:
+            path: A file with one video_id per line. Blank lines are ignored.
+            flag_reason: Reason for flagging the videos.
+        """
+        try:
+            with open(path, encoding="utf-8") as id_file:
+                video_ids = [line.strip() for line in id_file if line.strip()]
+        except (OSError, ValueError) as e:
+            # ValueError covers files that are not text, which fail to
+            # decode.
+            self._print("Cannot flag videos: " + str(e))
+            return
+        self.flag_videos(video_ids, flag_reason, _MAX_FILE_ERRORS)
+
+    def get_completions(self, kind, prefix, limit=10):
+        """Returns the completions of a partial title, tag or playlist name.
+
+        Args:
+            kind: What to complete: "TITLE", "TAG" or "PLAYLIST", in any
+                case.
+            prefix: The start of the name, in any case.
+            limit: The maximum number of completions to return.
+
+        Returns:
+            A list of completions in alphabetical order, ignoring case, or
+            None if kind is not one of the above.
+        """
+        kind = kind.upper()
+        if kind == "TITLE":
+            return self._video_library.complete_titles(prefix, limit)
+        if kind == "TAG":
+            return self._video_library.complete_tags(prefix, limit)
+        if kind == "PLAYLIST":
+            return self.playlists.complete(prefix, limit)
+        return None
+
+    def complete(self, kind, prefix, limit=10):
+        """Display the titles, tags or playlist names that start with prefix.
+
+        Args:
+            kind: What to complete: "TITLE", "TAG" or "PLAYLIST".
+            prefix: The start of the name, in any case.
+            limit: The maximum number of completions to display.
+        """
+        completions = self.get_completions(kind, prefix, limit)
+        if completions is None:
+            self._print("Cannot complete " + kind
+                        + ": Choose TITLE, TAG or PLAYLIST")
+        elif completions:
+            self._print("Completions for " + prefix + ":\n"
+                        + "\n".join("  " + c for c in completions))
+        else:
+            self._print("No completions for " + prefix)
@@ -1,32 +1,200 @@
 """A video playlist class."""
 
-from .video import Video
-import traceback
+from .completion import PrefixIndex
+import bisect
+
+
+class _Entry:
+    """A class used to hold one video of a playlist in its order list."""
+
+    __slots__ = ("video_id", "video")
+
+    def __init__(self, video_id, video):
+        self.video_id = video_id
+        self.video = video
+
 
 class Playlist:
-    """A class used to represent a Playlist."""
+    """A class used to represent a Playlist.
+
+    The videos are kept in a list of entries in playlist order, and a dict
+    maps each video id to its entry. Removing a video by id only marks its
+    entry as removed, so appending, removing, testing membership and
+    iterating never depend on the playlist's length. Removed entries are
+    dropped from the list once they outnumber the videos, or before a
+    positional operation, which then works on the plain list.
+    """
 
     def __init__(self, playlist_title: str):
         """Playlist constructor."""
         self._title = playlist_title
-        self._videos = {}
+        self._entries = {}
+        self._order = []
+        self._removed = 0
 
     @property
     def title(self) -> str:
         """Returns the title of a video."""
         return self._title
-    
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, video_id):
+        """Returns whether the video with the given id is in the playlist."""
+        return video_id in self._entries
+
+    def __iter__(self):
+        """Iterates over the videos in playlist order without copying."""
+        return (entry.video for entry in self._order
+                if entry.video_id is not None)
+
     def get_videos(self):
-        """Returns the title of a video."""
-        return list(self._videos.values())
+        """Returns a list of the videos in playlist order."""
+        return list(self)
 
     def add_video(self, video_object):
-        try:
-            self._videos[video_object.video_id] = video_object
-        except:
-            traceback.print_exc()
+        """Appends a video, unless it is already in the playlist."""
+        self._append(video_object.video_id, video_object)
+
+    def _append(self, video_id, video_object):
+        if video_id not in self._entries:
+            entry = _Entry(video_id, video_object)
+            self._entries[video_id] = entry
+            self._order.append(entry)
+
+    def _compact(self):
+        """Drops the entries of removed videos from the order list."""
+        if self._removed:
+            self._order = [entry for entry in self._order
+                           if entry.video_id is not None]
+            self._removed = 0
+
+    def insert_video(self, index, video_object):
+        """Inserts a video before the given position.
+
+        Nothing happens if the video is already in the playlist.
+        """
+        video_id = video_object.video_id
+        if video_id in self._entries:
+            return
+        self._compact()
+        entry = _Entry(video_id, video_object)
+        self._entries[video_id] = entry
+        self._order.insert(index, entry)
 
     def remove_video(self, video_object):
-        del self._videos[video_object.video_id]
+        """Removes a video. Raises KeyError if it is not in the playlist."""
+        entry = self._entries.pop(video_object.video_id)
+        entry.video_id = None
+        self._removed += 1
+        if self._removed > len(self._entries):
+            self._compact()
+
+    def remove_at(self, index):
+        """Removes and returns the video at the given position."""
+        self._compact()
+        entry = self._order.pop(index)
+        del self._entries[entry.video_id]
+        return entry.video
+
+    def move_video(self, from_index, to_index):
+        """Moves the video at from_index so that it ends up at to_index."""
+        self._compact()
+        self._order.insert(to_index, self._order.pop(from_index))
+
+    def index(self, video_id):
+        """Returns the position of a video. Raises ValueError if absent."""
+        entry = self._entries.get(video_id)
+        if entry is None:
+            raise ValueError(video_id + " is not in the playlist")
+        self._compact()
+        return self._order.index(entry)
+
+    def clear(self):
+        """Removes all videos."""
+        self._entries = {}
+        self._order = []
+        self._removed = 0
+
+
+class PlaylistRegistry:
+    """A class used to look up playlists by name, ignoring case.
+
+    Playlists are keyed by their case-folded name, so lookup, creation and
+    deletion do not depend on how many playlists exist. The display titles
+    are also kept in a sorted list that is updated on every change, so
+    listing them never needs a full sort. The same goes for the prefix
+    index used to complete playlist names.
+    """
+
+    def __init__(self):
+        """PlaylistRegistry constructor."""
+        self._playlists = {}
+        self._sorted_titles = []
+        self._completions = PrefixIndex()
+
+    def __len__(self):
+        return len(self._playlists)
+
+    def __contains__(self, playlist_name):
+        return playlist_name.lower() in self._playlists
+
+    def get(self, playlist_name):
+        """Returns the playlist with the given name, or None if there is none.
+
+        Args:
+            playlist_name: The playlist name, in any case.
+        """
+        return self._playlists.get(playlist_name.lower())
+
+    def add(self, playlist):
+        """Registers a playlist.
+
+        Args:
+            playlist: The Playlist to register.
+
+        Returns:
+            False if a playlist with the same name, ignoring case, already
+            exists. True otherwise.
+        """
+        key = playlist.title.lower()
+        if key in self._playlists:
+            return False
+        self._playlists[key] = playlist
+        bisect.insort(self._sorted_titles, playlist.title)
+        self._completions.add(playlist.title)
+        return True
+
+    def remove(self, playlist_name):
+        """Unregisters the playlist with the given name.
+
+        Args:
+            playlist_name: The playlist name, in any case.
+
+        Returns:
+            The removed Playlist, or None if it did not exist.
+        """
+        playlist = self._playlists.pop(playlist_name.lower(), None)
+        if playlist is not None:
+            titles = self._sorted_titles
+            del titles[bisect.bisect_left(titles, playlist.title)]
+            self._completions.discard(playlist.title)
+        return playlist
+
+    def sorted_titles(self):
+        """Returns an iterator over the display titles in sorted order."""
+        return iter(self._sorted_titles)
+
+    def complete(self, prefix, limit=10):
+        """Returns up to limit display titles that start with prefix.
+
+        Args:
+            prefix: The start of a playlist name, in any case.
+            limit: The maximum number of titles to return.
+        """
+        return self._completions.complete(prefix, limit)
 
-    
\ No newline at end of file
+    def values(self):
+        """Returns a view of all registered playlists."""
+        return self._playlists.values()
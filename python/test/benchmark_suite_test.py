@@ -0,0 +1,52 @@
+from benchmarks import suite
+from benchmarks.synthetic_catalog import generate
+from benchmarks.synthetic_catalog import write_catalog
+from src.command_parser import CommandParser
+from src.video_library import VideoLibrary
+from src.video_player import VideoPlayer
+
+
+def test_synthetic_catalog_is_deterministic(tmp_path):
+    assert list(generate(50, seed=3)) == list(generate(50, seed=3))
+    assert list(generate(50, seed=3)) != list(generate(50, seed=4))
+    catalog_path = tmp_path / "videos.txt"
+    write_catalog(catalog_path, 500)
+    library = VideoLibrary(catalog_path)
+    assert len(library.get_all_videos()) == 500
+    assert library.get_video(next(generate(1))[1]) is not None
+
+
+def test_suite_times_every_command():
+    report = suite.run([200], repeat=2)
+    timed = {name.split()[0] for name in report["sizes"][0]["commands"]}
+    verbs = set(CommandParser(VideoPlayer()).commands())
+    assert timed == verbs
+    assert report["sizes"][0]["videos"] == 200
+    assert report["dispatch"]
+
+
+def test_compare_reports_slower_timings():
+    def report(load_seconds, play_ms):
+        return {"sizes": [{
+            "videos": 1000,
+            "load": {"load_text_s": load_seconds},
+            "commands": {"PLAY": {"median_ms": play_ms}},
+        }]}
+
+    assert suite.compare(report(1.0, 1.0), report(1.2, 0.5)) == []
+    assert suite.compare(report(1.0, 1.0), report(1.0, 2.0)) == [
+        "1000 videos, PLAY: 1 -> 2"]
+
+
+def test_compare_reports_slower_dispatch():
+    def report(table_ns, elif_chain_ns=5000):
+        return {"sizes": [], "dispatch": [{
+            "command": "PLAY", "elif_chain_ns": elif_chain_ns,
+            "table_ns": table_ns}]}
+
+    assert suite.compare(report(600), report(700)) == []
+    assert suite.compare(report(600), report(900)) == [
+        "dispatch, PLAY: 600 -> 900 ns"]
+    assert suite.compare(report(600), report(700, 650)) == [
+        "dispatch, PLAY: 700 ns, slower than the elif chain's 650 ns"]
+
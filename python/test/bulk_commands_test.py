@@ -0,0 +1,81 @@
+from src.command_parser import CommandParser
+from src.video_player import VideoPlayer
+
+
+def test_add_many_to_playlist(capfd):
+    player = VideoPlayer()
+    parser = CommandParser(player)
+    player.create_playlist("my_playlist")
+    player.flag_video("nothing_video_id", "boring")
+    parser.execute_command([
+        "ADD_MANY_TO_PLAYLIST", "MY_playlist", "amazing_cats_video_id",
+        "funny_dogs_video_id", "amazing_cats_video_id", "missing_video_id",
+        "nothing_video_id"])
+    player.show_playlist("my_playlist")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 9
+    assert "Added 2 videos to MY_playlist" in lines[2]
+    assert "amazing_cats_video_id: Video already added" in lines[3]
+    assert "missing_video_id: Video does not exist" in lines[4]
+    assert "nothing_video_id: Video is currently flagged (reason: boring)" \
+           in lines[5]
+    assert "Amazing Cats (amazing_cats_video_id)" in lines[7]
+    assert "Funny Dogs (funny_dogs_video_id)" in lines[8]
+
+
+def test_remove_many_from_playlist(capfd):
+    player = VideoPlayer()
+    player.create_playlist("my_playlist")
+    player.add_many_to_playlist(
+        "my_playlist", ["amazing_cats_video_id", "funny_dogs_video_id"])
+    player.remove_many_from_playlist(
+        "my_playlist", ["funny_dogs_video_id", "nothing_video_id"])
+    player.remove_many_from_playlist("other", ["funny_dogs_video_id"])
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 5
+    assert "Removed 1 videos from my_playlist" in lines[2]
+    assert "nothing_video_id: Video is not in playlist" in lines[3]
+    assert "Cannot remove videos from other: Playlist does not exist" \
+           in lines[4]
+
+
+def test_flag_videos_from_file(tmp_path, capfd):
+    id_file = tmp_path / "ids.txt"
+    id_file.write_text("amazing_cats_video_id\n\nmissing_video_id\n")
+    player = VideoPlayer()
+    player.play_video("amazing_cats_video_id")
+    CommandParser(player).execute_command(
+        ["FLAG_VIDEOS_FROM_FILE", str(id_file), "spam"])
+    player.play_video("amazing_cats_video_id")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 5
+    assert "Stopping video: Amazing Cats" in lines[1]
+    assert "Flagged 1 videos (reason: spam)" in lines[2]
+    assert "missing_video_id: Video does not exist" in lines[3]
+    assert "Cannot play video: Video is currently flagged (reason: spam)" \
+           in lines[4]
+
+
+def test_flag_videos_from_file_lists_few_unknown_lines(tmp_path, capfd):
+    id_file = tmp_path / "ids.txt"
+    id_file.write_text("".join(f"line {number}\n" for number in range(25)))
+    CommandParser(VideoPlayer()).execute_command(
+        ["FLAG_VIDEOS_FROM_FILE", str(id_file), "spam"])
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 12
+    assert "Flagged 0 videos (reason: spam)" in lines[0]
+    assert "line 9: Video does not exist" in lines[10]
+    assert "... and 15 more" in lines[11]
+
+
+def test_flag_videos_from_binary_file(tmp_path, capfd):
+    id_file = tmp_path / "ids.bin"
+    id_file.write_bytes(bytes(range(128, 256)) * 4)
+    CommandParser(VideoPlayer()).execute_command(
+        ["FLAG_VIDEOS_FROM_FILE", str(id_file), "spam"])
+    out, err = capfd.readouterr()
+    assert out.startswith("Cannot flag videos: ")
@@ -0,0 +1,115 @@
+import os
+
+from src import catalog_snapshot
+from src.catalog import Catalog
+from src.catalog import clear_catalogs
+from src.catalog_snapshot import build_snapshot
+from src.catalog_snapshot import read_snapshot
+from src.catalog_snapshot import read_text_catalog
+from src.video_library import DEFAULT_CATALOG_PATH
+from src.video_library import VideoLibrary
+
+
+def _write_catalog(tmp_path, text):
+    source = tmp_path / "videos.txt"
+    source.write_text(text)
+    return source
+
+
+def load_snapshot(source):
+    columns = read_snapshot(source)
+    if columns is None:
+        return None
+    catalog = Catalog.from_columns(columns)
+    return [
+        (catalog.title(index), catalog.video_id(index), catalog.tags(index))
+        for index in range(len(catalog))]
+
+
+def test_snapshot_round_trips_text_catalog(tmp_path):
+    source = _write_catalog(tmp_path, DEFAULT_CATALOG_PATH.read_text())
+    build_snapshot(source)
+
+    assert load_snapshot(source) == read_text_catalog(source)
+
+
+def test_missing_snapshot_is_not_loaded(tmp_path):
+    source = _write_catalog(tmp_path, "Funny Dogs | funny_dogs_video_id | #dog\n")
+    assert load_snapshot(source) is None
+
+
+def test_touched_source_is_checked_by_digest(tmp_path):
+    source = _write_catalog(tmp_path, "Funny Dogs | funny_dogs_video_id | #dog\n")
+    build_snapshot(source)
+    stat = source.stat()
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert load_snapshot(source) == [
+        ("Funny Dogs", "funny_dogs_video_id", ("#dog",))]
+
+
+def test_library_falls_back_to_text_when_snapshot_is_stale(tmp_path):
+    source = _write_catalog(tmp_path, "Funny Dogs | funny_dogs_video_id | #dog\n")
+    build_snapshot(source)
+    source.write_text("Amazing Cats | amazing_cats_video_id | #cat\n")
+
+    assert load_snapshot(source) is None
+    library = VideoLibrary(source)
+    assert [video.title for video in library.get_all_videos()] == [
+        "Amazing Cats"]
+
+
+def test_snapshot_catalog_searches_like_built_catalog(tmp_path):
+    source = _write_catalog(
+        tmp_path, DEFAULT_CATALOG_PATH.read_text()
+        + "\nCafé Crème | cafe_video_id | #Café , #café\n")
+    built = VideoLibrary(source)
+    build_snapshot(source)
+    clear_catalogs()
+    loaded = VideoLibrary(source)
+
+    assert loaded._catalog is not built._catalog
+    for term in ["", "a", "ca", "cat", "Amazing", "é c", "CRÈME", "zzz"]:
+        assert ([video.video_id for video in loaded.find_videos(term)]
+                == [video.video_id for video in built.find_videos(term)])
+    for tag in ["#", "#CAF", "#dog", "#zzz"]:
+        assert ([video.video_id for video in loaded.find_videos(tag, True)]
+                == [video.video_id for video in built.find_videos(tag, True)])
+    assert loaded.get_video("cafe_video_id").tags == ("#Café", "#café")
+    for query in ["cat", "amazing animal", "café crème", "zzz"]:
+        assert ([video.video_id for video in loaded.search_ranked(query)]
+                == [video.video_id for video in built.search_ranked(query)])
+
+
+def test_truncated_snapshot_is_not_loaded(tmp_path):
+    source = _write_catalog(tmp_path, "Funny Dogs | funny_dogs_video_id | #dog\n")
+    snapshot = build_snapshot(source)
+    snapshot.write_bytes(snapshot.read_bytes()[:-3])
+    assert load_snapshot(source) is None
+    snapshot.write_bytes(b"")
+    assert load_snapshot(source) is None
+
+
+def test_snapshot_is_used_in_place(tmp_path, monkeypatch):
+    source = _write_catalog(tmp_path, DEFAULT_CATALOG_PATH.read_text())
+    build_snapshot(source)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("the snapshot should not be rebuilt")
+
+    # Loading must neither parse the text catalog nor rebuild the indexes,
+    # and the posting lists must be views of the mapped file.
+    monkeypatch.setattr(catalog_snapshot, "read_text_catalog", fail)
+    monkeypatch.setattr(catalog_snapshot, "build_columns", fail)
+    monkeypatch.setattr(catalog_snapshot.BM25Index, "__init__", fail)
+    clear_catalogs()
+    columns = catalog_snapshot.load_columns(source)
+    assert isinstance(columns.title_postings["cat"], memoryview)
+    assert isinstance(columns.tag_rows[0], memoryview)
+    assert isinstance(columns.tag_offsets, memoryview)
+    assert isinstance(columns.ranking.postings()[3], memoryview)
+    library = VideoLibrary(source)
+    assert [video.video_id for video in library.find_videos("cat")] == [
+        "amazing_cats_video_id", "another_cat_video_id"]
+    assert library.search_ranked("cat")[0].video_id == "another_cat_video_id"
+    clear_catalogs()
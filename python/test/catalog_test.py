@@ -0,0 +1,33 @@
+from src.catalog import get_catalog
+from src.video_library import VideoLibrary
+
+
+def test_libraries_share_one_catalog(tmp_path):
+    source = tmp_path / "videos.txt"
+    source.write_text("Funny Dogs | funny_dogs_video_id | #dog\n")
+
+    first = VideoLibrary(source)
+    second = VideoLibrary(source)
+    assert first._catalog is second._catalog
+
+
+def test_flags_are_not_shared_between_libraries():
+    first = VideoLibrary()
+    second = VideoLibrary()
+    first.get_video("amazing_cats_video_id").set_flag("dont_like_cats")
+
+    assert first.get_video("amazing_cats_video_id").get_flagged()
+    assert not second.get_video("amazing_cats_video_id").get_flagged()
+
+
+def test_catalog_reloads_when_file_changes(tmp_path):
+    source = tmp_path / "videos.txt"
+    source.write_text("Funny Dogs | funny_dogs_video_id | #dog\n")
+    catalog = get_catalog(source)
+    assert get_catalog(source) is catalog
+
+    source.write_text("Funny Dogs | funny_dogs_video_id | #dog\n"
+                      "Amazing Cats | amazing_cats_video_id | #cat\n")
+    reloaded = get_catalog(source)
+    assert reloaded is not catalog
+    assert len(reloaded) == 2
@@ -0,0 +1,105 @@
+import pstats
+import pytest
+
+from src.command_parser import CommandException
+from src.command_parser import CommandParser
+from src.video_player import VideoPlayer
+
+
+def test_commands_ignore_verb_case(capfd):
+    parser = CommandParser(VideoPlayer())
+    parser.execute_command(["play", "amazing_cats_video_id"])
+    parser.execute_command(["Show_Playing"])
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 2
+    assert "Playing video: Amazing Cats" in lines[0]
+    assert "Currently playing: Amazing Cats (amazing_cats_video_id) " \
+           "[#cat #animal]" in lines[1]
+
+
+def test_wrong_number_of_arguments_raises():
+    parser = CommandParser(VideoPlayer())
+    with pytest.raises(CommandException) as error:
+        parser.execute_command(["ADD_TO_PLAYLIST", "my_playlist"])
+    assert "ADD_TO_PLAYLIST command followed by a playlist name" in \
+           str(error.value)
+    with pytest.raises(CommandException):
+        parser.execute_command(["SHOW_ALL_VIDEOS", "two"])
+
+
+def test_unknown_command(capfd):
+    parser = CommandParser(VideoPlayer())
+    parser.execute_command(["REWIND"])
+    out, err = capfd.readouterr()
+    assert "Please enter a valid command" in out
+    with pytest.raises(CommandException):
+        parser.execute_command([])
+
+
+def test_show_all_videos_with_limit_and_offset(capfd):
+    parser = CommandParser(VideoPlayer())
+    parser.execute_command(["SHOW_ALL_VIDEOS", "2", "1"])
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 3
+    assert "Here's a list of all available videos:" in lines[0]
+    assert "Another Cat Video (another_cat_video_id) [#cat #animal]" in lines[1]
+    assert "Funny Dogs (funny_dogs_video_id) [#dog #animal]" in lines[2]
+
+
+def test_stats_count_calls_and_output_lines(capfd):
+    parser = CommandParser(VideoPlayer(), sample_every=1)
+    parser.execute_command(["STATS"])
+    parser.execute_command(["play", "amazing_cats_video_id"])
+    parser.execute_command(["PLAY", "funny_dogs_video_id"])
+    parser.execute_command(["SEARCH_VIDEOS", "cat", "no"])
+    parser.execute_command(["REWIND"])
+    with pytest.raises(CommandException):
+        parser.execute_command(["PLAY"])
+    stats = parser.get_stats()
+    assert set(stats) == {"STATS", "PLAY", "SEARCH_VIDEOS"}
+    assert stats["PLAY"]["calls"] == 2
+    assert stats["PLAY"]["output_lines"] == 3
+    assert stats["SEARCH_VIDEOS"]["output_lines"] == 5
+    assert stats["PLAY"]["max_seconds"] <= stats["PLAY"]["total_seconds"]
+    parser.execute_command(["STATS"])
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert "No commands have run yet" in lines[0]
+    assert "Command statistics:" in lines[-4]
+    assert "  PLAY: 2 calls, " in lines[-3]
+    assert " ms p99, " in lines[-3]
+    assert lines[-3].endswith(" ms max, 3 lines")
+    assert "  SEARCH_VIDEOS: 1 calls, " in lines[-2]
+    assert "  STATS: 1 calls, " in lines[-1]
+    parser.stats.reset()
+    assert parser.get_stats() == {}
+
+
+def test_stats_time_a_sample_of_the_calls(capfd):
+    parser = CommandParser(VideoPlayer(), sample_every=4)
+    for _ in range(10):
+        parser.execute_command(["NUMBER_OF_VIDEOS"])
+    stats = parser.get_stats()["NUMBER_OF_VIDEOS"]
+    # The 1st, 5th and 9th calls are timed.
+    assert stats["calls"] == 10
+    assert stats["timed_calls"] == 3
+    assert stats["output_lines"] == 10
+    assert stats["max_seconds"] <= stats["total_seconds"]
+    with pytest.raises(ValueError):
+        CommandParser(VideoPlayer(), sample_every=0)
+
+
+def test_profile_command(tmp_path):
+    parser = CommandParser(VideoPlayer())
+    profile_path = tmp_path / "search.prof"
+    parser.profile_command("search_videos", str(profile_path))
+    parser.execute_command(["NUMBER_OF_VIDEOS"])
+    assert not profile_path.exists()
+    parser.execute_command(["SEARCH_VIDEOS", "cat", "no"])
+    stats = pstats.Stats(str(profile_path))
+    assert any(name == "search_videos" for _, _, name in stats.stats)
+    parser.profile_command(None, None)
+    parser.execute_command(["SEARCH_VIDEOS", "dog", "no"])
+    assert parser.get_stats()["SEARCH_VIDEOS"]["calls"] == 2
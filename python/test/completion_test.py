@@ -0,0 +1,67 @@
+from src.command_parser import CommandParser
+from src.completion import PrefixIndex
+from src.run import _Completer
+from src.video_player import VideoPlayer
+
+
+def test_complete_prefix_ignoring_case():
+    index = PrefixIndex(["Funny Dogs", "funny cats", "Amazing Cats", "fun"])
+    assert index.complete("FUN") == ["fun", "funny cats", "Funny Dogs"]
+    assert index.complete("funny c") == ["funny cats"]
+    assert index.complete("b") == []
+    assert len(index.complete("")) == 4
+
+
+def test_complete_returns_at_most_limit():
+    index = PrefixIndex(f"word{i:03}" for i in range(500))
+    assert index.complete("word1", 3) == ["word100", "word101", "word102"]
+    assert index.complete("word49", 100) == [
+        f"word49{i}" for i in range(10)]
+
+
+def test_add_and_discard():
+    index = PrefixIndex()
+    index.add("Beta")
+    index.add("beta")
+    index.add("alpha")
+    index.discard("Beta")
+    index.discard("missing")
+    assert len(index) == 2
+    assert index.complete("b") == ["beta"]
+
+
+def test_complete_command(capfd):
+    player = VideoPlayer()
+    parser = CommandParser(player)
+    player.create_playlist("my_PLAYlist")
+    player.create_playlist("other")
+    parser.execute_command(["COMPLETE", "title", "a"])
+    parser.execute_command(["COMPLETE", "TAG", "#c", "1"])
+    parser.execute_command(["COMPLETE", "PLAYLIST", "MY"])
+    player.delete_playlist("my_playlist")
+    parser.execute_command(["COMPLETE", "PLAYLIST", "MY"])
+    parser.execute_command(["COMPLETE", "VIDEO", "a"])
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 12
+    assert "Completions for a:" in lines[2]
+    assert "Amazing Cats" in lines[3]
+    assert "Another Cat Video" in lines[4]
+    assert "Completions for #c:" in lines[5]
+    assert "#career" in lines[6]
+    assert "Completions for MY:" in lines[7]
+    assert "my_PLAYlist" in lines[8]
+    assert "No completions for MY" in lines[10]
+    assert "Cannot complete VIDEO: Choose TITLE, TAG or PLAYLIST" in lines[11]
+
+
+def test_tab_completer():
+    player = VideoPlayer()
+    completer = _Completer(CommandParser(player), player)
+    player.create_playlist("my_playlist")
+    assert completer.matches("", "show_p") == [
+        "SHOW_PLAYING", "SHOW_PLAYLIST"]
+    assert completer.matches("SHOW_PLAYLIST ", "m") == ["my_playlist"]
+    assert completer.matches("SEARCH_VIDEOS_WITH_TAG ", "#a") == ["#animal"]
+    assert completer.matches("SEARCH_VIDEOS ", "a") == ["Amazing", "Another"]
+    assert completer.matches("PLAY ", "a") == []
@@ -0,0 +1,132 @@
+import urllib.request
+
+from src.command_parser import CommandParser
+from src.metrics import COUNT_BOUNDS
+from src.metrics import REGISTRY
+from src.metrics import Histogram
+from src.metrics import MetricsRegistry
+from src.video_player import VideoPlayer
+
+
+def test_histogram_quantiles_are_within_one_bucket():
+    histogram = Histogram()
+    for value in range(1, 1001):
+        histogram.record(value / 1e6)
+    assert histogram.count == 1000
+    assert histogram.max == 1000 / 1e6
+    for fraction in [0.5, 0.9, 0.99]:
+        exact = fraction * 1000 / 1e6
+        assert exact <= histogram.quantile(fraction) <= exact * 1.125
+    assert histogram.quantile(1) == histogram.max
+    assert Histogram().quantile(0.5) == 0
+
+
+def test_histogram_memory_does_not_grow():
+    histogram = Histogram()
+    size = len(histogram._counts)
+    for value in [0, 1e-15, 3, 1e30]:
+        histogram.record(value)
+    assert len(histogram._counts) == size
+    assert [count for _, count in histogram.buckets()] == [2, 3, 4]
+
+
+def test_render_prometheus_text():
+    registry = MetricsRegistry()
+    latency = registry.histogram(
+        "latency_seconds", "Latency.", ["verb"], (0.25, 0.5, 1))
+    latency.labels("PLAY").record(0.2)
+    latency.labels("PLAY").record(0.8)
+    registry.counter("requests_total", "Requests.").labels().inc(3)
+    registry.gauge("ratio", "A ratio.", lambda: 0.5)
+    registry.gauge("missing", "Not known yet.", lambda: None)
+    assert registry.render().splitlines() == [
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{verb="PLAY",le="0.25"} 1',
+        'latency_seconds_bucket{verb="PLAY",le="0.5"} 1',
+        'latency_seconds_bucket{verb="PLAY",le="1"} 2',
+        'latency_seconds_bucket{verb="PLAY",le="+Inf"} 2',
+        'latency_seconds_sum{verb="PLAY"} 1',
+        'latency_seconds_count{verb="PLAY"} 2',
+        "# HELP requests_total Requests.",
+        "# TYPE requests_total counter",
+        "requests_total 3",
+        "# HELP ratio A ratio.",
+        "# TYPE ratio gauge",
+        "ratio 0.5",
+    ]
+
+
+def test_exported_buckets_are_fixed():
+    registry = MetricsRegistry()
+    family = registry.histogram("size", "Size.", bounds=COUNT_BOUNDS)
+
+    def bucket_lines():
+        return [line for line in registry.render().splitlines()
+                if line.startswith("size_bucket")]
+
+    family.labels().record(3)
+    before = bucket_lines()
+    family.labels().record(1e6)
+    after = bucket_lines()
+    assert len(before) == len(after) == len(COUNT_BOUNDS) + 1
+    assert [line.split()[0] for line in before] == [
+        line.split()[0] for line in after]
+    assert before[2] == 'size_bucket{le="4"} 1'
+    assert after[-1] == 'size_bucket{le="+Inf"} 2'
+
+
+def test_exported_buckets_include_their_bound():
+    registry = MetricsRegistry()
+    family = registry.histogram("size", "Size.", bounds=COUNT_BOUNDS)
+    for value in [0, 1, 2, 4]:
+        family.labels().record(value)
+    lines = registry.render().splitlines()
+    assert 'size_bucket{le="1"} 2' in lines
+    assert 'size_bucket{le="2"} 3' in lines
+    assert 'size_bucket{le="4"} 4' in lines
+    assert 'size_bucket{le="8"} 4' in lines
+
+
+def test_write_and_serve(tmp_path):
+    registry = MetricsRegistry()
+    registry.counter("requests_total", "Requests.").labels().inc()
+    registry.write(tmp_path / "metrics.prom")
+    assert "requests_total 1" in (tmp_path / "metrics.prom").read_text()
+    server = registry.serve(0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url) as response:
+            assert "requests_total 1" in response.read().decode("utf-8")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_commands_and_searches_are_recorded():
+    parser = CommandParser(VideoPlayer())
+    parser.stats.export()
+    parser.execute_command(["SEARCH_VIDEOS_WITH_TAG", "#animal", "no"])
+    parser.execute_command(["SEARCH_VIDEOS_WITH_TAG", "#ANIMAL", "no"])
+    text = REGISTRY.render()
+    assert 'yt_command_duration_seconds_count{verb="SEARCH_VIDEOS_WITH_TAG"}' \
+        in text
+    assert 'yt_search_candidates_bucket{mode="tag",le="4"}' in text
+    assert 'yt_search_results_count{command="SEARCH_VIDEOS_WITH_TAG"}' in text
+    assert 'yt_query_cache_requests_total{result="hit"}' in text
+    assert "yt_query_cache_hit_ratio " in text
+    assert "yt_catalog_load_seconds_count " in text
+
+
+def test_stats_cover_only_their_own_parser():
+    first = CommandParser(VideoPlayer())
+    for _ in range(5):
+        first.execute_command(["NUMBER_OF_VIDEOS"])
+    second = CommandParser(VideoPlayer())
+    second.execute_command(["NUMBER_OF_VIDEOS"])
+    stats = second.get_stats()["NUMBER_OF_VIDEOS"]
+    assert stats["calls"] == 1
+    assert stats["p99_seconds"] <= stats["max_seconds"]
+    second.stats.export()
+    assert ('yt_command_duration_seconds_count{verb="NUMBER_OF_VIDEOS"} 1'
+            in REGISTRY.render())
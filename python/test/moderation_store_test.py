@@ -0,0 +1,59 @@
+from src.moderation_store import ModerationStore
+from src.video_library import VideoLibrary
+
+
+def _open_library(path, **store_options):
+    store = ModerationStore(path, **store_options)
+    return VideoLibrary(moderation_store=store), store
+
+
+def test_flags_survive_restart(tmp_path):
+    library, store = _open_library(tmp_path / "moderation")
+    library.get_video("amazing_cats_video_id").set_flag("dont\tlike cats")
+    library.get_video("funny_dogs_video_id").set_flag("dogs")
+    library.get_video("funny_dogs_video_id").remove_flag()
+    store.close()
+
+    library, store = _open_library(tmp_path / "moderation")
+    cats = library.get_video("amazing_cats_video_id")
+    assert cats.get_flagged()
+    assert cats.get_flag_reason() == "dont\tlike cats"
+    assert not library.get_video("funny_dogs_video_id").get_flagged()
+    assert library.get_random_video().video_id != "amazing_cats_video_id"
+    store.close()
+
+
+def test_unknown_and_half_written_records_are_ignored(tmp_path):
+    path = tmp_path / "moderation"
+    path.write_text("F\tgone_video_id\tr\nF\tnothing_video_id\tboring\nF\tfu")
+    library, store = _open_library(path)
+    assert library.get_video("nothing_video_id").get_flag_reason() == "boring"
+    assert not library.get_video("funny_dogs_video_id").get_flagged()
+    store.close()
+    assert path.read_text().endswith("boring\n")
+
+
+def test_compaction_keeps_current_flags(tmp_path):
+    path = tmp_path / "moderation"
+    library, store = _open_library(path, sync_every=1, compact_after=2)
+    video = library.get_video("nothing_video_id")
+    for reason in ["a", "b", "c"]:
+        video.set_flag(reason)
+        video.remove_flag()
+    video.set_flag("d")
+    store.close()
+    assert path.read_text() == "F\tnothing_video_id\td\n"
+
+
+def test_flags_reach_the_file_before_a_sync(tmp_path):
+    # A flag that was reported as done must survive the process dying
+    # before the next sync.
+    path = tmp_path / "moderation"
+    library, store = _open_library(path, sync_every=64)
+    library.get_video("funny_dogs_video_id").set_flag("dogs")
+
+    recovered, other = _open_library(path)
+    assert recovered.get_video("funny_dogs_video_id").get_flag_reason() == (
+        "dogs")
+    other.close()
+    store.close()
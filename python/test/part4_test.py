@@ -269,3 +269,15 @@ def test_allow_video_show_playlist(capfd):
     assert "Successfully removed flag from video: Amazing Cats" in lines[5]
     assert "Showing playlist: my_playlist" in lines[6]
     assert "Amazing Cats (amazing_cats_video_id) [#cat #animal]" in lines[7]
+
+
+def test_allow_video_can_play_again(capfd):
+    player = VideoPlayer()
+    player.flag_video("amazing_cats_video_id", "dont_like_cats")
+    player.allow_video("amazing_cats_video_id")
+    player.play_video("amazing_cats_video_id")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 3
+    assert "Successfully removed flag from video: Amazing Cats" in lines[1]
+    assert "Playing video: Amazing Cats" in lines[2]
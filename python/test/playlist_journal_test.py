@@ -0,0 +1,87 @@
+from src.playlist_journal import PlaylistJournal
+from src.session import Session
+from src.video_library import VideoLibrary
+from src.video_player import VideoPlayer
+
+
+def _open_player(path, library, **journal_options):
+    journal = PlaylistJournal(path, **journal_options)
+    session = Session(journal.load(library), journal)
+    return VideoPlayer(library=library, session=session), journal
+
+
+def _titles(playlist):
+    return [video.title for video in playlist.get_videos()]
+
+
+def test_playlists_survive_restart(tmp_path, capfd):
+    library = VideoLibrary()
+    player, journal = _open_player(tmp_path / "journal", library)
+    player.create_playlist("my_playlist")
+    player.create_playlist("other")
+    player.add_to_playlist("MY_PLAYLIST", "amazing_cats_video_id")
+    player.add_to_playlist("my_playlist", "funny_dogs_video_id")
+    player.add_to_playlist("other", "nothing_video_id")
+    player.remove_from_playlist("my_playlist", "amazing_cats_video_id")
+    player.clear_playlist("other")
+    journal.close()
+
+    player, journal = _open_player(tmp_path / "journal", library)
+    assert list(player.playlists.sorted_titles()) == ["my_playlist", "other"]
+    assert _titles(player.playlists.get("my_playlist")) == ["Funny Dogs"]
+    assert _titles(player.playlists.get("other")) == []
+    player.delete_playlist("other")
+    journal.close()
+
+    player, journal = _open_player(tmp_path / "journal", library)
+    assert list(player.playlists.sorted_titles()) == ["my_playlist"]
+    journal.close()
+
+
+def test_half_written_record_is_dropped(tmp_path):
+    path = tmp_path / "journal"
+    path.write_text("G\t0\nC\tmy_playlist\nA\tmy_playlist\tfunny_dogs_vi")
+    library = VideoLibrary()
+    player, journal = _open_player(path, library)
+    assert _titles(player.playlists.get("my_playlist")) == []
+    journal.record_add("my_playlist", "nothing_video_id")
+    journal.close()
+
+    player, journal = _open_player(path, library)
+    assert _titles(player.playlists.get("my_playlist")) == [
+        "Video about nothing"]
+    journal.close()
+
+
+def test_compaction_moves_records_to_snapshot(tmp_path, capfd):
+    path = tmp_path / "journal"
+    library = VideoLibrary()
+    player, journal = _open_player(path, library, sync_every=1,
+                                   compact_after=3)
+    player.create_playlist("my_playlist")
+    player.add_to_playlist("my_playlist", "funny_dogs_video_id")
+    player.add_to_playlist("my_playlist", "nothing_video_id")
+    player.remove_from_playlist("my_playlist", "funny_dogs_video_id")
+    journal.close()
+
+    assert path.read_text() == ("G\t1\n"
+                                "R\tmy_playlist\tfunny_dogs_video_id\n")
+    player, journal = _open_player(path, library)
+    assert _titles(player.playlists.get("my_playlist")) == [
+        "Video about nothing"]
+    journal.close()
+
+
+def test_records_reach_the_file_before_a_sync(tmp_path, capfd):
+    # A process that dies without closing the journal must not lose the
+    # changes it already reported, so none may wait in its buffers.
+    path = tmp_path / "journal"
+    library = VideoLibrary()
+    player, journal = _open_player(path, library, sync_every=64)
+    player.create_playlist("my_playlist")
+    player.add_to_playlist("my_playlist", "funny_dogs_video_id")
+
+    recovered, other = _open_player(path, library)
+    assert _titles(recovered.playlists.get("my_playlist")) == ["Funny Dogs"]
+    other.close()
+    journal.close()
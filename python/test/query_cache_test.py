@@ -0,0 +1,48 @@
+from src.query_cache import QueryCache
+
+
+def test_get_and_put_count_hits_and_misses():
+    cache = QueryCache()
+    assert cache.get("cat") is None
+    cache.put("cat", (1, 2))
+    assert cache.get("cat") == (1, 2)
+    assert cache.stats() == {
+        "hits": 1, "misses": 1, "evictions": 0, "size": 1, "results": 2,
+        "generation": 0}
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = QueryCache(capacity=2)
+    cache.put("a", (1,))
+    cache.put("b", (2,))
+    cache.get("a")
+    cache.put("c", (3,))
+    assert cache.get("b") is None
+    assert cache.get("a") == (1,)
+    assert cache.get("c") == (3,)
+    assert cache.evictions == 1
+
+
+def test_total_results_are_bounded():
+    cache = QueryCache(max_results=10)
+    cache.put("a", tuple(range(4)))
+    cache.put("b", tuple(range(4)))
+    cache.put("c", tuple(range(4)))
+    assert cache.get("a") is None
+    assert cache.results == 8
+    cache.put("huge", tuple(range(11)))
+    assert cache.get("huge") is None
+    cache.put("b", tuple(range(10)))
+    assert cache.results == 10
+    assert len(cache) == 1
+
+
+def test_invalidate_makes_entries_stale():
+    cache = QueryCache()
+    cache.put("a", (1,))
+    cache.invalidate()
+    assert cache.get("a") is None
+    assert len(cache) == 0
+    assert cache.results == 0
+    cache.put("a", (2,))
+    assert cache.get("a") == (2,)
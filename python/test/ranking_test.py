@@ -0,0 +1,72 @@
+import pytest
+
+from src.command_parser import CommandParser
+from src.ranking import BM25Index
+from src.ranking import tokenize
+from src.video_library import VideoLibrary
+from src.video_player import VideoPlayer
+
+
+def _build_index():
+    return BM25Index([
+        tokenize("Funny Dogs #dog #animal"),
+        tokenize("Amazing Cats #cat #animal"),
+        tokenize("Another Cat Video #cat #animal"),
+        tokenize("Cat cat cat"),
+        tokenize("Video about nothing"),
+    ])
+
+
+def test_tokenize():
+    assert tokenize("Another Cat-Video #CAT") == [
+        "another", "cat", "video", "cat"]
+
+
+def test_rank_prefers_rare_and_repeated_words():
+    index = _build_index()
+    assert index.top("cat", 10) == [3, 2, 1]
+    assert index.top("animal video", 10)[0] == 2
+    assert index.top("CAT nothing", 1) == [4]
+    assert index.top("unknown", 10) == []
+    assert index.top("cat", 0) == []
+
+
+def test_rank_breaks_ties_by_document():
+    index = BM25Index([["a"], ["b"], ["a"], ["a"]])
+    assert index.top("a", 2) == [0, 2]
+    assert index.top("a b", 10) == [1, 0, 2, 3]
+
+
+def test_numpy_ranking_matches_python_ranking():
+    pytest.importorskip("numpy")
+    documents = [[f"w{(i * j) % 17}" for j in range(i % 7 + 1)]
+                 for i in range(500)]
+    index = BM25Index(documents)
+    for query in ["w1", "w2 w3", "w0 w5 w16 w9", "w4 w4"]:
+        terms = index._query_terms(query)
+        for limit in [1, 5, 50, 1000]:
+            assert (index._top_numpy(terms, limit)
+                    == index._top_python(terms, limit))
+
+
+def test_library_ranked_search_skips_flagged_videos():
+    library = VideoLibrary()
+    library.get_video("amazing_cats_video_id").set_flag("dont_like_cats")
+    assert [v.video_id for v in library.search_ranked("amazing cat", 2)] == [
+        "another_cat_video_id"]
+
+
+def test_search_ranked_command(capfd):
+    player = VideoPlayer()
+    parser = CommandParser(player)
+    parser.execute_command(["SEARCH_RANKED", "cat", "video"])
+    parser.execute_command(["SEARCH_RANKED", "blah"])
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 5
+    assert "Here are the top results for cat video:" in lines[0]
+    assert ("1) Another Cat Video (another_cat_video_id) [#cat #animal]"
+            in lines[1])
+    assert "2) Video about nothing (nothing_video_id) []" in lines[2]
+    assert "3) Amazing Cats (amazing_cats_video_id) [#cat #animal]" in lines[3]
+    assert "No search results for blah" in lines[4]
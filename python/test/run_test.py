@@ -0,0 +1,22 @@
+import io
+
+from src.run import run_batch
+
+
+def test_batch_mode_plays_inline_search_selection():
+    output = io.StringIO()
+    run_batch(["SEARCH_VIDEOS cat 2", "SHOW_PLAYING"], output)
+    lines = output.getvalue().splitlines()
+    assert len(lines) == 7
+    assert "Here are the results for cat:" in lines[0]
+    assert "Playing video: Another Cat Video" in lines[5]
+    assert "Currently playing: Another Cat Video" in lines[6]
+
+
+def test_batch_mode_does_not_wait_for_selection():
+    output = io.StringIO()
+    run_batch(["SEARCH_VIDEOS_WITH_TAG #dog", "PLAY", "EXIT", "STOP"], output)
+    lines = output.getvalue().splitlines()
+    assert len(lines) == 5
+    assert "1) Funny Dogs (funny_dogs_video_id) [#dog #animal]" in lines[1]
+    assert "Please enter PLAY command followed by video_id." in lines[4]
@@ -0,0 +1,46 @@
+from src.search_index import TrigramIndex
+
+
+def _build_index():
+    return TrigramIndex(["Funny Dogs", "Amazing Cats", "Another Cat Video",
+                         "abcab"])
+
+
+def test_search_matches_substring_ignoring_case():
+    index = _build_index()
+    assert index.search("CAT") == [1, 2]
+    assert index.search("funny dogs") == [0]
+
+
+def test_search_verifies_trigram_candidates():
+    index = _build_index()
+    assert index.search("abcabc") == []
+    assert index.search("bcab") == [3]
+
+
+def test_search_short_terms():
+    index = _build_index()
+    assert index.search("o") == [0, 2]
+    assert index.search("Ca") == [1, 2, 3]
+    assert index.search("zz") == []
+    assert index.search("") == [0, 1, 2, 3]
+    assert len(index) == 4
+
+
+def test_search_uses_posting_lists():
+    # Only the texts holding the term's n-grams are ever lowered, so a
+    # search must not touch the texts that cannot match.
+    class _Texts(list):
+        reads = 0
+
+        def __getitem__(self, position):
+            _Texts.reads += 1
+            return list.__getitem__(self, position)
+
+    texts = _Texts(["filler video %d" % number for number in range(10000)])
+    texts += ["Funny Dogs", "Dogs and more dogs"]
+    index = TrigramIndex(texts)
+    _Texts.reads = 0
+    assert index.search("dogs") == [10000, 10001]
+    assert index.search("do") == [10000, 10001]
+    assert _Texts.reads <= 2
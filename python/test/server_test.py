@@ -0,0 +1,106 @@
+import asyncio
+import pytest
+
+from src.command_parser import LOCAL_COMMANDS
+from src.server import CommandServer
+from src.server import MAX_LINE
+from src.server import NETWORK_COMMANDS
+from src.server import main
+from src.server import read_response
+from src.video_library import VideoLibrary
+
+
+async def _send(reader, writer, command):
+    writer.write(command.encode("utf-8") + b"\n")
+    await writer.drain()
+    return await read_response(reader)
+
+
+async def _two_clients():
+    server = await CommandServer().start(port=0)
+    port = server.sockets[0].getsockname()[1]
+    first = await asyncio.open_connection("127.0.0.1", port)
+    second = await asyncio.open_connection("127.0.0.1", port)
+    replies = [
+        await _send(*first, "PLAY amazing_cats_video_id"),
+        await _send(*second, "SHOW_PLAYING"),
+        await _send(*second, "FLAG_VIDEO funny_dogs_video_id"),
+        await _send(*first, "PLAY funny_dogs_video_id"),
+        await _send(*first, "PLAY"),
+    ]
+    for _, writer in (first, second):
+        writer.write(b"EXIT\n")
+        await writer.drain()
+    closed = await read_response(first[0])
+    server.close()
+    await server.wait_closed()
+    return replies, closed
+
+
+def test_connections_have_own_sessions_and_share_flags():
+    replies, closed = asyncio.run(_two_clients())
+    assert replies[0] == "Playing video: Amazing Cats\n"
+    assert replies[1] == "No video is currently playing\n"
+    assert replies[2] == ("Successfully flagged video: Funny Dogs "
+                          "(reason: Not supplied)\n")
+    assert replies[3] == ("Cannot play video: Video is currently flagged "
+                          "(reason: Not supplied)\n")
+    assert replies[4] == "Please enter PLAY command followed by video_id.\n"
+    assert closed is None
+
+
+async def _ask_server(command_server, commands):
+    server = await command_server.start(port=0)
+    port = server.sockets[0].getsockname()[1]
+    client = await asyncio.open_connection("127.0.0.1", port)
+    replies = [await _send(*client, command) for command in commands]
+    client[1].close()
+    server.close()
+    await server.wait_closed()
+    return replies
+
+
+async def _ask(commands):
+    return await _ask_server(CommandServer(), commands)
+
+
+def test_server_does_not_read_its_files(tmp_path):
+    secret = tmp_path / "secret.txt"
+    secret.write_text("do_not_show_this\n")
+    replies = asyncio.run(_ask([
+        f"FLAG_VIDEOS_FROM_FILE {secret} spam", "HELP"]))
+    assert "do_not_show_this" not in replies[0]
+    assert replies[0].startswith("Please enter a valid command")
+    assert "FLAG_VIDEOS_FROM_FILE" not in replies[1]
+    assert "FLAG_VIDEO <video_id>" in replies[1]
+    assert not NETWORK_COMMANDS & LOCAL_COMMANDS
+
+
+def test_server_accepts_long_lines_and_skips_too_long_ones():
+    ids = " ".join(["amazing_cats_video_id"] * 5000)
+    replies = asyncio.run(_ask([
+        "CREATE_PLAYLIST many",
+        "ADD_MANY_TO_PLAYLIST many " + ids,
+        "SEARCH_VIDEOS " + "x" * (MAX_LINE + 10),
+        "NUMBER_OF_VIDEOS"]))
+    assert replies[1].startswith("Added 1 videos to many")
+    assert replies[2].startswith("Cannot run command: Line is longer")
+    assert replies[3] == "5 videos in the library\n"
+
+
+class _BrokenLibrary(VideoLibrary):
+    def __len__(self):
+        raise EOFError
+
+
+def test_failing_command_does_not_end_session(capsys):
+    replies = asyncio.run(_ask_server(CommandServer(_BrokenLibrary()), [
+        "NUMBER_OF_VIDEOS", "PLAY amazing_cats_video_id"]))
+    assert replies[0] == "Cannot run command: An internal error occurred\n"
+    assert replies[1] == "Playing video: Amazing Cats\n"
+    assert "EOFError" in capsys.readouterr().err
+
+
+def test_shards_must_be_positive():
+    with pytest.raises(SystemExit):
+        main(["--shards", "0"])
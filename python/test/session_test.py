@@ -0,0 +1,82 @@
+from src.command_parser import CommandParser
+from src.session import MAX_RESULT_SETS
+from src.session import Session
+from src.video_library import VideoLibrary
+from src.video_player import VideoPlayer
+
+
+def test_player_commands_act_on_current_session(capfd):
+    player = VideoPlayer()
+    first = player.session
+    player.play_video("amazing_cats_video_id")
+    player.create_playlist("my_playlist")
+
+    player.session = Session()
+    player.show_playing()
+    player.show_all_playlists()
+    player.session = first
+    player.show_playing()
+
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 5
+    assert "No video is currently playing" in lines[2]
+    assert "No playlists exist yet" in lines[3]
+    assert "Currently playing: Amazing Cats" in lines[4]
+
+
+def test_idle_session_has_no_dict_or_playlists():
+    session = Session()
+    assert not hasattr(session, "__dict__")
+    assert session._playlists is None
+
+
+def test_result_sets_are_evicted_least_recently_used():
+    session = Session()
+    first = session.add_results("first", ["a", "b"])
+    for i in range(MAX_RESULT_SETS - 1):
+        session.add_results(str(i), [])
+    assert session.get_results(1) is first
+    session.add_results("newest", ["c"])
+    assert session.get_results(1) is first
+    assert session.get_results(2) is None
+    assert session.get_results().query == "newest"
+    assert first.get(2) == "b"
+    assert first.get(0) is None
+    assert first.get(3) is None
+
+
+def test_play_result(capfd):
+    player = VideoPlayer(interactive=False)
+    parser = CommandParser(player)
+    parser.execute_command(["PLAY_RESULT", "1"])
+    parser.execute_command(["SEARCH_VIDEOS", "cat"])
+    parser.execute_command(["SEARCH_VIDEOS_WITH_TAG", "#dog"])
+    parser.execute_command(["PLAY_RESULT", "1"])
+    parser.execute_command(["PLAY_RESULT", "2", "1"])
+    parser.execute_command(["PLAY_RESULT", "0", "1"])
+    parser.execute_command(["PLAY_RESULT", "1", "9"])
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 15
+    assert "Cannot play result: No search results yet" in lines[0]
+    assert "Playing video: Funny Dogs" in lines[10]
+    assert "Stopping video: Funny Dogs" in lines[11]
+    assert "Playing video: Another Cat Video" in lines[12]
+    assert ("Cannot play result 0: There are only 2 results for cat"
+            in lines[13])
+    assert "Cannot play result: Search 9 is not available" in lines[14]
+
+
+def test_play_result_does_not_parse_display_lines(tmp_path, capfd):
+    catalog_path = tmp_path / "videos.txt"
+    catalog_path.write_text(
+        "Cats (Part 1) | cats_1_id | #cat\n"
+        "Cats (Part 2) | cats_2_id | #cat\n")
+    player = VideoPlayer(VideoLibrary(catalog_path))
+    player.search_videos("cats", "2")
+    player.play_result(1)
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert "Playing video: Cats (Part 2)" in lines[5]
+    assert "Playing video: Cats (Part 1)" in lines[7]
@@ -0,0 +1,53 @@
+import pytest
+
+from benchmarks.synthetic_catalog import tag
+from benchmarks.synthetic_catalog import word
+from benchmarks.synthetic_catalog import write_catalog
+from src.catalog import Catalog
+from src.sharded_catalog import ShardedSearch
+from src.sharded_catalog import shard_of
+from src.video_library import VideoLibrary
+from src.video_player import VideoPlayer
+
+
+def test_shard_of_is_stable():
+    assert shard_of("funny_dogs_video_id", 4) == shard_of(
+        "funny_dogs_video_id", 4)
+    assert {shard_of(f"video_{i}", 4) for i in range(100)} == {0, 1, 2, 3}
+
+
+def test_sharded_search_matches_local_search(tmp_path):
+    catalog_path = tmp_path / "videos.txt"
+    write_catalog(catalog_path, 2000)
+    local = VideoLibrary(catalog_path)
+    sharded = VideoLibrary(catalog_path, shards=3)
+    try:
+        for i in [0, 5, 300]:
+            for term, by_tag in [(word(i), False), (word(i)[:2], False),
+                                 (tag(i), True)]:
+                assert ([v.video_id for v in sharded.find_videos(term, by_tag)]
+                        == [v.video_id for v in local.find_videos(term, by_tag)])
+        assert ({v.video_id for v in sharded.search_titles(word(1))}
+                == {v.video_id for v in local.search_titles(word(1))})
+    finally:
+        sharded.close()
+
+
+def test_sharded_player_skips_flagged_videos(capfd):
+    library = VideoLibrary(shards=2)
+    try:
+        player = VideoPlayer(library)
+        player.flag_video("amazing_cats_video_id")
+        player.search_videos("cat", "1")
+    finally:
+        library.close()
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert "1) Another Cat Video (another_cat_video_id) [#cat #animal]" \
+        in lines[2]
+    assert "Playing video: Another Cat Video" in lines[5]
+
+
+def test_sharded_search_needs_a_shard():
+    with pytest.raises(ValueError):
+        ShardedSearch(Catalog([]), 0)
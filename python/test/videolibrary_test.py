@@ -1,4 +1,5 @@
 from src.video_library import VideoLibrary
+from src.video_player import VideoPlayer
 
 
 def test_library_has_all_videos():
@@ -6,6 +7,19 @@ def test_library_has_all_videos():
     assert len(library.get_all_videos()) == 5
 
 
+def test_number_of_videos_does_not_build_videos(monkeypatch, capfd):
+    library = VideoLibrary()
+
+    def fail():
+        raise AssertionError("get_all_videos builds a view per video")
+
+    monkeypatch.setattr(library, "get_all_videos", fail)
+    assert len(library) == 5
+    VideoPlayer(library).number_of_videos()
+    out, err = capfd.readouterr()
+    assert out == "5 videos in the library\n"
+
+
 def test_parses_tags_correctly():
     library = VideoLibrary()
     video = library.get_video("amazing_cats_video_id")
@@ -24,3 +38,101 @@ def test_parses_video_correctly_without_tags():
     assert video.title == "Video about nothing"
     assert video.video_id == "nothing_video_id"
     assert video.tags == ()
+
+
+def test_search_titles_ignores_case():
+    library = VideoLibrary()
+    videos = library.search_titles("CAT")
+
+    assert {video.video_id for video in videos} == {
+        "amazing_cats_video_id", "another_cat_video_id"}
+    assert library.search_titles("blah") == []
+
+
+def test_search_tags_returns_each_video_once():
+    library = VideoLibrary()
+    videos = library.search_tags("#A")
+
+    assert sorted(video.video_id for video in videos) == [
+        "amazing_cats_video_id", "another_cat_video_id", "funny_dogs_video_id"]
+    assert library.search_tags("#career")[0].title == "Life at Google"
+    assert library.search_tags("#blah") == []
+
+
+def test_library_videos_are_row_views():
+    library = VideoLibrary()
+    video = library.get_video("amazing_cats_video_id")
+
+    assert not hasattr(video, "__dict__")
+    assert video == library.get_video("amazing_cats_video_id")
+    assert video != library.get_video("another_cat_video_id")
+    video.set_flag("dont_like_cats")
+    assert library.get_video("amazing_cats_video_id").get_flag_reason() == \
+        "dont_like_cats"
+    video.remove_flag()
+    assert not library.get_video("amazing_cats_video_id").get_flagged()
+
+
+def test_random_video_skips_flagged_videos():
+    library = VideoLibrary()
+    for video in library.get_all_videos():
+        if video.video_id != "nothing_video_id":
+            video.set_flag("reason")
+
+    for _ in range(10):
+        assert library.get_random_video().video_id == "nothing_video_id"
+    library.get_video("nothing_video_id").set_flag("reason")
+    assert library.get_random_video() is None
+    library.get_video("funny_dogs_video_id").remove_flag()
+    assert library.get_random_video().video_id == "funny_dogs_video_id"
+
+
+def test_display_line_follows_flag_state():
+    library = VideoLibrary()
+    video = library.get_video("amazing_cats_video_id")
+
+    assert video.display_line() == \
+        "Amazing Cats (amazing_cats_video_id) [#cat #animal]"
+    video.set_flag("dont_like_cats")
+    assert video.display_line() == ("Amazing Cats (amazing_cats_video_id) "
+                                    "[#cat #animal] - FLAGGED "
+                                    "(reason: dont_like_cats)")
+    video.set_flag("still_dont")
+    assert video.display_line().endswith("(reason: still_dont)")
+    video.remove_flag()
+    assert video.display_line() == \
+        "Amazing Cats (amazing_cats_video_id) [#cat #animal]"
+
+
+def test_sorted_display_lines_are_paged_and_follow_flags():
+    library = VideoLibrary()
+    lines = library.get_sorted_display_lines()
+
+    assert lines == sorted(video.display_line()
+                           for video in library.get_all_videos())
+    assert library.get_sorted_display_lines(2, 1) == lines[1:3]
+    library.get_video("amazing_cats_video_id").set_flag("dont_like_cats")
+    assert library.get_sorted_display_lines(1)[0].endswith(
+        "FLAGGED (reason: dont_like_cats)")
+    library.get_video("amazing_cats_video_id").remove_flag()
+    assert library.get_sorted_display_lines() == lines
+
+
+def test_find_videos_is_cached_until_a_flag_changes():
+    library = VideoLibrary()
+    first = library.find_videos("CAT")
+    assert [v.video_id for v in first] == [
+        "amazing_cats_video_id", "another_cat_video_id"]
+    assert library.find_videos("cat") == first
+    assert library.get_query_cache_stats()["hits"] == 1
+    assert library.get_query_cache_stats()["results"] == 2
+    library.find_videos("cat", by_tag=True)
+    library.get_video("amazing_cats_video_id").set_flag("dont_like_cats")
+    assert [v.video_id for v in library.find_videos("cat")] == [
+        "another_cat_video_id"]
+    library.get_video("amazing_cats_video_id").remove_flag()
+    assert len(library.find_videos("cat")) == 2
+    stats = library.get_query_cache_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 4
+    assert stats["generation"] == 2
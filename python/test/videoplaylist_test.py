@@ -0,0 +1,127 @@
+from src.video_playlist import Playlist
+from src.video_playlist import PlaylistRegistry
+
+
+def test_registry_looks_up_names_ignoring_case():
+    registry = PlaylistRegistry()
+    playlist = Playlist("my_PLAYlist")
+
+    assert registry.add(playlist)
+    assert not registry.add(Playlist("MY_playlist"))
+    assert registry.get("My_Playlist") is playlist
+    assert "my_playlist" in registry
+    assert registry.get("other") is None
+
+
+def test_registry_keeps_titles_sorted():
+    registry = PlaylistRegistry()
+    for name in ["b_list", "C_list", "a_list"]:
+        registry.add(Playlist(name))
+
+    assert list(registry.sorted_titles()) == ["C_list", "a_list", "b_list"]
+    assert registry.remove("A_LIST").title == "a_list"
+    assert registry.remove("a_list") is None
+    assert list(registry.sorted_titles()) == ["C_list", "b_list"]
+    assert len(registry) == 2
+
+
+class _FakeVideo:
+    def __init__(self, video_id):
+        self.video_id = video_id
+
+
+def _ids(playlist):
+    return [video.video_id for video in playlist]
+
+
+def test_playlist_membership_and_order():
+    playlist = Playlist("my_playlist")
+    for video_id in ["a", "b", "c", "a"]:
+        playlist.add_video(_FakeVideo(video_id))
+
+    assert len(playlist) == 3
+    assert "b" in playlist
+    assert "d" not in playlist
+    assert _ids(playlist) == ["a", "b", "c"]
+    playlist.remove_video(_FakeVideo("b"))
+    assert "b" not in playlist
+    assert _ids(playlist) == ["a", "c"]
+
+
+class _CountedId(str):
+    comparisons = 0
+    hashes = 0
+
+    def __eq__(self, other):
+        _CountedId.comparisons += 1
+        return str.__eq__(self, other)
+
+    def __hash__(self):
+        _CountedId.hashes += 1
+        return str.__hash__(self)
+
+
+def test_playlist_removal_does_not_scan():
+    playlist = Playlist("my_playlist")
+    videos = [_FakeVideo(_CountedId(f"video_{number}"))
+              for number in range(10000)]
+    for video in videos:
+        playlist.add_video(video)
+
+    _CountedId.comparisons = 0
+    for video in reversed(videos[-1000:]):
+        playlist.remove_video(_FakeVideo(_CountedId(video.video_id)))
+    # A scan of the order would compare each id with thousands of others.
+    assert _CountedId.comparisons <= 2000
+    assert len(playlist) == 9000
+    assert _ids(playlist)[-1] == "video_8999"
+
+
+def test_playlist_positional_operations():
+    playlist = Playlist("my_playlist")
+    for video_id in ["a", "b", "c"]:
+        playlist.add_video(_FakeVideo(video_id))
+
+    playlist.insert_video(1, _FakeVideo("d"))
+    assert _ids(playlist) == ["a", "d", "b", "c"]
+    playlist.move_video(0, 3)
+    assert _ids(playlist) == ["d", "b", "c", "a"]
+    assert playlist.remove_at(1).video_id == "b"
+    assert "b" not in playlist
+    assert playlist.index("a") == 2
+    playlist.clear()
+    assert len(playlist) == 0
+    assert _ids(playlist) == []
+
+
+def test_positional_operations_after_removals():
+    playlist = Playlist("my_playlist")
+    for video_id in "abcdef":
+        playlist.add_video(_FakeVideo(video_id))
+    playlist.remove_video(_FakeVideo("b"))
+    playlist.remove_video(_FakeVideo("e"))
+
+    assert playlist.index("d") == 2
+    playlist.move_video(3, 0)
+    assert _ids(playlist) == ["f", "a", "c", "d"]
+    playlist.remove_video(_FakeVideo("a"))
+    playlist.insert_video(1, _FakeVideo("b"))
+    assert _ids(playlist) == ["f", "b", "c", "d"]
+    assert playlist.remove_at(-1).video_id == "d"
+    playlist.add_video(_FakeVideo("a"))
+    assert _ids(playlist) == ["f", "b", "c", "a"]
+    assert len(playlist) == 4
+
+
+def test_positional_operations_do_not_rebuild_the_playlist():
+    playlist = Playlist("my_playlist")
+    for number in range(10000):
+        playlist.add_video(_FakeVideo(_CountedId(f"video_{number}")))
+
+    _CountedId.hashes = 0
+    for number in range(100):
+        playlist.move_video(number, 9000)
+        playlist.insert_video(number, _FakeVideo(_CountedId(f"new_{number}")))
+    # Rebuilding the id lookup would hash every id of the playlist.
+    assert _CountedId.hashes <= 1000
+    assert len(playlist) == 10100